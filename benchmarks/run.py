@@ -0,0 +1,381 @@
+"""Нагрузочные тесты телефонного справочника
+
+Для каждого размера базы генерируется справочник (fill_bd.generate_contacts с фиксированным зерном) и замеряются
+основные операции Phonebook и View, экспорт и импорт (src.transfer), загрузка JSON файла и бинарного снимка
+(src.snapshot), а также время запуска приложения до вывода главного меню. С --shards N дополнительно замеряется
+поиск в ShardedPhonebook из N шардов на 1..N рабочих процессах. Каждый размер запускается в отдельном процессе,
+чтобы пиковая память одного размера не влияла на другой.
+
+Пример запуска:
+    python3 -m benchmarks.run --sizes 1k,10k --output results.json
+    python3 -m benchmarks.run --sizes 1M --backend compact
+    python3 -m benchmarks.run --sizes 1M --backend snapshot
+    python3 -m benchmarks.run --sizes 100k --shards 4
+    python3 -m benchmarks.run --sizes 1k,10k --output new.json --baseline results.json
+    python3 -m benchmarks.run --compare results.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tabulate import tabulate
+
+from fill_bd import SEED, generate_contacts, parse_count
+from src.phonebook import Phonebook
+from src.sharded import ShardedPhonebook
+from src.snapshot import convert, read_snapshot, store_from_items
+from src.storages import iter_json_table
+from src.transfer import FORMATS, export_contacts, import_contacts
+
+SIZES = ("1k", "10k", "100k")
+REPEAT = 5
+THRESHOLD = 0.25
+MIN_SECONDS = 0.001
+FILTER_FIELDS = ("last_name", "first_name", "patronymic", "organization", "office_number", "personal_number")
+BACKENDS = {
+    "json": ({"journal": False}, ".json"),
+    "write-behind": ({"write_behind": True}, ".json"),
+    "journal": ({"journal": True}, ".json"),
+    "shared": ({"write_behind": True, "shared": True}, ".json"),
+    "compact": ({"compact": True}, ".json"),
+    "snapshot": ({}, ".snap"),
+    "sqlite": ({}, ".db"),
+}
+METRICS = ("per_op", "peak_rss", "bytes_written")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_MARKER = "Главное меню".encode()
+
+
+def written_bytes() -> int | None:
+    """Количество байт, переданных процессом в системные вызовы записи (wchar из /proc/self/io).
+
+    Returns:
+        Количество байт или None, если /proc/self/io недоступен.
+    """
+    try:
+        with open("/proc/self/io", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def peak_rss() -> int:
+    """Пиковый размер резидентной памяти процесса в байтах."""
+    rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Recorder:
+    """Замер времени, пиковой памяти и объема записи операций."""
+
+    def __init__(self) -> None:
+        self.results: dict = {}
+
+    def measure(self, name: str, function, ops: int = 1):
+        """Выполнение function с замером.
+
+        Args:
+            name: Название операции в результатах.
+            function: Функция без аргументов, выполняющая ops операций.
+            ops: Количество операций, выполняемых function.
+
+        Returns:
+            Результат function.
+        """
+        written_before: int | None = written_bytes()
+        start: float = time.perf_counter()
+        result = function()
+        seconds: float = time.perf_counter() - start
+        written_after: int | None = written_bytes()
+        self.results[name] = {
+            "ops": ops,
+            "seconds": seconds,
+            "per_op": seconds / ops if ops else 0.0,
+            "peak_rss": peak_rss(),
+            "bytes_written": None if written_before is None else written_after - written_before,
+        }
+        return result
+
+
+def time_to_menu(path: str) -> dict:
+    """Запуск приложения (View.draw_main_menu) на файле path в отдельном процессе и выход из меню.
+
+    Returns:
+        Словарь {"menu": секунд до вывода главного меню, "exit": секунд до завершения процесса, "peak_rss": пиковая
+        память процесса в байтах}. Завершение процесса включает ожидание загрузки базы и ее закрытие.
+    """
+    env: dict = {**os.environ, "PYTHONPATH": ROOT, "PYTHONUNBUFFERED": "1"}
+    start: float = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", f"from src.view import View; View({path!r}).draw_main_menu()"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env,
+    )
+    menu: float | None = None
+    for line in process.stdout:
+        if menu is None and MENU_MARKER in line:
+            menu = time.perf_counter() - start
+            process.stdin.write(b"0\n")
+            process.stdin.close()
+    if process.wait() != 0 or menu is None:
+        raise RuntimeError(f"Приложение завершилось с кодом {process.returncode}")
+    rss: int = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "menu": menu,
+        "exit": time.perf_counter() - start,
+        "peak_rss": rss if sys.platform == "darwin" else rss * 1024,
+    }
+
+
+def measure_sharding(recorder: Recorder, path: str, contacts: list, samples: list, shards: int,
+                     options: dict) -> None:
+    """Замер ShardedPhonebook из shards шардов на 1..shards рабочих процессах.
+
+    Операции sharded_find_contacts_{N}w (поиск по подстроке рабочего номера) и sharded_count_contacts_{N}w (подсчет
+    по началу фамилии) дополнительно содержат "speedup" - ускорение относительно одного процесса.
+    """
+    for workers in range(1, shards + 1):
+        phonebook: ShardedPhonebook = ShardedPhonebook(path, shards, workers, **options)
+        if workers == 1:
+            recorder.measure("sharded_add_contacts", lambda: phonebook.add_contacts(contacts), len(contacts))
+        recorder.measure(
+            f"sharded_find_contacts_{workers}w",
+            lambda: [phonebook.find_contacts(office_number=sample["office_number"][3:7]) for sample in samples],
+            len(samples),
+        )
+        recorder.measure(
+            f"sharded_count_contacts_{workers}w",
+            lambda: [phonebook.count_contacts(partial=True, last_name=sample["last_name"][:2]) for sample in samples],
+            len(samples),
+        )
+        phonebook.close_db()
+        for operation in ("sharded_find_contacts", "sharded_count_contacts"):
+            single: float = recorder.results[f"{operation}_1w"]["per_op"]
+            current: dict = recorder.results[f"{operation}_{workers}w"]
+            current["speedup"] = single / current["per_op"] if current["per_op"] else None
+
+
+def measure_snapshot(recorder: Recorder, path: str, size: int) -> None:
+    """Сравнение загрузки JSON файла path и его бинарного снимка.
+
+    snapshot_read_json и snapshot_read - чтение контактов в CompactContactStore без построения индексов,
+    snapshot_open - открытие Phonebook на снимке (сравнивается с open на JSON файле), snapshot_file_size - размер
+    снимка (сравнивается с file_size).
+    """
+    snapshot_path: str = os.path.splitext(path)[0] + ".snap"
+    recorder.measure("snapshot_convert", lambda: convert(path, snapshot_path), size)
+    recorder.measure("snapshot_read_json", lambda: store_from_items(iter_json_table(path)), size)
+    recorder.measure("snapshot_read", lambda: read_snapshot(snapshot_path), size)
+    phonebook: Phonebook = recorder.measure("snapshot_open", lambda: Phonebook(snapshot_path))
+    phonebook.close_db()
+    recorder.results["snapshot_file_size"] = {"bytes": os.path.getsize(snapshot_path)}
+
+
+def run_size(size: int, seed: int = SEED, repeat: int = REPEAT, backend: str = "json", shards: int = 0) -> dict:
+    """Замер операций на справочнике из size контактов.
+
+    Args:
+        size: Количество контактов в справочнике.
+        seed: Зерно генератора контактов.
+        repeat: Количество повторов для одиночных операций (добавление, поиск, обновление, удаление).
+        backend: Хранилище из BACKENDS.
+        shards: Количество шардов для замера ShardedPhonebook (см. measure_sharding). 0 - без замера.
+
+    Returns:
+        Словарь название операции -> {"ops", "seconds", "per_op", "peak_rss", "bytes_written"}.
+    """
+    options, extension = BACKENDS[backend]
+    directory: str = tempfile.mkdtemp(prefix="phonebook-bench-")
+    cwd: str = os.getcwd()
+    os.chdir(directory)
+    try:
+        from src.view import View
+
+        path: str = os.path.join(directory, "bench" + extension)
+        contacts: list = list(generate_contacts(size + repeat, seed))
+        new_contacts: list = contacts[size:]
+        contacts = contacts[:size]
+        samples: list = [contacts[position * size // repeat] for position in range(repeat)] if size else []
+        recorder: Recorder = Recorder()
+
+        phonebook = Phonebook(path, **options)
+        recorder.measure("bulk_load", lambda: phonebook.add_contacts(contacts), len(contacts))
+        phonebook.close_db()
+
+        phonebook = recorder.measure("open", lambda: Phonebook(path, **options))
+        recorder.measure(
+            "add_contact", lambda: [phonebook.add_contact(**contact) for contact in new_contacts], len(new_contacts)
+        )
+        for count in range(1, len(FILTER_FIELDS) + 1):
+            fields: tuple = FILTER_FIELDS[:count]
+            recorder.measure(
+                f"get_contacts_{count}",
+                lambda: [phonebook.get_contacts(**{field: sample[field] for field in fields}) for sample in samples],
+                len(samples),
+            )
+        recorder.measure(
+            "update_contact",
+            lambda: [
+                phonebook.update_contact(sample["personal_number"], organization="Бенчмарк") for sample in samples
+            ],
+            len(samples),
+        )
+        recorder.measure(
+            "delete_contact",
+            lambda: [phonebook.delete_contact(contact["personal_number"]) for contact in new_contacts],
+            len(new_contacts),
+        )
+        recorder.measure("get_sorted_contacts", phonebook.get_sorted_contacts)
+        for file_format in FORMATS:
+            export_path: str = os.path.join(directory, "export." + file_format)
+            with open(export_path, "w", encoding="utf-8", newline="") as file:
+                recorder.measure(f"export_{file_format}", lambda: export_contacts(phonebook, file, file_format), size)
+            target = Phonebook(os.path.join(directory, f"import_{file_format}{extension}"), **options)
+            with open(export_path, encoding="utf-8", newline="") as file:
+                recorder.measure(f"import_{file_format}", lambda: import_contacts(target, file, file_format), size)
+            target.close_db()
+        all_contacts: list = phonebook.get_all_contacts()
+        sorted_list: list = recorder.measure("view_get_sorted_list", lambda: View.get_sorted_list(all_contacts))
+        recorder.measure("view_get_paginated_list", lambda: View.get_paginated_list(sorted_list))
+        recorder.measure("close", phonebook.close_db)
+        recorder.results["file_size"] = {"bytes": os.path.getsize(path)}
+        if extension == ".json":
+            measure_snapshot(recorder, path, size)
+        if shards:
+            measure_sharding(recorder, os.path.join(directory, "sharded" + extension), contacts, samples, shards,
+                             options)
+        startup: dict = time_to_menu(path)
+        for name, seconds in (("view_time_to_menu", startup["menu"]), ("view_open_and_exit", startup["exit"])):
+            recorder.results[name] = {
+                "ops": 1, "seconds": seconds, "per_op": seconds, "peak_rss": startup["peak_rss"], "bytes_written": None,
+            }
+        return recorder.results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run(sizes: list, seed: int = SEED, repeat: int = REPEAT, backend: str = "json", shards: int = 0) -> dict:
+    """Замер операций для нескольких размеров справочника, каждый размер в отдельном процессе.
+
+    Returns:
+        Результаты в формате {"meta": {...}, "results": {размер: результаты run_size}}.
+    """
+    results: dict = {}
+    for size in sizes:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[str(size)] = executor.submit(run_size, size, seed, repeat, backend, shards).result()
+    return {
+        "meta": {
+            "backend": backend,
+            "seed": seed,
+            "repeat": repeat,
+            "shards": shards,
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> list:
+    """Сравнение результатов с сохраненным базовым замером.
+
+    Регрессией считается рост метрики больше чем в 1 + threshold раз. Время операций короче MIN_SECONDS не
+    сравнивается, так как определяется в основном шумом.
+
+    Returns:
+        Список строк [размер, операция, метрика, было, стало, отношение, регрессия] для всех общих метрик.
+    """
+    rows: list = []
+    for size, operations in current["results"].items():
+        for name, metrics in operations.items():
+            old_metrics: dict = baseline["results"].get(size, {}).get(name, {})
+            for metric in METRICS:
+                old, new = old_metrics.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                ratio: float = new / old
+                regression: bool = ratio > 1 + threshold
+                if metric == "per_op" and max(old, new) * metrics["ops"] < MIN_SECONDS:
+                    regression = False
+                rows.append([size, name, metric, old, new, round(ratio, 2), regression])
+    return rows
+
+
+def print_results(data: dict) -> None:
+    for size, operations in data["results"].items():
+        print(f"\nКонтактов: {size}")
+        table: list = [
+            [name, metrics.get("ops"), metrics.get("seconds"), metrics.get("per_op"), metrics.get("peak_rss"),
+             metrics.get("bytes_written", metrics.get("bytes")), metrics.get("speedup")]
+            for name, metrics in operations.items()
+        ]
+        print(tabulate(table, headers=["Операция", "Операций", "Всего, с", "На операцию, с", "Пик RSS, байт",
+                                       "Записано, байт", "Ускорение"]))
+
+
+def print_comparison(rows: list) -> bool:
+    """Вывод сравнения с базовым замером.
+
+    Returns:
+        True, если найдены регрессии.
+    """
+    regressions: list = [row for row in rows if row[-1]]
+    print(tabulate(regressions or rows, headers=["Размер", "Операция", "Метрика", "Было", "Стало", "Отношение",
+                                                 "Регрессия"]))
+    print(f"\nРегрессий: {len(regressions)}")
+    return bool(regressions)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочные тесты телефонного справочника.")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="размеры справочника через запятую, например 1k,10k")
+    parser.add_argument("--seed", type=int, default=SEED, help="зерно генератора контактов")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="количество повторов одиночных операций")
+    parser.add_argument("--backend", choices=BACKENDS, default="json", help="хранилище справочника")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="замерить поиск в справочнике из N шардов на 1..N процессах")
+    parser.add_argument("--output", help="файл для сохранения результатов в JSON")
+    parser.add_argument("--baseline", help="файл базового замера для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="допустимый относительный рост метрик")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="сравнить два сохраненных замера без запуска тестов")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline: dict = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            current: dict = json.load(file)
+        return int(print_comparison(compare(baseline, current, args.threshold)))
+
+    data: dict = run([parse_count(size) for size in args.sizes.split(",")], args.seed, args.repeat, args.backend,
+                     args.shards)
+    print_results(data)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        return int(print_comparison(compare(baseline, data, args.threshold)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
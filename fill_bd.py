@@ -1,38 +1,76 @@
-"""Файл для генерации тестовой базы данных"""
+"""Файл для генерации тестовой базы данных
 
-from tinydb import TinyDB
-import random
-
-CONTACTS_COUNT = 100
+Пример запуска:
+    python3 fill_bd.py --count 100k --seed 42 --path phonebook.json
+"""
 
+import argparse
+import random
+from typing import Iterator
 
-def generate_number():
-    return random.randint(10000000000, 99999999999)
+from src.phonebook import Phonebook
 
+CONTACTS_COUNT = 100
+SEED = 0
 
 first_names: list = ["Майкл", "Джимм", "Дуайт", "Пэм"]
 last_names: list = ["Скотт", "Халперт", "Шрутт", "Бисли"]
 patronymics: list = ["Иванович", "Петрович", "Николаевич"]
 organizations: list = ["Dunder Mifflin", "Facebook", "Пятёрочка"]
 
-db = TinyDB('phonebook.json')
-personal_numbers = set()
-
-for _ in range(CONTACTS_COUNT):
-    while True:
-        personal_number = generate_number()
-        if personal_number not in personal_numbers:
-            personal_numbers.add(personal_number)
-            break
-    office_number = generate_number()
-
-    record = {
-        'first_name': random.choice(first_names),
-        'last_name': random.choice(last_names),
-        'patronymic': random.choice(patronymics),
-        'organization': random.choice(organizations),
-        'office_number': str(office_number),
-        'personal_number': str(personal_number)
-    }
-
-    db.insert(record)
+
+def generate_number(rnd: random.Random) -> int:
+    return rnd.randint(10000000000, 99999999999)
+
+
+def generate_contacts(count: int = CONTACTS_COUNT, seed: int = SEED) -> Iterator[dict]:
+    """Генерация контактов с уникальными личными номерами.
+
+    Args:
+        count: Количество контактов.
+        seed: Зерно генератора случайных чисел. Одинаковое зерно дает одинаковые контакты.
+
+    Returns:
+        Итератор по контактам в формате Phonebook.add_contact.
+    """
+    rnd: random.Random = random.Random(seed)
+    personal_numbers: set = set()
+    for _ in range(count):
+        while True:
+            personal_number = generate_number(rnd)
+            if personal_number not in personal_numbers:
+                personal_numbers.add(personal_number)
+                break
+        office_number = generate_number(rnd)
+
+        yield {
+            'first_name': rnd.choice(first_names),
+            'last_name': rnd.choice(last_names),
+            'patronymic': rnd.choice(patronymics),
+            'organization': rnd.choice(organizations),
+            'office_number': str(office_number),
+            'personal_number': str(personal_number)
+        }
+
+
+def parse_count(value: str) -> int:
+    """Разбор количества контактов с суффиксами k и M, например 10k или 1M."""
+    multipliers: dict = {"k": 1_000, "K": 1_000, "m": 1_000_000, "M": 1_000_000}
+    if value and value[-1] in multipliers:
+        return int(value[:-1]) * multipliers[value[-1]]
+    return int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация тестовой базы данных телефонного справочника.")
+    parser.add_argument("--count", type=parse_count, default=CONTACTS_COUNT,
+                        help="количество контактов, например 10k, 100k или 1M")
+    parser.add_argument("--seed", type=int, default=SEED, help="зерно генератора случайных чисел")
+    parser.add_argument("--path", default="phonebook.json", help="файл базы данных")
+    args = parser.parse_args()
+
+    phonebook = Phonebook(args.path)
+    report: list = phonebook.add_contacts(generate_contacts(args.count, args.seed))
+    phonebook.close_db()
+    created: int = sum(result["success"] for result in report)
+    print(f"Создано контактов: {created}, отклонено: {len(report) - created}")
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import Executor
+from typing import Iterable
+
+from src.backends import SQLITE_EXTENSIONS
+from src.metrics import Histogram
+from src.phonebook import Phonebook
+
+FLUSH_DELAY = 0.005
+
+
+class AsyncPhonebook:
+    """Асинхронный интерфейс телефонного справочника для asyncio.
+
+    Контакты и индексы хранятся в памяти (Phonebook в режиме отложенной записи без сброса по счетчику и таймеру),
+    поэтому поиск и изменения выполняются в потоке цикла событий без обращения к диску. Запись на диск выполняется
+    в пуле потоков (run_in_executor).
+
+    Сбросы на диск объединяются: после изменения корутина ждет сброса, который запускается через flush_delay
+    секунд после первого несохраненного изменения. Все изменения, сделанные за это время, записываются одним
+    сбросом, и все ожидающие их корутины продолжают работу после него. Поэтому add_contact, update_contact и
+    delete_contact возвращают результат только после записи изменения на диск.
+
+    Пока сброс выполняется, операции ждут его завершения, не блокируя цикл событий: Phonebook не изменяется во
+    время записи его снимка.
+
+    Пример:
+        phonebook = await AsyncPhonebook.open("phonebook.json")
+        await phonebook.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", "89991575656")
+        contacts = await phonebook.get_contacts(last_name="Иванов")
+        await phonebook.close()
+    """
+
+    def __init__(self, file_path: str = "phonebook.json", flush_delay: float = FLUSH_DELAY,
+                 executor: Executor | None = None, **options) -> None:
+        """
+        Конструктор читает файл базы данных в текущем потоке. Внутри цикла событий используйте AsyncPhonebook.open.
+
+        Args:
+            file_path: Путь к JSON файлу базы данных. SQLite не поддерживается, так как каждое изменение в нем
+                сразу записывается на диск.
+            flush_delay: Время в секундах, в течение которого изменения накапливаются перед сбросом на диск.
+            executor: Пул потоков для записи на диск. None - пул цикла событий по умолчанию.
+            **options: Параметры Phonebook: indexed_fields, prefix_fields, substring_fields, fsync, journal,
+                compact_threshold, compact. Режим записи (write_behind, flush_every, flush_interval) задается
+                AsyncPhonebook, режим shared не поддерживается.
+        """
+        if os.path.splitext(file_path)[1].lower() in SQLITE_EXTENSIONS:
+            raise ValueError("AsyncPhonebook не поддерживает базы данных SQLite")
+        if options.get("shared"):
+            raise ValueError("AsyncPhonebook не поддерживает режим shared")
+        self.flush_delay: float = flush_delay
+        self.__executor: Executor | None = executor
+        self.__phonebook: Phonebook = Phonebook(
+            file_path, write_behind=True, flush_every=sys.maxsize, flush_interval=None, **options
+        )
+        self.__flushing: asyncio.Future | None = None
+        self.__next_flush: asyncio.Future | None = None
+        self.__waiters: int = 0
+        self.__flush_task: asyncio.Task | None = None
+        self.__batch_sizes: Histogram = Histogram()
+
+    @classmethod
+    async def open(cls, file_path: str = "phonebook.json", flush_delay: float = FLUSH_DELAY,
+                   executor: Executor | None = None, **options) -> "AsyncPhonebook":
+        """Открытие справочника с чтением файла в пуле потоков. Параметры как у конструктора."""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, lambda: cls(file_path, flush_delay, executor, **options))
+
+    async def get_all_contacts(self) -> list:
+        await self.__idle()
+        return self.__phonebook.get_all_contacts()
+
+    async def get_contacts(self, **kwargs) -> list:
+        """Поиск списка контактов по точному совпадению (см. Phonebook.get_contacts)."""
+        await self.__idle()
+        return self.__phonebook.get_contacts(**kwargs)
+
+    async def find_contacts(self, **kwargs) -> list:
+        """Поиск списка контактов по частичному совпадению (см. Phonebook.find_contacts)."""
+        await self.__idle()
+        return self.__phonebook.find_contacts(**kwargs)
+
+    async def count_contacts(self, partial: bool = False, **kwargs) -> int:
+        """Количество контактов, удовлетворяющих условиям поиска (см. Phonebook.count_contacts)."""
+        await self.__idle()
+        return self.__phonebook.count_contacts(partial, **kwargs)
+
+    async def add_contact(self, first_name: str, last_name: str, patronymic: str, organization: str,
+                          office_number: str, personal_number: str) -> dict:
+        """Добавление контакта (см. Phonebook.add_contact). Результат возвращается после записи на диск."""
+        await self.__idle()
+        result: dict = self.__phonebook.add_contact(
+            first_name, last_name, patronymic, organization, office_number, personal_number
+        )
+        if result["success"]:
+            await self.__committed()
+        return result
+
+    async def add_contacts(self, contacts: Iterable[dict], batch_size: int = 1000) -> list:
+        """Массовое добавление контактов (см. Phonebook.add_contacts). Результат возвращается после записи на диск."""
+        await self.__idle()
+        report: list = self.__phonebook.add_contacts(contacts, batch_size)
+        if any(result["success"] for result in report):
+            await self.__committed()
+        return report
+
+    async def update_contact(self, personal_num: str, **kwargs) -> dict:
+        """Обновление контакта (см. Phonebook.update_contact). Результат возвращается после записи на диск."""
+        await self.__idle()
+        result: dict = self.__phonebook.update_contact(personal_num, **kwargs)
+        if result["success"]:
+            await self.__committed()
+        return result
+
+    async def delete_contact(self, personal_number: str) -> dict:
+        """Удаление контакта (см. Phonebook.delete_contact). Результат возвращается после записи на диск."""
+        await self.__idle()
+        result: dict = self.__phonebook.delete_contact(personal_number)
+        if result["success"]:
+            await self.__committed()
+        return result
+
+    async def flush(self) -> None:
+        """Немедленная запись несохраненных изменений на диск."""
+        await self.__idle()
+        if self.__next_flush is None:
+            self.__next_flush = asyncio.get_running_loop().create_future()
+        waiter: asyncio.Future = self.__next_flush
+        self.__start_flush()
+        await asyncio.shield(waiter)
+
+    async def close(self) -> None:
+        """Запись несохраненных изменений и закрытие базы данных."""
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(self.__executor, self.__phonebook.close_db)
+
+    async def stats(self) -> dict:
+        """Статистика Phonebook (см. Phonebook.stats) и "flush_batches" - гистограмма количества изменений,
+        записанных одним сбросом на диск."""
+        await self.__idle()
+        return {**self.__phonebook.stats(), "flush_batches": self.__batch_sizes.snapshot()}
+
+    async def __idle(self) -> None:
+        """Ожидание завершения выполняющегося сброса на диск."""
+        while self.__flushing is not None:
+            await asyncio.wait({self.__flushing})
+
+    async def __committed(self) -> None:
+        """Ожидание сброса на диск, который запишет последнее изменение. Первое изменение планирует сброс."""
+        if self.__next_flush is None:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            self.__next_flush = loop.create_future()
+            self.__flush_task = loop.create_task(self.__scheduled_flush())
+        self.__waiters += 1
+        await asyncio.shield(self.__next_flush)
+
+    async def __scheduled_flush(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.__idle()
+        if self.__next_flush is not None:
+            self.__start_flush()
+
+    def __start_flush(self) -> None:
+        """Запуск сброса на диск всех изменений, сделанных до этого момента."""
+        waiter, self.__next_flush = self.__next_flush, None
+        waiters, self.__waiters = self.__waiters, 0
+        self.__flushing = asyncio.get_running_loop().create_task(self.__write(waiter, waiters))
+
+    async def __write(self, waiter: asyncio.Future, waiters: int) -> None:
+        """Запись в пуле потоков. Результат или ошибка записи передается корутинам, ожидающим waiter.
+
+        Запись выполняется в отдельной задаче, поэтому отмена ожидающей корутины не прерывает ее.
+        """
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.__executor, self.__phonebook.flush)
+        except Exception as error:
+            waiter.set_exception(error)
+            waiter.exception()
+        else:
+            waiter.set_result(None)
+            if waiters:
+                self.__batch_sizes.observe(waiters)
+        finally:
+            self.__flushing = None
@@ -0,0 +1,642 @@
+import argparse
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
+from tinydb import TinyDB, Query
+
+from src.cache import Cache, filters_key
+from src.compact import CONTACT_FIELDS, CompactContactStore
+from src.snapshot import SnapshotStorage, is_snapshot
+from src.storages import FlushPolicy, JournalStorage, JSONFileStorage, WriteBehindMiddleware, iter_json_table
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+SQLITE_SYNCHRONOUS = {"always": "FULL", "close": "NORMAL", "never": "OFF"}
+SQLITE_MAX_VARIABLES = 500
+
+
+class Backend(ABC):
+    """Хранилище контактов, используемое Phonebook.
+
+    Хранилище отвечает только за сохранение документов по их id. Валидация, уникальность личного номера и индексы
+    для поиска реализованы в Phonebook и одинаковы для всех хранилищ.
+
+    Атрибут concurrent_reads показывает, можно ли вызывать читающие методы из нескольких потоков одновременно.
+    """
+
+    concurrent_reads: bool = False
+
+    @abstractmethod
+    def items(self) -> Iterator[tuple]:
+        """Итератор по парам (id, контакт) в порядке хранения."""
+
+    @abstractmethod
+    def all(self) -> list:
+        """Список всех контактов в порядке хранения."""
+
+    @abstractmethod
+    def get(self, doc_id: int) -> dict | None:
+        """Получение контакта по id."""
+
+    @abstractmethod
+    def get_many(self, doc_ids: list) -> list:
+        """Получение пар (id, контакт) по списку id в порядке doc_ids. Отсутствующие id пропускаются."""
+
+    @abstractmethod
+    def insert(self, document: dict) -> int:
+        """Добавление контакта.
+
+        Returns:
+            id добавленного контакта.
+        """
+
+    @abstractmethod
+    def insert_many(self, documents: list) -> list:
+        """Добавление нескольких контактов одной записью на диск.
+
+        Returns:
+            Список id добавленных контактов в порядке documents.
+        """
+
+    @abstractmethod
+    def update(self, doc_id: int, fields: dict) -> None:
+        """Обновление полей контакта.
+
+        Raises:
+            ValueError: Поле не является полем контакта или его значение не строка (см. _check_fields). Все хранилища
+                проверяют поля одинаково, Phonebook проверяет изменения до обращения к хранилищу.
+        """
+
+    @abstractmethod
+    def remove(self, doc_id: int) -> None:
+        """Удаление контакта."""
+
+    @abstractmethod
+    def update_many(self, doc_ids: list, fields: dict) -> None:
+        """Обновление одинаковых полей нескольких контактов одной записью на диск. Поля проверяются как в update."""
+
+    @abstractmethod
+    def remove_many(self, doc_ids: list) -> None:
+        """Удаление нескольких контактов одной записью на диск."""
+
+    @abstractmethod
+    def search(self, filters: dict) -> list:
+        """Поиск пар (id, контакт), у которых все поля filters имеют заданные значения, в порядке хранения."""
+
+    def flush(self) -> None:
+        """Запись несохраненных изменений на диск."""
+
+    def io_stats(self) -> dict:
+        """Статистика записи на диск.
+
+        Returns:
+            Словарь с ключами "writes" (количество записей файла), "bytes_written" (всего записано байт) и
+            "bytes_per_write" (сводка Histogram по размеру записи). Хранилища без такой статистики возвращают
+            пустой словарь.
+        """
+        return {}
+
+    @abstractmethod
+    def close(self) -> None:
+        """Закрытие хранилища."""
+
+
+def _check_fields(fields: dict) -> None:
+    """Проверка изменений контакта перед записью в хранилище: только поля контакта со строковыми значениями."""
+    for field, value in fields.items():
+        if field not in CONTACT_FIELDS:
+            raise ValueError(f"Неизвестное поле контакта: {field}")
+        if not isinstance(value, str):
+            raise ValueError(f"Значение поля {field} должно быть строкой")
+
+
+def _storage_io_stats(storage) -> dict:
+    """Статистика записи хранилища с атрибутами bytes_written и write_sizes в формате Backend.io_stats."""
+    return {
+        "writes": storage.write_sizes.count,
+        "bytes_written": storage.bytes_written,
+        "bytes_per_write": storage.write_sizes.snapshot(),
+    }
+
+
+class TinyDBBackend(Backend):
+    """Хранилище контактов в JSON файле TinyDB."""
+
+    def __init__(self, file_path: str, lock=None, write_behind: bool = False, flush_every: int = 1000,
+                 flush_interval: float | None = 5.0, fsync: str = "always", query_cache: Cache | None = None) -> None:
+        """
+        Args:
+            file_path: Путь к файлу базы данных.
+            lock: Блокировка, под которой вызывающий код выполняет операции. Используется фоновым сбросом
+                отложенной записи.
+            write_behind: Режим отложенной записи (см. WriteBehindMiddleware).
+            flush_every: Количество изменений между сбросами на диск в режиме отложенной записи.
+            flush_interval: Максимальное время в секундах между изменением и его записью на диск.
+            fsync: Политика fsync: "always", "close" или "never".
+            query_cache: Кэш собранных запросов TinyDB для search. Ключи кэша - ("tinydb", условия), поэтому кэш
+                можно разделять с другими кэшами предикатов.
+        """
+        self.__queries: Cache = query_cache if query_cache is not None else Cache()
+        if write_behind:
+            storage = WriteBehindMiddleware(JSONFileStorage, flush_every, flush_interval, lock)
+        else:
+            storage = JSONFileStorage
+        self.__db: TinyDB = TinyDB(file_path, storage=storage, fsync=fsync)
+
+    def items(self) -> Iterator[tuple]:
+        for document in self.__db.all():
+            yield document.doc_id, document
+
+    def all(self) -> list:
+        return self.__db.all()
+
+    def get(self, doc_id: int) -> dict | None:
+        return self.__db.get(doc_id=doc_id)
+
+    def get_many(self, doc_ids: list) -> list:
+        if not doc_ids:
+            return []
+        if isinstance(self.__db.storage, WriteBehindMiddleware) and len(doc_ids) * 256 < len(self.__db):
+            # Таблица в кэше: чтение по одному id - поиск в словаре, а get(doc_ids=...) просматривает всю таблицу.
+            # Просмотр таблицы примерно в 256 раз дороже чтения одного id, поэтому для больших выборок он быстрее.
+            found = ((doc_id, self.__db.get(doc_id=doc_id)) for doc_id in doc_ids)
+            return [(doc_id, document) for doc_id, document in found if document is not None]
+        documents: dict = {document.doc_id: document for document in self.__db.get(doc_ids=doc_ids)}
+        return [(doc_id, documents[doc_id]) for doc_id in doc_ids if doc_id in documents]
+
+    def insert(self, document: dict) -> int:
+        return self.__db.insert(document)
+
+    def insert_many(self, documents: list) -> list:
+        if not documents:
+            return []
+        return self.__db.insert_multiple(documents)
+
+    def update(self, doc_id: int, fields: dict) -> None:
+        _check_fields(fields)
+        self.__db.update(fields, doc_ids=[doc_id])
+
+    def remove(self, doc_id: int) -> None:
+        self.__db.remove(doc_ids=[doc_id])
+
+    def update_many(self, doc_ids: list, fields: dict) -> None:
+        _check_fields(fields)
+        if doc_ids:
+            self.__db.update(fields, doc_ids=doc_ids)
+
+    def remove_many(self, doc_ids: list) -> None:
+        if doc_ids:
+            self.__db.remove(doc_ids=doc_ids)
+
+    def search(self, filters: dict) -> list:
+        if not filters:
+            return list(self.items())
+        key: tuple | None = filters_key(filters)
+        search_query = self.__queries.get(("tinydb", key)) if key is not None else None
+        if search_query is None:
+            search_query = self.__make_query(filters)
+            if key is not None:
+                self.__queries.put(("tinydb", key), search_query)
+        return [(document.doc_id, document) for document in self.__db.search(search_query)]
+
+    def flush(self) -> None:
+        storage = self.__db.storage
+        if isinstance(storage, WriteBehindMiddleware):
+            storage.flush()
+
+    def io_stats(self) -> dict:
+        storage = self.__db.storage
+        if isinstance(storage, WriteBehindMiddleware):
+            return {**_storage_io_stats(storage.storage), "flushes": storage.flush_count, "pending": storage.pending}
+        return _storage_io_stats(storage)
+
+    def close(self) -> None:
+        self.__db.close()
+
+    @staticmethod
+    def __make_query(filters: dict):
+        """Сборка запроса TinyDB: все поля filters равны заданным значениям."""
+        query: Query = Query()
+        search_query = None
+        for key, value in filters.items():
+            if search_query is None:
+                search_query = (query[key] == value)
+            else:
+                search_query &= (query[key] == value)
+        return search_query
+
+
+class JournalBackend(Backend):
+    """Хранилище контактов в JSON файле TinyDB с журналом изменений (см. JournalStorage).
+
+    Контакты хранятся в памяти в словаре по id, каждая операция записи дописывает в журнал только записи измененных
+    контактов: чтение и изменение по id не зависят от количества контактов. Журнал сворачивается в JSON файл в фоне
+    и при закрытии, поэтому файл остается читаемым TinyDBBackend.
+    """
+
+    TABLE = "_default"
+
+    def __init__(self, file_path: str, fsync: str = "always", compact_threshold: int = 4 * 1024 * 1024) -> None:
+        """
+        Args:
+            file_path: Путь к JSON файлу базы данных.
+            fsync: Политика fsync журнала: "always", "close" или "never".
+            compact_threshold: Размер журнала в байтах, после которого запускается уплотнение.
+        """
+        self.__storage: JournalStorage = JournalStorage(file_path, fsync=fsync, compact_threshold=compact_threshold)
+        self.__next_id: int = max(map(int, self.__table()), default=0) + 1
+
+    def items(self) -> Iterator[tuple]:
+        for doc_id, document in list(self.__table().items()):
+            yield int(doc_id), dict(document)
+
+    def all(self) -> list:
+        return [document for _, document in self.items()]
+
+    def get(self, doc_id: int) -> dict | None:
+        document: dict | None = self.__table().get(str(doc_id))
+        return None if document is None else dict(document)
+
+    def get_many(self, doc_ids: list) -> list:
+        table: dict = self.__table()
+        return [(doc_id, dict(table[str(doc_id)])) for doc_id in doc_ids if str(doc_id) in table]
+
+    def insert(self, document: dict) -> int:
+        return self.insert_many([document])[0]
+
+    def insert_many(self, documents: list) -> list:
+        doc_ids: list = list(range(self.__next_id, self.__next_id + len(documents)))
+        self.__next_id += len(documents)
+        self.__storage.write(self.TABLE, {str(doc_id): dict(document) for doc_id, document in zip(doc_ids, documents)})
+        return doc_ids
+
+    def update(self, doc_id: int, fields: dict) -> None:
+        self.update_many([doc_id], fields)
+
+    def remove(self, doc_id: int) -> None:
+        self.remove_many([doc_id])
+
+    def update_many(self, doc_ids: list, fields: dict) -> None:
+        _check_fields(fields)
+        table: dict = self.__table()
+        self.__storage.write(self.TABLE, {
+            str(doc_id): {**table[str(doc_id)], **fields} for doc_id in doc_ids if str(doc_id) in table
+        })
+
+    def remove_many(self, doc_ids: list) -> None:
+        table: dict = self.__table()
+        self.__storage.write(self.TABLE, {str(doc_id): None for doc_id in doc_ids if str(doc_id) in table})
+
+    def search(self, filters: dict) -> list:
+        return [
+            (doc_id, document) for doc_id, document in self.items()
+            if all(document.get(key) == value for key, value in filters.items())
+        ]
+
+    def io_stats(self) -> dict:
+        return _storage_io_stats(self.__storage)
+
+    def close(self) -> None:
+        self.__storage.close()
+
+    def __table(self) -> dict:
+        return self.__storage.table(self.TABLE)
+
+
+class CompactBackend(Backend):
+    """Хранилище контактов в компактном колоночном представлении (см. CompactContactStore).
+
+    Контакты хранятся в памяти в колонках с интернированными строками, хранилище выдает легковесные ContactRow
+    (Phonebook приводит их к dict). На диск изменения записываются в JSON файл формата TinyDB с отложенной
+    записью: после flush_every изменений, через flush_interval секунд, при вызове flush() и при закрытии.
+
+    Файл читается потоково (см. iter_json_table) при первом обращении к хранилищу. Первый вызов items() отдает
+    контакты по мере чтения файла, поэтому Phonebook строит индексы и компактные строки за один проход, не держа в
+    памяти дерево JSON.
+
+    Файлы снимков (см. src.snapshot) читаются и записываются в бинарном формате: колонки загружаются целиком без
+    разбора контактов по одному.
+    """
+
+    concurrent_reads = True
+
+    def __init__(self, file_path: str, lock=None, flush_every: int = 1000, flush_interval: float | None = 5.0,
+                 fsync: str = "always", progress=None) -> None:
+        """
+        Args:
+            file_path: Путь к JSON файлу базы данных или к файлу бинарного снимка (см. is_snapshot).
+            lock: Блокировка, под которой вызывающий код выполняет операции. Используется фоновым сбросом.
+            flush_every: Количество изменений между сбросами на диск.
+            flush_interval: Максимальное время в секундах между изменением и его записью на диск.
+            fsync: Политика fsync: "always", "close" или "never".
+            progress: Функция progress(прочитано_байт, размер_файла) для отображения хода загрузки.
+        """
+        self.__file_path: str = file_path
+        self.__progress = progress
+        self.__storage: JSONFileStorage | SnapshotStorage = (
+            SnapshotStorage(file_path, fsync=fsync) if is_snapshot(file_path)
+            else JSONFileStorage(file_path, fsync=fsync)
+        )
+        self.__store: CompactContactStore = CompactContactStore()
+        self.__loaded: bool = False
+        self.policy: FlushPolicy = FlushPolicy(self.flush, flush_every, flush_interval, lock)
+
+    def items(self) -> Iterator[tuple]:
+        if not self.__loaded:
+            yield from self.__load()
+            return
+        for doc_id in self.__store.ids():
+            yield doc_id, self.__store.get(doc_id)
+
+    def all(self) -> list:
+        return [document for _, document in self.items()]
+
+    def get(self, doc_id: int) -> dict | None:
+        self.__ensure_loaded()
+        return self.__store.get(doc_id)
+
+    def get_many(self, doc_ids: list) -> list:
+        self.__ensure_loaded()
+        return [(doc_id, self.__store.get(doc_id)) for doc_id in doc_ids if doc_id in self.__store]
+
+    def insert(self, document: dict) -> int:
+        self.__ensure_loaded()
+        doc_id: int = self.__store.append(document)
+        self.policy.changed()
+        return doc_id
+
+    def insert_many(self, documents: list) -> list:
+        self.__ensure_loaded()
+        doc_ids: list = [self.__store.append(document) for document in documents]
+        if doc_ids:
+            self.policy.changed()
+        return doc_ids
+
+    def update(self, doc_id: int, fields: dict) -> None:
+        _check_fields(fields)
+        self.__ensure_loaded()
+        self.__store.update(doc_id, fields)
+        self.policy.changed()
+
+    def remove(self, doc_id: int) -> None:
+        self.__ensure_loaded()
+        self.__store.remove(doc_id)
+        self.policy.changed()
+
+    def update_many(self, doc_ids: list, fields: dict) -> None:
+        _check_fields(fields)
+        self.__ensure_loaded()
+        for doc_id in doc_ids:
+            self.__store.update(doc_id, fields)
+        if doc_ids:
+            self.policy.changed()
+
+    def remove_many(self, doc_ids: list) -> None:
+        self.__ensure_loaded()
+        for doc_id in doc_ids:
+            self.__store.remove(doc_id)
+        if doc_ids:
+            self.policy.changed()
+
+    def search(self, filters: dict) -> list:
+        return [
+            (doc_id, document) for doc_id, document in self.items()
+            if all(document.get(key) == value for key, value in filters.items())
+        ]
+
+    def flush(self) -> None:
+        with self.policy.lock:
+            if self.policy.pending and isinstance(self.__storage, SnapshotStorage):
+                self.__storage.write(self.__store)
+            elif self.policy.pending:
+                self.__storage.write_table("_default", self.items())
+            self.policy.flushed()
+
+    def io_stats(self) -> dict:
+        return {**_storage_io_stats(self.__storage), "flushes": self.policy.flush_count, "pending": self.policy.pending}
+
+    def close(self) -> None:
+        with self.policy.lock:
+            self.flush()
+            self.__storage.close()
+
+    def __load(self) -> Iterator[tuple]:
+        if isinstance(self.__storage, SnapshotStorage):
+            self.__store = self.__storage.read()
+            self.__loaded = True
+            if self.__progress is not None:
+                size: int = os.path.getsize(self.__file_path) if os.path.exists(self.__file_path) else 0
+                self.__progress(size, size)
+            yield from self.items()
+            return
+        for doc_id, document in iter_json_table(self.__file_path, progress=self.__progress):
+            self.__store.put(doc_id, document)
+            yield doc_id, self.__store.get(doc_id)
+        self.__loaded = True
+
+    def __ensure_loaded(self) -> None:
+        if not self.__loaded:
+            for _ in self.__load():
+                pass
+
+
+class SQLiteBackend(Backend):
+    """Хранилище контактов в базе данных SQLite.
+
+    База работает в режиме WAL, каждая операция записи выполняется в транзакции. По всем полям поиска построены
+    индексы, личный номер защищен ограничением UNIQUE. Одновременное чтение из потоков допускается, если SQLite
+    собран в последовательном (serialized) режиме.
+    """
+
+    concurrent_reads = sqlite3.threadsafety == 3
+
+    def __init__(self, file_path: str, fsync: str = "always") -> None:
+        """
+        Args:
+            file_path: Путь к файлу базы данных.
+            fsync: Политика fsync, соответствует PRAGMA synchronous: "always" - FULL, "close" - NORMAL,
+                "never" - OFF.
+        """
+        self.__connection: sqlite3.Connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS[fsync]}")
+        columns: str = ", ".join(f"{field} TEXT NOT NULL" for field in CONTACT_FIELDS[:-1])
+        with self.__connection:
+            self.__connection.execute(
+                f"CREATE TABLE IF NOT EXISTS contacts (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, "
+                f"personal_number TEXT NOT NULL UNIQUE)"
+            )
+            for field in CONTACT_FIELDS[:-1]:
+                self.__connection.execute(f"CREATE INDEX IF NOT EXISTS contacts_{field} ON contacts ({field})")
+        self.__select: str = f"SELECT id, {', '.join(CONTACT_FIELDS)} FROM contacts"
+        self.__insert: str = (
+            f"INSERT INTO contacts ({', '.join(CONTACT_FIELDS)}) VALUES ({', '.join('?' * len(CONTACT_FIELDS))})"
+        )
+
+    def items(self) -> Iterator[tuple]:
+        for row in self.__connection.execute(f"{self.__select} ORDER BY id"):
+            yield row[0], self.__to_dict(row)
+
+    def all(self) -> list:
+        return [document for _, document in self.items()]
+
+    def get(self, doc_id: int) -> dict | None:
+        row: tuple | None = self.__connection.execute(f"{self.__select} WHERE id = ?", (doc_id,)).fetchone()
+        return None if row is None else self.__to_dict(row)
+
+    def get_many(self, doc_ids: list) -> list:
+        rows: list = []
+        for start in range(0, len(doc_ids), SQLITE_MAX_VARIABLES):
+            chunk: list = doc_ids[start:start + SQLITE_MAX_VARIABLES]
+            rows.extend(self.__connection.execute(
+                f"{self.__select} WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+        documents: dict = {row[0]: self.__to_dict(row) for row in rows}
+        return [(doc_id, documents[doc_id]) for doc_id in doc_ids if doc_id in documents]
+
+    def insert(self, document: dict) -> int:
+        with self.__connection:
+            cursor: sqlite3.Cursor = self.__connection.execute(
+                self.__insert, [document[field] for field in CONTACT_FIELDS]
+            )
+        return cursor.lastrowid
+
+    def insert_many(self, documents: list) -> list:
+        doc_ids: list = []
+        with self.__connection:
+            for document in documents:
+                cursor: sqlite3.Cursor = self.__connection.execute(
+                    self.__insert, [document[field] for field in CONTACT_FIELDS]
+                )
+                doc_ids.append(cursor.lastrowid)
+        return doc_ids
+
+    def update(self, doc_id: int, fields: dict) -> None:
+        _check_fields(fields)
+        if not fields:
+            return
+        assignments: str = ", ".join(f"{field} = ?" for field in fields)
+        with self.__connection:
+            self.__connection.execute(f"UPDATE contacts SET {assignments} WHERE id = ?", [*fields.values(), doc_id])
+
+    def remove(self, doc_id: int) -> None:
+        with self.__connection:
+            self.__connection.execute("DELETE FROM contacts WHERE id = ?", (doc_id,))
+
+    def update_many(self, doc_ids: list, fields: dict) -> None:
+        _check_fields(fields)
+        if not fields or not doc_ids:
+            return
+        assignments: str = ", ".join(f"{field} = ?" for field in fields)
+        with self.__connection:
+            for start in range(0, len(doc_ids), SQLITE_MAX_VARIABLES):
+                chunk: list = doc_ids[start:start + SQLITE_MAX_VARIABLES]
+                self.__connection.execute(
+                    f"UPDATE contacts SET {assignments} WHERE id IN ({', '.join('?' * len(chunk))})",
+                    [*fields.values(), *chunk]
+                )
+
+    def remove_many(self, doc_ids: list) -> None:
+        with self.__connection:
+            for start in range(0, len(doc_ids), SQLITE_MAX_VARIABLES):
+                chunk: list = doc_ids[start:start + SQLITE_MAX_VARIABLES]
+                self.__connection.execute(f"DELETE FROM contacts WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+
+    def search(self, filters: dict) -> list:
+        if not filters:
+            return list(self.items())
+        if any(field not in CONTACT_FIELDS for field in filters):
+            return []
+        conditions: str = " AND ".join(f"{field} = ?" for field in filters)
+        rows = self.__connection.execute(f"{self.__select} WHERE {conditions} ORDER BY id", list(filters.values()))
+        return [(row[0], self.__to_dict(row)) for row in rows]
+
+    def restore(self, items: Iterable[tuple]) -> int:
+        """Загрузка контактов с сохранением их id одной транзакцией.
+
+        Args:
+            items: Пары (id, контакт).
+
+        Returns:
+            Количество загруженных контактов.
+        """
+        with self.__connection:
+            cursor: sqlite3.Cursor = self.__connection.executemany(
+                f"INSERT INTO contacts (id, {', '.join(CONTACT_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' * len(CONTACT_FIELDS))})",
+                ([doc_id, *(document[field] for field in CONTACT_FIELDS)] for doc_id, document in items)
+            )
+        return cursor.rowcount
+
+    def io_stats(self) -> dict:
+        """Статистика изменений: SQLite не сообщает объем записи, поэтому возвращается количество измененных строк.
+
+        Returns:
+            Словарь {"rows_changed": количество}.
+        """
+        return {"rows_changed": self.__connection.total_changes}
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    @staticmethod
+    def __to_dict(row: tuple) -> dict:
+        return dict(zip(CONTACT_FIELDS, row[1:]))
+
+
+def open_backend(file_path: str, **options) -> Backend:
+    """Открытие хранилища по расширению файла.
+
+    Файлы с расширениями .db, .sqlite и .sqlite3 открываются как SQLite, бинарные снимки (.snap) - как
+    CompactBackend, остальные как JSON файл TinyDB или, при compact=True, как CompactBackend, при journal=True - как
+    JournalBackend.
+
+    Args:
+        file_path: Путь к файлу базы данных.
+        **options: Параметры хранилища TinyDBBackend, compact и progress (только для CompactBackend), journal и
+            compact_threshold (только для JournalBackend). Для SQLite используется только fsync.
+
+    Returns:
+        Открытое хранилище.
+    """
+    compact: bool = options.pop("compact", False)
+    progress = options.pop("progress", None)
+    journal: bool = options.pop("journal", False)
+    compact_threshold: int = options.pop("compact_threshold", 4 * 1024 * 1024)
+    if os.path.splitext(file_path)[1].lower() in SQLITE_EXTENSIONS:
+        return SQLiteBackend(file_path, fsync=options.get("fsync", "always"))
+    if compact or is_snapshot(file_path):
+        return CompactBackend(file_path, lock=options.get("lock"), flush_every=options.get("flush_every", 1000),
+                              flush_interval=options.get("flush_interval", 5.0), fsync=options.get("fsync", "always"),
+                              progress=progress)
+    if journal:
+        return JournalBackend(file_path, fsync=options.get("fsync", "always"), compact_threshold=compact_threshold)
+    return TinyDBBackend(file_path, **options)
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str) -> int:
+    """Перенос контактов из JSON файла TinyDB в базу данных SQLite с сохранением id.
+
+    Args:
+        json_path: Путь к JSON файлу.
+        sqlite_path: Путь к базе данных SQLite. База не должна содержать контактов с теми же id или личными номерами.
+
+    Returns:
+        Количество перенесенных контактов.
+    """
+    source: TinyDBBackend = TinyDBBackend(json_path)
+    target: SQLiteBackend = SQLiteBackend(sqlite_path)
+    try:
+        return target.restore(source.items())
+    finally:
+        source.close()
+        target.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенос телефонного справочника из JSON в SQLite.")
+    parser.add_argument("json_path", help="JSON файл справочника, например phonebook.json")
+    parser.add_argument("sqlite_path", help="файл базы данных SQLite, например phonebook.db")
+    args = parser.parse_args()
+    print(f"Перенесено контактов: {migrate_json_to_sqlite(args.json_path, args.sqlite_path)}")
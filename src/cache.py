@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+
+CACHE_POLICIES = ("lru", "fifo")
+_MISSING = object()
+
+
+class Cache:
+    """Ограниченный по размеру кэш со счетчиками попаданий, промахов, вытеснений и устаревших значений.
+
+    Политики вытеснения:
+        lru: вытесняется значение, к которому дольше всего не обращались.
+        fifo: вытесняется значение, которое дольше всего находится в кэше.
+
+    Кэш потокобезопасен. Кэш размера 0 ничего не хранит, но считает промахи.
+    """
+
+    def __init__(self, maxsize: int = 128, policy: str = "lru") -> None:
+        """
+        Args:
+            maxsize: Максимальное количество значений.
+            policy: Политика вытеснения: "lru" или "fifo".
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Неизвестная политика вытеснения: {policy}")
+        if maxsize < 0:
+            raise ValueError("Размер кэша не может быть отрицательным")
+        self.maxsize: int = maxsize
+        self.policy: str = policy
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None, is_valid=None):
+        """Значение по ключу или default, если его нет в кэше.
+
+        Args:
+            key: Ключ.
+            default: Значение, возвращаемое при промахе.
+            is_valid: Функция is_valid(значение) для проверки актуальности. Неактуальное значение удаляется из кэша
+                и считается промахом (счетчик invalidations).
+        """
+        with self.__lock:
+            value = self.__data.get(key, _MISSING)
+            if value is not _MISSING and is_valid is not None and not is_valid(value):
+                del self.__data[key]
+                self.invalidations += 1
+                value = _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.policy == "lru":
+                self.__data.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        """Сохранение значения. Если кэш заполнен, вытесняется одно значение по политике вытеснения."""
+        if not self.maxsize:
+            return
+        with self.__lock:
+            if key in self.__data:
+                self.__data[key] = value
+                if self.policy == "lru":
+                    self.__data.move_to_end(key)
+                return
+            if len(self.__data) >= self.maxsize:
+                self.__data.popitem(last=False)
+                self.evictions += 1
+            self.__data[key] = value
+
+    def discard(self, key) -> None:
+        """Удаление значения, если оно есть в кэше."""
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаление всех значений. Счетчики не сбрасываются."""
+        with self.__lock:
+            self.__data.clear()
+
+    def reset_stats(self) -> None:
+        """Сброс счетчиков."""
+        with self.__lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Сводка: size, maxsize, policy, hits, misses, evictions, invalidations, hit_rate."""
+        with self.__lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "size": len(self.__data),
+                "maxsize": self.maxsize,
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+
+def filters_key(filters: dict) -> tuple | None:
+    """Ключ кэша для условий поиска: пары (поле, значение), упорядоченные по полю.
+
+    Returns:
+        Кортеж пар или None, если значения условий нельзя использовать как ключ (например, списки).
+    """
+    key: tuple = tuple(sorted(filters.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
@@ -0,0 +1,171 @@
+import http.client
+import json
+import select
+from typing import Iterable, Iterator
+
+from src.server import HOST, PAGE_SIZE, PORT, READ_ONLY_METHODS
+
+
+class PhonebookClient:
+    """Клиент HTTP/JSON сервера справочника (см. src.server).
+
+    Методы повторяют сигнатуры и результаты методов Phonebook. Все запросы идут через одно постоянное соединение
+    (keep-alive). Соединение, закрытое сервером, заменяется новым перед отправкой запроса. Если соединение
+    обрывается, запрос повторяется один раз, только когда он не был отправлен или не изменяет справочник
+    (READ_ONLY_METHODS): изменяющий запрос мог быть выполнен сервером, и повтор выполнил бы его дважды. Клиент не
+    потокобезопасен: каждому потоку нужен свой клиент.
+
+    Пример:
+        with PhonebookClient(port=8765) as phonebook:
+            phonebook.get_contacts(last_name="Иванов")
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT, timeout: float | None = 30.0) -> None:
+        self.__connection: http.client.HTTPConnection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def get_all_contacts(self) -> list:
+        return self.__call("get_all_contacts")
+
+    def add_contact(self, first_name: str, last_name: str, patronymic: str, organization: str, office_number: str,
+                    personal_number: str) -> dict:
+        return self.__call(
+            "add_contact", first_name=first_name, last_name=last_name, patronymic=patronymic,
+            organization=organization, office_number=office_number, personal_number=personal_number,
+        )
+
+    def add_contacts(self, contacts: Iterable[dict], batch_size: int = 1000) -> list:
+        return self.__call("add_contacts", contacts=list(contacts), batch_size=batch_size)
+
+    def get_contacts(self, **kwargs) -> list:
+        return self.__call("get_contacts", **kwargs)
+
+    def find_contacts(self, **kwargs) -> list:
+        return self.__call("find_contacts", **kwargs)
+
+    def fuzzy_contacts(self, max_distance: int = 1, limit: int | None = None, **kwargs) -> list:
+        return self.__call("fuzzy_contacts", max_distance=max_distance, limit=limit, **kwargs)
+
+    def get_sorted_contacts(self, partial: bool = False, **kwargs) -> list:
+        return self.__call("get_sorted_contacts", partial=partial, **kwargs)
+
+    def count_contacts(self, partial: bool = False, **kwargs) -> int:
+        return self.__call("count_contacts", partial=partial, **kwargs)
+
+    def update_contact(self, personal_num: str, **kwargs) -> dict:
+        return self.__call("update_contact", personal_num=personal_num, **kwargs)
+
+    def delete_contact(self, personal_number: str) -> dict:
+        return self.__call("delete_contact", personal_number=personal_number)
+
+    def update_contacts(self, filters: dict, changes: dict, partial: bool = False) -> dict:
+        return self.__call("update_contacts", filters=filters, changes=changes, partial=partial)
+
+    def delete_contacts(self, filters: dict, partial: bool = False) -> dict:
+        return self.__call("delete_contacts", filters=filters, partial=partial)
+
+    def upsert_contact(self, first_name: str, last_name: str, patronymic: str, organization: str,
+                       office_number: str, personal_number: str) -> dict:
+        return self.__call(
+            "upsert_contact", first_name=first_name, last_name=last_name, patronymic=patronymic,
+            organization=organization, office_number=office_number, personal_number=personal_number,
+        )
+
+    def merge_contacts(self, plan: list) -> dict:
+        return self.__call("merge_contacts", plan=plan)
+
+    def stats(self) -> dict:
+        return self.__call("stats")
+
+    def iter_contacts(self, order: str = "name", filters: dict | None = None, after: tuple | None = None,
+                      limit: int | None = None, offset: int = 0, partial: bool = False,
+                      page_size: int = PAGE_SIZE) -> Iterator[tuple]:
+        """Постраничное получение контактов (см. Phonebook.iter_contacts).
+
+        Сервер читает и передает контакты страницами по page_size, клиент разбирает их по мере получения, поэтому
+        ни сервер, ни клиент не держат в памяти весь результат. Пока итератор не исчерпан, другие запросы через
+        этот клиент выполнять нельзя.
+
+        Returns:
+            Итератор по парам (курсор, контакт).
+        """
+        response: http.client.HTTPResponse = self.__request("/iter_contacts", {
+            "order": order, "filters": filters, "after": after, "limit": limit, "offset": offset,
+            "partial": partial, "page_size": page_size,
+        }, read_only=True)
+        if response.status != 200:
+            self.__read_json(response)
+        return self.__read_lines(response)
+
+    def batch(self, calls: Iterable[tuple]) -> list:
+        """Несколько вызовов одним запросом.
+
+        Args:
+            calls: Пары (метод, именованные аргументы), например [("get_contacts", {"last_name": "Иванов"}),
+                ("add_contact", {...})].
+
+        Returns:
+            Результаты вызовов в порядке calls. Вместо результата вызова с ошибкой возвращается RuntimeError.
+        """
+        calls = [{"method": method, "kwargs": kwargs} for method, kwargs in calls]
+        response: http.client.HTTPResponse = self.__request(
+            "/batch", {"calls": calls}, read_only=all(call["method"] in READ_ONLY_METHODS for call in calls)
+        )
+        body: dict = self.__read_json(response)
+        return [RuntimeError(item["error"]) if "error" in item else item["result"] for item in body["results"]]
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __enter__(self) -> "PhonebookClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __call(self, method: str, **kwargs):
+        return self.__read_json(self.__request(f"/{method}", kwargs, read_only=method in READ_ONLY_METHODS))["result"]
+
+    def __request(self, path: str, body: dict, read_only: bool) -> http.client.HTTPResponse:
+        """Отправка POST запроса.
+
+        Args:
+            path: Путь запроса.
+            body: Тело запроса.
+            read_only: Запрос не изменяет справочник, его можно повторить после обрыва соединения в любой момент.
+                Иначе запрос повторяется, только если он не был отправлен.
+        """
+        data: bytes = json.dumps(body, ensure_ascii=False).encode()
+        headers: dict = {"Content-Type": "application/json; charset=utf-8"}
+        for attempt in range(2):
+            if self.__is_stale():
+                self.__connection.close()
+            sent: bool = False
+            try:
+                self.__connection.request("POST", path, data, headers)
+                sent = True
+                return self.__connection.getresponse()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                self.__connection.close()
+                if attempt or (sent and not read_only):
+                    raise
+
+    def __is_stale(self) -> bool:
+        """Постоянное соединение закрыто сервером: сокет доступен для чтения, хотя запрос еще не отправлен."""
+        sock = self.__connection.sock
+        return sock is not None and bool(select.select([sock], [], [], 0)[0])
+
+    def __read_json(self, response: http.client.HTTPResponse):
+        body = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Ошибка сервера {response.status}: {body.get('error')}")
+        return body
+
+    def __read_lines(self, response: http.client.HTTPResponse) -> Iterator[tuple]:
+        try:
+            for line in response:
+                cursor, contact = json.loads(line)
+                yield tuple(cursor), contact
+        finally:
+            if not response.isclosed():
+                # Ответ прочитан не полностью, соединение нельзя использовать для следующего запроса.
+                self.__connection.close()
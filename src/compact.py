@@ -0,0 +1,220 @@
+from array import array
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Iterator
+
+CONTACT_FIELDS = ("first_name", "last_name", "patronymic", "organization", "office_number", "personal_number")
+TEXT_FIELDS = ("first_name", "last_name", "patronymic", "organization")
+PHONE_FIELDS = ("office_number", "personal_number")
+PHONE_LENGTH = 11
+NO_PHONE = -1
+
+_contact_values = attrgetter(*CONTACT_FIELDS)
+
+
+class StringTable:
+    """Таблица интернированных строк: каждая строка хранится один раз и кодируется целым числом."""
+
+    def __init__(self) -> None:
+        self.__strings: list = []
+        self.__codes: dict = {}
+
+    def encode(self, value: str) -> int:
+        """Код строки. Новая строка добавляется в таблицу."""
+        code: int | None = self.__codes.get(value)
+        if code is None:
+            code = len(self.__strings)
+            self.__strings.append(value)
+            self.__codes[value] = code
+        return code
+
+    def decode(self, code: int) -> str:
+        """Строка по коду."""
+        return self.__strings[code]
+
+    @classmethod
+    def from_strings(cls, strings: list) -> "StringTable":
+        """Таблица из списка строк, код строки - ее позиция в списке."""
+        table: StringTable = cls()
+        table.__strings = strings
+        table.__codes = {value: code for code, value in enumerate(strings)}
+        return table
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__strings)
+
+    def __len__(self) -> int:
+        return len(self.__strings)
+
+
+class ContactRow(Mapping):
+    """Легковесное неизменяемое представление контакта.
+
+    Ведет себя как словарь с полями контакта (поддерживает row["first_name"], get, keys, ** и сравнение со
+    словарем), но хранит значения в слотах без словаря экземпляра.
+    """
+
+    __slots__ = CONTACT_FIELDS
+
+    def __init__(self, first_name: str, last_name: str, patronymic: str, organization: str, office_number: str,
+                 personal_number: str) -> None:
+        self.first_name: str = first_name
+        self.last_name: str = last_name
+        self.patronymic: str = patronymic
+        self.organization: str = organization
+        self.office_number: str = office_number
+        self.personal_number: str = personal_number
+
+    def __getitem__(self, key: str) -> str:
+        if key not in CONTACT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CONTACT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(CONTACT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"ContactRow({self.to_dict()})"
+
+    def to_dict(self) -> dict:
+        """Контакт в виде нового словаря. Быстрее dict(row): значения читаются из слотов без обхода Mapping."""
+        return dict(zip(CONTACT_FIELDS, _contact_values(self)))
+
+
+class CompactContactStore:
+    """Колоночное хранилище контактов в памяти.
+
+    ФИО и организация хранятся кодами из общей таблицы строк в array("I"), номера телефонов - числами в
+    array("q"). Позиция в колонках совпадает с id контакта, удаленные позиции отмечаются в массиве alive. Номера,
+    которые нельзя представить числом без потерь, хранятся строками в отдельном словаре.
+    """
+
+    def __init__(self) -> None:
+        self.strings: StringTable = StringTable()
+        self.__text: dict = {field: array("I", [0]) for field in TEXT_FIELDS}
+        self.__phones: dict = {field: array("q", [NO_PHONE]) for field in PHONE_FIELDS}
+        self.__alive: bytearray = bytearray(1)
+        self.__raw_phones: dict = {}
+        self.__count: int = 0
+
+    def append(self, document: Mapping) -> int:
+        """Добавление контакта.
+
+        Returns:
+            id добавленного контакта.
+        """
+        doc_id: int = len(self.__alive)
+        self.put(doc_id, document)
+        return doc_id
+
+    def put(self, doc_id: int, document: Mapping) -> None:
+        """Запись контакта с заданным id."""
+        self.__grow(doc_id + 1)
+        for field in TEXT_FIELDS:
+            self.__text[field][doc_id] = self.strings.encode(document[field])
+        for field in PHONE_FIELDS:
+            self.__set_phone(field, doc_id, document[field])
+        if not self.__alive[doc_id]:
+            self.__alive[doc_id] = 1
+            self.__count += 1
+
+    def update(self, doc_id: int, fields: Mapping) -> None:
+        """Обновление полей контакта."""
+        for field, value in fields.items():
+            if not isinstance(value, str):
+                raise ValueError(f"Значение поля {field} должно быть строкой")
+            if field in TEXT_FIELDS:
+                self.__text[field][doc_id] = self.strings.encode(value)
+            elif field in PHONE_FIELDS:
+                self.__set_phone(field, doc_id, value)
+            else:
+                raise ValueError(f"Неизвестное поле контакта: {field}")
+
+    def remove(self, doc_id: int) -> None:
+        """Удаление контакта."""
+        if doc_id in self:
+            self.__alive[doc_id] = 0
+            self.__count -= 1
+            for field in PHONE_FIELDS:
+                self.__raw_phones.pop((field, doc_id), None)
+
+    def get(self, doc_id: int) -> ContactRow | None:
+        """Контакт по id или None, если его нет."""
+        if doc_id not in self:
+            return None
+        decode = self.strings.decode
+        return ContactRow(
+            decode(self.__text["first_name"][doc_id]), decode(self.__text["last_name"][doc_id]),
+            decode(self.__text["patronymic"][doc_id]), decode(self.__text["organization"][doc_id]),
+            self.__get_phone("office_number", doc_id), self.__get_phone("personal_number", doc_id),
+        )
+
+    def ids(self) -> Iterator[int]:
+        """Итератор по id контактов в порядке возрастания."""
+        alive: bytearray = self.__alive
+        position: int = alive.find(1)
+        while position != -1:
+            yield position
+            position = alive.find(1, position + 1)
+
+    def columns(self) -> tuple:
+        """Внутренние колонки хранилища без копирования (см. from_columns). Изменять их нельзя.
+
+        Returns:
+            Кортеж (строки, колонки ФИО и организации, колонки номеров, alive, номера-строки {(поле, id): номер}).
+        """
+        return self.strings, self.__text, self.__phones, self.__alive, self.__raw_phones
+
+    @classmethod
+    def from_columns(cls, strings: StringTable, text: dict, phones: dict, alive: bytearray,
+                     raw_phones: dict) -> "CompactContactStore":
+        """Хранилище из готовых колонок в формате columns(). Колонки не копируются.
+
+        Args:
+            strings: Таблица строк.
+            text: Колонки кодов строк array("I") для полей TEXT_FIELDS.
+            phones: Колонки номеров array("q") для полей PHONE_FIELDS, NO_PHONE - номер из raw_phones.
+            alive: Отметки существующих контактов, длина совпадает с длиной колонок. Позиция 0 не используется.
+            raw_phones: Номера, которые нельзя представить числом, {(поле, id): номер}.
+        """
+        store: CompactContactStore = cls()
+        store.strings = strings
+        store.__text = text
+        store.__phones = phones
+        store.__alive = alive
+        store.__raw_phones = raw_phones
+        store.__count = alive.count(1)
+        return store
+
+    def __contains__(self, doc_id: int) -> bool:
+        return 0 < doc_id < len(self.__alive) and self.__alive[doc_id] == 1
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __grow(self, size: int) -> None:
+        missing: int = size - len(self.__alive)
+        if missing <= 0:
+            return
+        for column in self.__text.values():
+            column.extend([0] * missing)
+        for column in self.__phones.values():
+            column.extend([NO_PHONE] * missing)
+        self.__alive.extend(bytes(missing))
+
+    def __set_phone(self, field: str, doc_id: int, value: str) -> None:
+        if len(value) == PHONE_LENGTH and value.isascii() and value.isdigit():
+            self.__phones[field][doc_id] = int(value)
+            self.__raw_phones.pop((field, doc_id), None)
+        else:
+            self.__phones[field][doc_id] = NO_PHONE
+            self.__raw_phones[(field, doc_id)] = value
+
+    def __get_phone(self, field: str, doc_id: int) -> str:
+        number: int = self.__phones[field][doc_id]
+        if number == NO_PHONE:
+            return self.__raw_phones[(field, doc_id)]
+        return f"{number:0{PHONE_LENGTH}d}"
@@ -0,0 +1,138 @@
+"""Поиск и объединение дубликатов контактов
+
+Дубликатами считаются контакты с разными личными номерами, у которых совпадают нормализованные фамилия, имя,
+отчество, организация и рабочий номер (см. duplicate_key). Контакты не сравниваются попарно: каждый контакт
+читается один раз страницами в порядке ФИО (Phonebook.iter_contacts), его ключ хешируется в 8 байт, и контакты с
+одинаковым хешем попадают в один блок. В памяти хранятся только хеши и личные номера, контакты - только для блоков
+из нескольких контактов. Внутри блока ключи сравниваются полностью, поэтому коллизия хешей не приводит к
+объединению разных людей. Общее время - O(n log n) на чтение в порядке индекса.
+
+План объединения - список групп {"keep", "duplicates", "contact"}: основным остается первый контакт группы в порядке
+ФИО и добавления, дубликаты удаляются Phonebook.merge_contacts одной записью в хранилище.
+
+Пример запуска:
+    python3 -m src.dedup --path phonebook.json --plan plan.json
+    python3 -m src.dedup --path phonebook.json --from-plan plan.json --apply
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from operator import itemgetter
+
+from src.indexes import normalize_name
+from src.phonebook import ORDER_FIELDS, Phonebook
+from src.transfer import CHUNK_SIZE, gc_paused, iter_chunks
+
+KEY_FIELDS = ("last_name", "first_name", "patronymic", "organization", "office_number")
+_WORD = re.compile(r"\w+")
+_NOT_DIGIT = re.compile(r"\D")
+_order_key = itemgetter(*ORDER_FIELDS)
+
+
+def normalize_phone(value: str) -> str:
+    """Номер телефона без форматирования: только цифры, российский номер из 11 цифр начинается с 8."""
+    digits: str = value if value.isascii() and value.isdigit() else _NOT_DIGIT.sub("", value)
+    if len(digits) == 11 and digits[0] == "7":
+        return "8" + digits[1:]
+    return digits
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize_text(value: str) -> str:
+    """Текст без регистра, "ё", кавычек, знаков препинания и лишних пробелов: 'ООО «Рога»' -> 'ооо рога'.
+
+    Результаты кэшируются: имена и организации в справочнике повторяются.
+    """
+    return " ".join(_WORD.findall(normalize_name(value)))
+
+
+def duplicate_key(contact: dict) -> tuple:
+    """Нормализованный ключ контакта, по которому определяются дубликаты (поля KEY_FIELDS)."""
+    return (
+        normalize_text(contact["last_name"]), normalize_text(contact["first_name"]),
+        normalize_text(contact["patronymic"]), normalize_text(contact["organization"]),
+        normalize_phone(contact["office_number"]),
+    )
+
+
+def key_hash(key: tuple) -> int:
+    """64-битный хеш ключа, одинаковый во всех процессах (в отличие от hash)."""
+    return int.from_bytes(hashlib.blake2b("\0".join(key).encode(), digest_size=8).digest(), "little")
+
+
+def find_duplicates(phonebook: Phonebook, chunk_size: int = CHUNK_SIZE, gc_pause: bool = False) -> list:
+    """Поиск групп дубликатов.
+
+    Args:
+        phonebook: Справочник.
+        chunk_size: Размер страницы чтения контактов.
+        gc_pause: Отключить сборщик циклического мусора на время чтения контактов (см. src.transfer).
+
+    Returns:
+        План объединения - список групп {"keep": личный номер основного контакта, "duplicates": [личные номера
+        дубликатов], "contact": основной контакт} в порядке ФИО основных контактов.
+    """
+    first: dict = {}
+    blocks: dict = {}
+    with gc_paused() if gc_pause else nullcontext():
+        for chunk in iter_chunks(phonebook, chunk_size=chunk_size):
+            for contact in chunk:
+                digest: int = key_hash(duplicate_key(contact))
+                keep: str | None = first.setdefault(digest, contact["personal_number"])
+                if keep != contact["personal_number"]:
+                    blocks.setdefault(digest, []).append(dict(contact))
+    plan: list = []
+    for digest, members in blocks.items():
+        keeper: dict = dict(phonebook.get_contacts(personal_number=first[digest])[0])
+        members.insert(0, keeper)
+        groups: dict = {}
+        for member in members:
+            groups.setdefault(duplicate_key(member), []).append(member)
+        plan.extend(
+            {"keep": group[0]["personal_number"], "duplicates": [member["personal_number"] for member in group[1:]],
+             "contact": group[0]}
+            for group in groups.values() if len(group) > 1
+        )
+    plan.sort(key=lambda group: _order_key(group["contact"]))
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Поиск и объединение дубликатов в телефонном справочнике.")
+    parser.add_argument("--path", default="phonebook.json", help="файл базы данных")
+    parser.add_argument("--plan", help="файл для сохранения плана объединения в JSON")
+    parser.add_argument("--from-plan", help="применить сохраненный план вместо поиска дубликатов")
+    parser.add_argument("--apply", action="store_true", help="удалить дубликаты по плану")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="размер страницы чтения контактов")
+    parser.add_argument("--compact", action="store_true", help="компактное хранение контактов в памяти")
+    args = parser.parse_args()
+
+    phonebook: Phonebook = Phonebook(args.path, write_behind=True, flush_every=sys.maxsize, flush_interval=None,
+                                     compact=args.compact)
+    try:
+        start: float = time.perf_counter()
+        if args.from_plan:
+            with open(args.from_plan, encoding="utf-8") as file:
+                plan: list = json.load(file)
+        else:
+            plan = find_duplicates(phonebook, args.chunk_size, gc_pause=True)
+        print(f"Групп дубликатов: {len(plan)}, дубликатов: {sum(len(group['duplicates']) for group in plan)}. "
+              f"Время: {time.perf_counter() - start:.2f} с", file=sys.stderr)
+        if args.plan:
+            with open(args.plan, "w", encoding="utf-8") as file:
+                json.dump(plan, file, ensure_ascii=False, indent=2)
+        if args.apply:
+            result: dict = phonebook.merge_contacts(plan)
+            print(f"Удалено дубликатов: {result['count']}, пропущено групп: {result['skipped']}", file=sys.stderr)
+    finally:
+        phonebook.close_db()
+
+
+if __name__ == "__main__":
+    main()
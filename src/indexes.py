@@ -0,0 +1,482 @@
+import bisect
+from typing import Iterable, Mapping
+
+
+class UniqueIndex:
+    """Уникальный хеш-индекс: значение поля -> id документа.
+
+    Индекс хранится в памяти и позволяет за O(1) проверять наличие значения и находить документ без сканирования
+    базы данных.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field: str = field
+        self.__ids: dict = {}
+
+    def clear(self) -> None:
+        """Очистка индекса."""
+        self.__ids = {}
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        """Добавление документа в индекс. Уже занятое значение не перезаписывается."""
+        self.__ids.setdefault(document[self.field], doc_id)
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        """Удаление документа из индекса."""
+        if self.__ids.get(document[self.field]) == doc_id:
+            del self.__ids[document[self.field]]
+
+    def get(self, value: str) -> int | None:
+        """Получение id документа по значению поля.
+
+        Returns:
+            id документа, если значение есть в индексе, иначе None.
+        """
+        return self.__ids.get(value)
+
+    def lookup(self, value: str) -> set:
+        """Получение множества id документов с заданным значением поля (не более одного)."""
+        doc_id: int | None = self.__ids.get(value)
+        return set() if doc_id is None else {doc_id}
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.__ids
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+
+class HashIndex:
+    """Вторичный хеш-индекс: значение поля -> множество id документов (posting list)."""
+
+    def __init__(self, field: str) -> None:
+        self.field: str = field
+        self.__postings: dict = {}
+
+    def clear(self) -> None:
+        """Очистка индекса."""
+        self.__postings = {}
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        """Добавление документа в индекс."""
+        value = document.get(self.field)
+        if value is not None:
+            self.__postings.setdefault(value, set()).add(doc_id)
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        """Удаление документа из индекса."""
+        value = document.get(self.field)
+        posting: set | None = self.__postings.get(value)
+        if posting is not None:
+            posting.discard(doc_id)
+            if not posting:
+                del self.__postings[value]
+
+    def lookup(self, value: str) -> set:
+        """Получение множества id документов с заданным значением поля.
+
+        Возвращаемое множество принадлежит индексу и не должно изменяться вызывающим кодом.
+        """
+        return self.__postings.get(value, set())
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.__postings
+
+    def __len__(self) -> int:
+        return len(self.__postings)
+
+
+def intersect_postings(postings: list) -> set:
+    """Пересечение posting list'ов, начиная с самого селективного.
+
+    Args:
+        postings: Список множеств id документов.
+
+    Returns:
+        Множество id документов, входящих во все posting list'ы.
+    """
+    postings = sorted(postings, key=len)
+    result: set = set(postings[0])
+    for posting in postings[1:]:
+        if not result:
+            break
+        result &= posting
+    return result
+
+
+class PrefixIndex(HashIndex):
+    """Хеш-индекс с поиском по префиксу.
+
+    Помимо posting list'ов хранит отсортированный список различных значений поля, поэтому поиск по префиксу
+    выполняется двоичным поиском за O(log k + m), где k - количество различных значений, m - количество
+    подходящих значений.
+    """
+
+    def __init__(self, field: str) -> None:
+        super().__init__(field)
+        self.__keys: list = []
+
+    def clear(self) -> None:
+        super().clear()
+        self.__keys = []
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        value = document.get(self.field)
+        if value is not None and value not in self:
+            bisect.insort(self.__keys, value)
+        super().add(doc_id, document)
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        super().remove(doc_id, document)
+        value = document.get(self.field)
+        if value is not None and value not in self:
+            position: int = bisect.bisect_left(self.__keys, value)
+            if position < len(self.__keys) and self.__keys[position] == value:
+                del self.__keys[position]
+
+    def lookup_prefix(self, prefix: str) -> set:
+        """Получение множества id документов, значение поля которых начинается с prefix."""
+        result: set = set()
+        position: int = bisect.bisect_left(self.__keys, prefix)
+        while position < len(self.__keys) and self.__keys[position].startswith(prefix):
+            result |= self.lookup(self.__keys[position])
+            position += 1
+        return result
+
+
+class NgramIndex:
+    """N-граммный индекс для поиска по подстроке.
+
+    Каждое значение поля разбивается на n-граммы, для каждой n-граммы хранится множество id документов. Поиск
+    подстроки пересекает posting list'ы ее n-грамм и проверяет найденных кандидатов. Подстроки короче n
+    проверяются перебором значений.
+    """
+
+    def __init__(self, field: str, n: int = 3) -> None:
+        self.field: str = field
+        self.n: int = n
+        self.__postings: dict = {}
+        self.__values: dict = {}
+
+    def clear(self) -> None:
+        """Очистка индекса."""
+        self.__postings = {}
+        self.__values = {}
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        """Добавление документа в индекс."""
+        value = document.get(self.field)
+        if value is None:
+            return
+        self.__values[doc_id] = value
+        for gram in self.__grams(value):
+            self.__postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        """Удаление документа из индекса."""
+        value = self.__values.pop(doc_id, None)
+        if value is None:
+            return
+        for gram in self.__grams(value):
+            posting: set | None = self.__postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.__postings[gram]
+
+    def lookup_substring(self, substring: str) -> set:
+        """Получение множества id документов, значение поля которых содержит substring."""
+        if len(substring) < self.n:
+            return {doc_id for doc_id, value in self.__values.items() if substring in value}
+        postings: list = [self.__postings.get(gram, set()) for gram in self.__grams(substring)]
+        candidates: set = intersect_postings(postings)
+        return {doc_id for doc_id in candidates if substring in self.__values[doc_id]}
+
+    def __grams(self, value: str) -> set:
+        return {value[i:i + self.n] for i in range(len(value) - self.n + 1)}
+
+
+_PHONETIC_VOWELS = str.maketrans({"о": "а", "ы": "а", "я": "а", "е": "и", "э": "и", "ю": "у"})
+_PHONETIC_CONSONANTS = str.maketrans({"б": "п", "в": "ф", "г": "к", "д": "т", "ж": "ш", "з": "с"})
+_PHONETIC_DIPHTHONGS = ("йо", "ио", "йе", "ие")
+
+
+def normalize_name(value: str) -> str:
+    """Значение для нечеткого сравнения: нижний регистр, "ё" заменяется на "е"."""
+    return value.lower().replace("ё", "е")
+
+
+def phonetic_key(value: str) -> str:
+    """Фонетический ключ русского имени (упрощенный русский Metaphone).
+
+    Сочетания "йо", "ио", "йе", "ие" заменяются на "и", гласные сводятся к "а", "и", "у", звонкие согласные - к
+    парным глухим, "ь" и "ъ" отбрасываются, повторяющиеся буквы схлопываются. Например, "Шрутт",
+    "Шрут" и "Шрудт" дают ключ "шрут".
+    """
+    key: str = normalize_name(value)
+    for diphthong in _PHONETIC_DIPHTHONGS:
+        key = key.replace(diphthong, "и")
+    key = key.translate(_PHONETIC_VOWELS).translate(_PHONETIC_CONSONANTS).replace("ь", "").replace("ъ", "")
+    return "".join(char for position, char in enumerate(key) if position == 0 or key[position - 1] != char)
+
+
+def edit_distance(first: str, second: str, limit: int | None = None) -> int:
+    """Расстояние Дамерау-Левенштейна: количество вставок, удалений, замен и перестановок соседних символов.
+
+    Args:
+        first: Первая строка.
+        second: Вторая строка.
+        limit: Предел расстояния. Если расстояние больше limit, вычисление прекращается и возвращается limit + 1.
+
+    Returns:
+        Расстояние между строками.
+    """
+    if first == second:
+        return 0
+    if limit is None:
+        limit = max(len(first), len(second))
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    # Клетки дальше limit от диагонали не могут дать расстояние не больше limit, поэтому вычисляется только
+    # полоса шириной 2 * limit + 1, а остальные клетки считаются равными limit + 1.
+    outside: int = limit + 1
+    before_previous: list = []
+    previous: list = [j if j <= limit else outside for j in range(len(second) + 1)]
+    for i, char in enumerate(first, 1):
+        current: list = [i if i <= limit else outside] + [outside] * len(second)
+        row_minimum: int = current[0]
+        for j in range(max(1, i - limit), min(len(second), i + limit) + 1):
+            other: str = second[j - 1]
+            distance: int = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if i > 1 and j > 1 and char == second[j - 2] and first[i - 2] == other and char != other:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current[j] = distance
+            row_minimum = min(row_minimum, distance)
+        if row_minimum > limit:
+            return outside
+        before_previous, previous = previous, current
+    return min(previous[-1], outside)
+
+
+class FuzzyIndex:
+    """Индекс нечеткого поиска по значениям поля с опечатками.
+
+    Хранит различные значения поля (с количеством документов), их биграммы и фонетические ключи. Кандидаты для
+    запроса отбираются по биграммам: каждая опечатка меняет не больше трех биграмм (перестановка соседних букв),
+    поэтому при расстоянии не больше k у значений совпадает не меньше len(биграммы запроса) - 3 * k биграмм (и хотя
+    бы одна). Расстояние вычисляется только для кандидатов, поэтому время поиска зависит от количества значений с
+    редкими общими биграммами, а не от количества документов. Документы по найденным значениям выбираются точным
+    индексом поля.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field: str = field
+        self.__counts: dict = {}
+        self.__grams: dict = {}
+        self.__keys: dict = {}
+
+    def clear(self) -> None:
+        """Очистка индекса."""
+        self.__counts = {}
+        self.__grams = {}
+        self.__keys = {}
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        """Добавление документа в индекс."""
+        value = document.get(self.field)
+        if not isinstance(value, str):
+            return
+        count: int = self.__counts.get(value, 0)
+        self.__counts[value] = count + 1
+        if count:
+            return
+        for gram in self.__bigrams(value):
+            self.__grams.setdefault(gram, set()).add(value)
+        self.__keys.setdefault(phonetic_key(value), set()).add(value)
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        """Удаление документа из индекса."""
+        value = document.get(self.field)
+        count: int | None = self.__counts.get(value)
+        if count is None:
+            return
+        if count > 1:
+            self.__counts[value] = count - 1
+            return
+        del self.__counts[value]
+        for gram in self.__bigrams(value):
+            self.__discard(self.__grams, gram, value)
+        self.__discard(self.__keys, phonetic_key(value), value)
+
+    def lookup_fuzzy(self, value: str, max_distance: int = 1) -> list:
+        """Поиск значений поля, похожих на value.
+
+        Args:
+            value: Искомое значение.
+            max_distance: Наибольшее расстояние редактирования (см. edit_distance) без учета регистра.
+
+        Returns:
+            Список пар (расстояние, значение) по возрастанию расстояния. Кроме значений на расстоянии не больше
+            max_distance, в список попадают значения с тем же фонетическим ключом, что и value, с их расстоянием.
+        """
+        grams: set = self.__bigrams(value)
+        required: int = max(len(grams) - 3 * max_distance, 1)
+        # Значение с required общими биграммами содержит хотя бы одну из любых len(grams) - required + 1 биграмм
+        # запроса, поэтому кандидаты выбираются только по самым редким из них.
+        rarest: list = sorted((self.__grams.get(gram, set()) for gram in grams), key=len)
+        candidates: set = set().union(*rarest[:len(grams) - required + 1])
+        phonetic: set = self.__keys.get(phonetic_key(value), set())
+        normalized: str = normalize_name(value)
+        result: list = []
+        for candidate in candidates | phonetic:
+            in_phonetic: bool = candidate in phonetic
+            if not in_phonetic and (abs(len(candidate) - len(value)) > max_distance or
+                                    len(grams & self.__bigrams(candidate)) < required):
+                continue
+            distance: int = edit_distance(normalized, normalize_name(candidate), None if in_phonetic else max_distance)
+            if in_phonetic or distance <= max_distance:
+                result.append((distance, candidate))
+        result.sort()
+        return result
+
+    @staticmethod
+    def __discard(postings: dict, key: str, value: str) -> None:
+        values: set = postings[key]
+        values.discard(value)
+        if not values:
+            del postings[key]
+
+    @staticmethod
+    def __bigrams(value: str) -> set:
+        padded: str = f"^{normalize_name(value)}$"
+        return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+    def __len__(self) -> int:
+        return len(self.__counts)
+
+
+class OrderedIndex:
+    """Упорядоченный индекс по набору полей.
+
+    Хранит отсортированный список ключей (значения полей..., id документа) и обновляется инкрементально, поэтому
+    упорядоченный список контактов не нужно сортировать заново при каждом выводе. id документа в конце ключа делает
+    порядок одинаковых значений стабильным.
+    """
+
+    def __init__(self, fields: tuple) -> None:
+        self.fields: tuple = fields
+        self.__entries: list = []
+        self.__keys: dict = {}
+        self.__sorted: bool = True
+
+    def clear(self) -> None:
+        """Очистка индекса. Документы, добавленные после очистки, сортируются один раз при первом обращении."""
+        self.__entries = []
+        self.__keys = {}
+        self.__sorted = False
+
+    def add(self, doc_id: int, document: Mapping) -> None:
+        """Добавление документа в индекс."""
+        entry: tuple = (*(document.get(field, "") for field in self.fields), doc_id)
+        self.__keys[doc_id] = entry
+        if self.__sorted:
+            bisect.insort(self.__entries, entry)
+        else:
+            self.__entries.append(entry)
+
+    def add_many(self, pairs: Iterable[tuple]) -> None:
+        """Добавление пачки документов.
+
+        Ключи добавляются в конец списка, который затем сортируется один раз. Сортировка сливает уже упорядоченную
+        часть с новыми ключами за линейное время, вместо сдвига списка при вставке каждого документа.
+
+        Args:
+            pairs: Пары (id, документ).
+        """
+        for doc_id, document in pairs:
+            entry: tuple = (*(document.get(field, "") for field in self.fields), doc_id)
+            self.__keys[doc_id] = entry
+            self.__entries.append(entry)
+        if self.__sorted:
+            self.__entries.sort()
+
+    def remove(self, doc_id: int, document: Mapping) -> None:
+        """Удаление документа из индекса."""
+        entry: tuple | None = self.__keys.pop(doc_id, None)
+        if entry is None:
+            return
+        entries: list = self.__ensure_sorted()
+        position: int = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def sort(self) -> None:
+        """Сортировка документов, добавленных после очистки.
+
+        После сортировки чтение индекса его не изменяет, поэтому индекс можно читать из нескольких потоков.
+        """
+        self.__ensure_sorted()
+
+    def key(self, doc_id: int) -> tuple:
+        """Ключ сортировки документа."""
+        return self.__keys[doc_id]
+
+    def ordered_ids(self, doc_ids: set | None = None) -> list:
+        """Получение id документов в порядке индекса.
+
+        Args:
+            doc_ids: Множество id, которые нужно упорядочить. None - все документы индекса.
+
+        Returns:
+            Список id в порядке индекса. Небольшие множества сортируются по ключам, большие отбираются проходом по
+            индексу.
+        """
+        entries: list = self.__ensure_sorted()
+        if doc_ids is None:
+            return [entry[-1] for entry in entries]
+        if len(doc_ids) * max(len(entries).bit_length(), 1) < len(entries):
+            return [entry[-1] for entry in sorted(self.__keys[doc_id] for doc_id in doc_ids)]
+        return [entry[-1] for entry in entries if entry[-1] in doc_ids]
+
+    def page(self, doc_ids: set | None = None, after: tuple | None = None, offset: int = 0,
+             limit: int | None = None) -> list:
+        """Получение страницы ключей в порядке индекса (keyset-пагинация).
+
+        Без фильтра страница находится двоичным поиском, поэтому время не зависит от размера индекса.
+
+        Args:
+            doc_ids: Множество id, среди которых выбирается страница. None - все документы индекса.
+            after: Ключ, после которого начинается страница (ключ последнего контакта предыдущей страницы).
+            offset: Количество ключей, пропускаемых после after.
+            limit: Размер страницы. None - до конца индекса.
+
+        Returns:
+            Список ключей (значения полей..., id документа).
+        """
+        entries: list = self.__ensure_sorted()
+        if doc_ids is not None and len(doc_ids) * max(len(entries).bit_length(), 1) < len(entries):
+            entries = sorted(self.__keys[doc_id] for doc_id in doc_ids)
+            doc_ids = None
+        start: int = bisect.bisect_right(entries, after) if after is not None else 0
+        if doc_ids is None:
+            start += offset
+            return entries[start:None if limit is None else start + limit]
+        result: list = []
+        for position in range(start, len(entries)):
+            if limit is not None and len(result) >= limit:
+                break
+            if entries[position][-1] in doc_ids:
+                if offset:
+                    offset -= 1
+                else:
+                    result.append(entries[position])
+        return result
+
+    def __ensure_sorted(self) -> list:
+        if not self.__sorted:
+            self.__entries.sort()
+            self.__sorted = True
+        return self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__keys)
@@ -0,0 +1,185 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class ReadWriteLock:
+    """Блокировка "много читателей или один писатель" для потоков одного процесса.
+
+    Читатели не блокируют друг друга. Писатель получает блокировку, когда активных читателей нет; ожидающий
+    писатель не пропускает новых читателей, поэтому непрерывный поток чтений не может задержать запись навсегда.
+
+    Блокировка реентерабельна: поток, уже держащий блокировку на чтение или запись, повторно получает ее без
+    ожидания, а писатель может читать. Повышение чтения до записи запрещено, так как два таких потока ждали бы
+    друг друга бесконечно.
+
+    Вход в блокировку через with (без read/write) захватывает ее на запись, поэтому она подходит везде, где
+    ожидается threading.RLock.
+    """
+
+    def __init__(self) -> None:
+        self.__condition: threading.Condition = threading.Condition(threading.Lock())
+        self.__readers: int = 0
+        self.__writer: int | None = None
+        self.__writes: int = 0
+        self.__waiting_writers: int = 0
+        self.__local: threading.local = threading.local()
+
+    def acquire_read(self) -> None:
+        local: threading.local = self.__local
+        if self.__writer == threading.get_ident() or getattr(local, "reads", 0):
+            local.reads = getattr(local, "reads", 0) + 1
+            return
+        with self.__condition:
+            while self.__writer is not None or self.__waiting_writers:
+                self.__condition.wait()
+            self.__readers += 1
+        local.reads = 1
+
+    def release_read(self) -> None:
+        local: threading.local = self.__local
+        local.reads -= 1
+        if local.reads or self.__writer == threading.get_ident():
+            return
+        with self.__condition:
+            self.__readers -= 1
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def acquire_write(self) -> None:
+        ident: int = threading.get_ident()
+        if self.__writer == ident:
+            self.__writes += 1
+            return
+        if getattr(self.__local, "reads", 0):
+            raise RuntimeError("Нельзя получить блокировку на запись, удерживая блокировку на чтение")
+        with self.__condition:
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = ident
+            self.__writes = 1
+
+    def release_write(self) -> None:
+        if self.__writer != threading.get_ident():
+            raise RuntimeError("Блокировка на запись не принадлежит текущему потоку")
+        self.__writes -= 1
+        if self.__writes:
+            return
+        with self.__condition:
+            self.__writer = None
+            self.__condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Блокировка на чтение."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Блокировка на запись."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def __enter__(self) -> "ReadWriteLock":
+        self.acquire_write()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release_write()
+
+
+class FileLock:
+    """Межпроцессная рекомендательная блокировка (fcntl.flock) файла path + ".lock" со счетчиком поколений.
+
+    Разделяемая блокировка допускает одновременное чтение несколькими процессами, исключительная - одну запись.
+    Потоки одного процесса используют один дескриптор: разделяемая блокировка снимается, когда ее отпустил
+    последний поток, а исключительную блокировку вызывающий код должен брать под блокировкой на запись внутри
+    процесса (см. ReadWriteLock).
+
+    В файле блокировки хранится номер поколения базы данных, который писатель увеличивает после каждого изменения.
+    Процесс сравнивает его с номером, при котором загружал данные, и перечитывает базу только при отличии.
+
+    На платформах без fcntl блокировка между процессами не выполняется, номер поколения по-прежнему ведется.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Путь к файлу базы данных. Блокируется файл path + ".lock".
+        """
+        self.path: str = path + ".lock"
+        self.__fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.__mutex: threading.Lock = threading.Lock()
+        self.__shared: int = 0
+        self.__exclusive: int = 0
+
+    @contextmanager
+    def shared(self):
+        """Разделяемая блокировка. Внутри исключительной блокировки ничего не делает."""
+        with self.__mutex:
+            if not self.__exclusive:
+                if not self.__shared:
+                    self.__flock(fcntl.LOCK_SH if fcntl else 0)
+                self.__shared += 1
+                counted: bool = True
+            else:
+                counted = False
+        try:
+            yield
+        finally:
+            if counted:
+                with self.__mutex:
+                    self.__shared -= 1
+                    if not self.__shared:
+                        self.__flock(fcntl.LOCK_UN if fcntl else 0)
+
+    @contextmanager
+    def exclusive(self):
+        """Исключительная блокировка. Вызывающий поток не должен удерживать разделяемую блокировку."""
+        if not self.__exclusive:
+            self.__flock(fcntl.LOCK_EX if fcntl else 0)
+        self.__exclusive += 1
+        try:
+            yield
+        finally:
+            self.__exclusive -= 1
+            if not self.__exclusive:
+                self.__flock(fcntl.LOCK_UN if fcntl else 0)
+
+    def generation(self) -> int:
+        """Текущий номер поколения базы данных."""
+        data: bytes = os.pread(self.__fd, 20, 0)
+        return int(data) if data.strip() else 0
+
+    def bump(self) -> int:
+        """Увеличение номера поколения. Вызывается под исключительной блокировкой.
+
+        Returns:
+            Новый номер поколения.
+        """
+        generation: int = self.generation() + 1
+        os.pwrite(self.__fd, b"%020d" % generation, 0)
+        return generation
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+    def __flock(self, operation: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.__fd, operation)
@@ -0,0 +1,139 @@
+import json
+import math
+import os
+import threading
+
+TRACE_ENV = "PHONEBOOK_TRACE"
+
+
+class Histogram:
+    """Гистограмма значений с логарифмическими корзинами.
+
+    Значение попадает в корзину с верхней границей 2 ** k, где k - наименьшее целое, для которого значение меньше
+    границы. Процентили оцениваются по верхней границе корзины, поэтому точность не хуже двух раз при постоянном
+    объеме памяти.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.__buckets: dict = {}
+
+    def observe(self, value: float) -> None:
+        """Учет значения."""
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        exponent: int = math.frexp(value)[1] if value > 0 else -1074
+        self.__buckets[exponent] = self.__buckets.get(exponent, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка процентиля сверху.
+
+        Args:
+            fraction: Доля значений от 0 до 1, например 0.99.
+
+        Returns:
+            Верхняя граница корзины, в которую попадает процентиль, но не больше максимального значения.
+        """
+        if not self.count:
+            return 0
+        rank: float = fraction * self.count
+        seen: int = 0
+        for exponent in sorted(self.__buckets):
+            seen += self.__buckets[exponent]
+            if seen >= rank:
+                return min(math.ldexp(1, exponent), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Сводка по гистограмме: count, total, mean, max, p50, p90, p99 и корзины {верхняя граница: количество}."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {math.ldexp(1, exponent): count for exponent, count in sorted(self.__buckets.items())},
+        }
+
+
+class Metrics:
+    """Счетчики и гистограммы времени выполнения операций.
+
+    Метрики обновляются под собственной блокировкой, так как читающие методы Phonebook выполняются параллельно.
+    """
+
+    def __init__(self) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        self.__latency: dict = {}
+        self.__counters: dict = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Учет времени выполнения операции name."""
+        with self.__lock:
+            histogram: Histogram | None = self.__latency.get(name)
+            if histogram is None:
+                histogram = self.__latency[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличение счетчика name на value."""
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def counter(self, name: str) -> int:
+        """Значение счетчика name."""
+        return self.__counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Сводка: {"latency": {операция: сводка Histogram}, "counters": {счетчик: значение}}."""
+        with self.__lock:
+            return {
+                "latency": {name: histogram.snapshot() for name, histogram in sorted(self.__latency.items())},
+                "counters": dict(sorted(self.__counters.items())),
+            }
+
+    def reset(self) -> None:
+        """Сброс всех метрик."""
+        with self.__lock:
+            self.__latency = {}
+            self.__counters = {}
+
+
+class Tracer:
+    """Запись интервалов выполнения операций (span) в JSONL файл.
+
+    Каждая строка файла - JSON объект {"name", "start", "duration", "pid", "thread"} и дополнительные атрибуты.
+    start - время начала по часам time.time(), duration - длительность в секундах.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.__lock = threading.Lock()
+        self.__file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def span(self, name: str, start: float, duration: float, **attributes) -> None:
+        """Запись интервала выполнения операции."""
+        line: str = json.dumps({
+            "name": name, "start": start, "duration": duration, "pid": os.getpid(),
+            "thread": threading.get_ident(), **attributes,
+        }, ensure_ascii=False)
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.write(line + "\n")
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__file.close()
+
+
+def tracer_from_env() -> Tracer | None:
+    """Трассировщик, если задана переменная окружения PHONEBOOK_TRACE с путем к JSONL файлу, иначе None."""
+    path: str | None = os.environ.get(TRACE_ENV)
+    return Tracer(path) if path else None
+
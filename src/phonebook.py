@@ -1,19 +1,174 @@
-from pydantic import BaseModel, Field, ValidationError
-from tinydb import TinyDB, Query
-from tinydb.queries import QueryLike
+import heapq
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from typing import Iterable, Iterator
 
-NAME_PATTERN = "^[А-Я][а-я]*$"
-PERSONAL_PHONE_NUMBER_PATTERN = "^\d{11}$"
-WORK_PHONE_NUMBER_PATTERN = PERSONAL_PHONE_NUMBER_PATTERN
+from src.backends import Backend, open_backend
+from src.cache import Cache, filters_key
+from src.compact import ContactRow
+from src.indexes import (
+    FuzzyIndex, HashIndex, NgramIndex, OrderedIndex, PrefixIndex, UniqueIndex, intersect_postings
+)
+from src.locks import FileLock, ReadWriteLock
+from src.metrics import Metrics, tracer_from_env
+from src.validation import validate_contacts, validate_fields
+
+INDEXED_FIELDS = ("last_name", "first_name", "patronymic", "organization", "office_number")
+PREFIX_FIELDS = ("last_name", "first_name", "patronymic", "organization")
+SUBSTRING_FIELDS = ("office_number", "personal_number")
+ORDER_FIELDS = ("last_name", "first_name", "patronymic", "organization")
+FUZZY_FIELDS = ("last_name", "first_name", "patronymic")
+
+
+def _as_dict(document) -> dict:
+    """Новый словарь с полями контакта: ContactRow и документы хранилищ не выдаются наружу."""
+    return document.to_dict() if isinstance(document, ContactRow) else dict(document)
+
+
+def synchronized(method):
+    """Выполнение метода Phonebook, изменяющего данные, под исключительной блокировкой (см. Phonebook._writing)."""
+    return _instrumented(method, exclusive=True)
+
+
+def shared(method):
+    """Выполнение читающего метода Phonebook под разделяемой блокировкой (см. Phonebook._reading)."""
+    return _instrumented(method, exclusive=False)
+
+
+def _instrumented(method, exclusive: bool):
+    """Обертка метода Phonebook: блокировка, учет времени выполнения в статистике (см. Phonebook.stats) и, при
+    включенной трассировке, запись вызова в файл трассировки."""
+    name: str = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._writing() if exclusive else self._reading():
+            started: float = time.time() if self._tracer is not None else 0
+            start: float = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                elapsed: float = time.perf_counter() - start
+                self._metrics.observe(name, elapsed)
+                if self._tracer is not None:
+                    self._tracer.span(name, started, elapsed)
+    return wrapper
 
 
 class Phonebook:
-    def __init__(self, file_path: str = "phonebook.json") -> None:
-        self.__contacts: TinyDB = TinyDB(file_path)
+    def __init__(self, file_path: str = "phonebook.json", indexed_fields: Iterable[str] = INDEXED_FIELDS,
+                 prefix_fields: Iterable[str] = PREFIX_FIELDS, substring_fields: Iterable[str] = SUBSTRING_FIELDS,
+                 fuzzy_fields: Iterable[str] = FUZZY_FIELDS,
+                 write_behind: bool = False, flush_every: int = 1000, flush_interval: float | None = 5.0,
+                 fsync: str = "always", journal: bool | None = None, compact_threshold: int = 4 * 1024 * 1024,
+                 compact: bool = False, progress=None, shared: bool = False, query_cache_size: int = 128,
+                 result_cache_size: int = 256, cache_policy: str = "lru", backend: Backend | None = None) -> None:
+        """
+        Args:
+            file_path: Путь к файлу базы данных. Файлы с расширениями .db, .sqlite и .sqlite3 открываются как база
+                данных SQLite, остальные как JSON файл TinyDB.
+            indexed_fields: Поля, по которым строятся вторичные индексы для поиска. По personal_number всегда
+                строится уникальный индекс.
+            prefix_fields: Поля, для которых строится индекс поиска по префиксу (см. find_contacts).
+            substring_fields: Поля, для которых строится n-граммный индекс поиска по подстроке (см. find_contacts).
+            fuzzy_fields: Поля, для которых строится индекс поиска с опечатками (см. fuzzy_contacts). По этим полям
+                всегда строится и вторичный индекс.
+            write_behind: Режим отложенной записи. Изменения накапливаются в памяти и записываются на диск после
+                flush_every изменений, через flush_interval секунд, при вызове flush() и при закрытии базы.
+            flush_every: Количество изменений между сбросами на диск в режиме отложенной записи.
+            flush_interval: Максимальное время в секундах между изменением и его записью на диск в режиме
+                отложенной записи. None отключает сброс по времени.
+            fsync: Политика fsync файла базы данных: "always", "close" или "never".
+            journal: Хранить изменения в журнале (file_path + ".journal") вместо перезаписи всего файла (см.
+                JournalBackend): каждое изменение дописывает в журнал только измененные контакты, а чтение по id
+                выполняется из памяти, поэтому операции по личному номеру не зависят от размера файла. Журнал
+                сворачивается в file_path в фоне после compact_threshold байт и при закрытии базы. Параметры
+                write_behind, flush_every и flush_interval в этом режиме не используются. None - журнал
+                используется для JSON файлов, если не заданы write_behind и shared. При journal=False каждое
+                изменение перезаписывает, а каждое чтение перечитывает весь JSON файл.
+            compact_threshold: Размер журнала в байтах, после которого запускается уплотнение.
+            compact: Хранить контакты в памяти в компактном колоночном представлении (см. CompactBackend). Запись
+                на диск выполняется с отложенной записью по параметрам flush_every и flush_interval.
+            progress: Функция progress(прочитано_байт, размер_файла), которая вызывается при потоковой загрузке
+                файла в режиме compact.
+            shared: Режим совместной работы нескольких процессов с одним файлом. Чтение выполняется под
+                разделяемой, запись - под исключительной блокировкой файла file_path + ".lock" (см. FileLock).
+                Каждое изменение сразу записывается на диск и увеличивает номер поколения базы, остальные процессы
+                перечитывают базу перед следующей операцией, только если поколение или время изменения файла
+                отличаются от загруженных. Не поддерживается вместе с journal и backend.
+            query_cache_size: Размер кэша собранных предикатов поиска (проверка условий без индекса и запросы
+                TinyDB). Ключ кэша - набор условий без учета порядка.
+            result_cache_size: Размер кэша результатов get_contacts и find_contacts. 0 отключает кэш. Результаты из
+                кэша возвращаются копиями, поэтому их можно изменять.
+            cache_policy: Политика вытеснения кэшей: "lru" или "fifo" (см. Cache).
+            backend: Готовое хранилище контактов. Если передано, file_path и параметры хранения не используются.
+
+        Потоки одного процесса могут читать одновременно, если хранилище это допускает (Backend.concurrent_reads),
+        изменения выполняются по одному.
 
-    def get_all_contacts(self):
-        return self.__contacts.all()
+        Если задана переменная окружения PHONEBOOK_TRACE, каждый вызов публичного метода записывается в JSONL файл
+        по этому пути (см. Tracer). Без переменной трассировка не выполняется.
+        """
+        if journal is None:
+            journal = not (write_behind or shared)
+        if shared and (journal or backend is not None):
+            raise ValueError("Режим shared не поддерживается вместе с journal и backend")
+        self._lock: ReadWriteLock = ReadWriteLock()
+        self._metrics: Metrics = Metrics()
+        self._tracer = tracer_from_env()
+        self.__file_path: str = file_path
+        self.__queries: Cache = Cache(query_cache_size, cache_policy)
+        self.__results: Cache = Cache(result_cache_size, cache_policy)
+        self.__write_generation: int = 0
+        self.__update_generation: int = 0
+        self.__field_generations: dict = {}
+        self.__open_options: dict = {
+            "lock": self._lock, "write_behind": write_behind, "flush_every": flush_every,
+            "flush_interval": flush_interval, "fsync": fsync, "journal": journal,
+            "compact_threshold": compact_threshold, "compact": compact, "progress": progress,
+            "query_cache": self.__queries,
+        }
+        self.__file_lock: FileLock | None = FileLock(file_path) if shared else None
+        self.__generation: int = 0
+        self.__signature: tuple | None = None
+        self.__changes: int = 0
+        self.__in_write: bool = False
+        self.__personal_numbers: UniqueIndex = UniqueIndex("personal_number")
+        self.__indexes: dict = {"personal_number": self.__personal_numbers}
+        self.__prefix_indexes: dict = {field: PrefixIndex(field) for field in prefix_fields}
+        self.__substring_indexes: dict = {field: NgramIndex(field) for field in substring_fields}
+        self.__fuzzy_indexes: dict = {field: FuzzyIndex(field) for field in fuzzy_fields}
+        for field in (*indexed_fields, *self.__fuzzy_indexes):
+            if field not in self.__indexes:
+                self.__indexes[field] = self.__prefix_indexes.get(field) or HashIndex(field)
+        self.__order: OrderedIndex = OrderedIndex(ORDER_FIELDS)
+        self.__all_indexes: list = [
+            self.__order,
+            *self.__indexes.values(),
+            *(index for field, index in self.__prefix_indexes.items() if self.__indexes.get(field) is not index),
+            *self.__substring_indexes.values(),
+            *self.__fuzzy_indexes.values(),
+        ]
+        if self.__file_lock is None:
+            self.__contacts: Backend = backend or open_backend(file_path, **self.__open_options)
+            self.__rebuild_indexes()
+        else:
+            with self.__file_lock.shared():
+                self.__load()
+
+    @shared
+    def get_all_contacts(self) -> list:
+        """Все контакты справочника.
+
+        Returns:
+            Список контактов. Каждый контакт - новый словарь, его изменение не влияет на хранилище.
+        """
+        return [_as_dict(document) for document in self.__contacts.all()]
 
+    @synchronized
     def add_contact(self, first_name: str, last_name: str, patronymic: str, organization: str, office_number: str,
                     personal_number: str) -> dict:
         """Добавляет контакт в базу данных.
@@ -37,19 +192,68 @@ class Phonebook:
             {"success": False, "message": "Контакт с таким личным номером уже создан"}
 
         """
-        try:
-            if not self.__contacts.contains(Query().personal_number == personal_number):
-                contact: Phonebook.__Contact = self.__Contact(
-                    first_name=first_name, last_name=last_name, patronymic=patronymic, organization=organization,
-                    office_number=office_number, personal_number=personal_number
-                )
-                result: int = self.__contacts.insert(contact.model_dump())
-                return {"success": True, "message": "Контакт успешно создан!", "id": result}
-            else:
-                return {"success": False, "message": "Контакт с таким личным номером уже создан."}
-        except ValidationError:
+        if personal_number in self.__personal_numbers:
+            return {"success": False, "message": "Контакт с таким личным номером уже создан."}
+        document, errors = self.__validate([{
+            "first_name": first_name, "last_name": last_name, "patronymic": patronymic,
+            "organization": organization, "office_number": office_number, "personal_number": personal_number
+        }])[0]
+        if errors:
             return {"success": False, "message": "Переданы некорректные данные."}
+        result: int = self.__contacts.insert(document)
+        self.__changes += 1
+        self.__invalidate()
+        self.__index_document(result, document)
+        return {"success": True, "message": "Контакт успешно создан!", "id": result}
+
+    @synchronized
+    def add_contacts(self, contacts: Iterable[dict], batch_size: int = 1000) -> list:
+        """Массовое добавление контактов.
+
+        Контакты проверяются пачками по batch_size записей, уникальность личного номера проверяется как по базе
+        данных, так и внутри переданных контактов. Все корректные контакты записываются в базу одной операцией.
+
+        Args:
+            contacts: Контакты в формате словарей с ключами first_name, last_name, patronymic, organization,
+                office_number, personal_number.
+            batch_size: Размер пачки при проверке данных.
+
+        Returns:
+            Список результатов для каждого переданного контакта в формате add_contact. Результат для некорректного
+            контакта дополнительно содержит ключ "errors" со списком ошибок по полям (см. validate_contacts). Пример:
+            [{"success": True, "message": "Контакт успешно создан!", "id": 3},
+             {"success": False, "message": "Контакт с таким личным номером уже создан."},
+             {"success": False, "message": "Переданы некорректные данные.",
+              "errors": [{"field": "first_name", "type": "pattern", "message": "..."}]}]
+        """
+        report: list = []
+        documents: list = []
+        positions: list = []
+        personal_numbers: set = set()
+        contacts = iter(contacts)
+        while batch := list(islice(contacts, batch_size)):
+            for document, errors in self.__validate(batch):
+                if errors:
+                    report.append({"success": False, "message": "Переданы некорректные данные.", "errors": errors})
+                elif document["personal_number"] in self.__personal_numbers or \
+                        document["personal_number"] in personal_numbers:
+                    report.append({"success": False, "message": "Контакт с таким личным номером уже создан."})
+                else:
+                    personal_numbers.add(document["personal_number"])
+                    positions.append(len(report))
+                    documents.append(document)
+                    report.append({"success": True, "message": "Контакт успешно создан!"})
+
+        doc_ids: list = self.__contacts.insert_many(documents)
+        self.__changes += len(doc_ids)
+        if doc_ids:
+            self.__invalidate()
+        for position, doc_id in zip(positions, doc_ids):
+            report[position]["id"] = doc_id
+        self.__index_documents(list(zip(doc_ids, documents)))
+        return report
 
+    @shared
     def get_contacts(self, **kwargs) -> list:
         """Поиск списка контактов.
 
@@ -68,14 +272,137 @@ class Phonebook:
         """
         if not kwargs:
             return self.get_all_contacts()
+        return self.__search(kwargs, partial=False)
+
+    @shared
+    def find_contacts(self, **kwargs) -> list:
+        """Поиск списка контактов по частичному совпадению.
 
-        search_query: QueryLike = self.__make_query(**kwargs)
+        Текстовые поля (ФИО и организация) ищутся по началу значения, номера телефонов - по вхождению подстроки.
+        Для полей из prefix_fields и substring_fields используются индексы, остальные условия проверяются только для
+        найденных кандидатов.
+
+        Args:
+            **kwargs: Начала значений или подстроки, по которым будет происходить поиск. Например,
+                find_contacts(last_name="Ива", office_number="575").
 
-        if search_query:
-            contacts: list = self.__contacts.search(search_query)
-            return contacts
-        return []
+        Returns:
+            Список контактов, удовлетворяющих условиям поиска, в порядке их хранения в базе данных.
+        """
+        if not kwargs:
+            return self.get_all_contacts()
+        return self.__search(kwargs, partial=True)
 
+    @shared
+    def fuzzy_contacts(self, max_distance: int = 1, limit: int | None = None, **kwargs) -> list:
+        """Поиск контактов с опечатками в ФИО.
+
+        Значения полей с индексом нечеткого поиска (по умолчанию фамилия, имя и отчество) ищутся с расстоянием
+        редактирования не больше max_distance без учета регистра или с тем же фонетическим ключом (см.
+        FuzzyIndex.lookup_fuzzy), остальные поля - по точному совпадению, как в get_contacts.
+
+        Args:
+            max_distance: Наибольшее количество опечаток (вставок, удалений, замен и перестановок букв) в каждом
+                поле.
+            limit: Наибольшее количество контактов. None - все найденные контакты.
+            **kwargs: Условия поиска.
+
+        Returns:
+            Список контактов по возрастанию суммы расстояний по полям, при равной сумме - по фамилии, имени,
+            отчеству и организации. Например, по last_name="Шрут" первыми идут контакты с фамилией "Шрут", затем
+            "Шрутт". Если среди условий нет полей нечеткого поиска, результат совпадает с первыми limit
+            контактами get_sorted_contacts(**kwargs).
+        """
+        distances: dict | None = None
+        exact: dict = {}
+        for field, value in kwargs.items():
+            index: FuzzyIndex | None = self.__fuzzy_indexes.get(field)
+            if index is None:
+                exact[field] = value
+                continue
+            self._metrics.count("index_hits")
+            field_distances: dict = {}
+            for distance, candidate in index.lookup_fuzzy(value, max_distance):
+                for doc_id in self.__indexes[field].lookup(candidate):
+                    field_distances[doc_id] = distance
+            if distances is None:
+                distances = field_distances
+            else:
+                distances = {doc_id: distance + distances[doc_id] for doc_id, distance in field_distances.items()
+                             if doc_id in distances}
+        if distances is None:
+            # Без полей нечеткого поиска все расстояния равны нулю: первые limit контактов берутся из упорядоченного
+            # индекса, из хранилища читаются только они.
+            entries: list = self.__order.page(self.__filtered_ids(kwargs, False), limit=limit)
+            return [_as_dict(document) for _, document in self.__read([entry[-1] for entry in entries])]
+        if exact:
+            matches: set = self.__filtered_ids(exact, False)
+            distances = {doc_id: distance for doc_id, distance in distances.items() if doc_id in matches}
+        rank = lambda doc_id: (distances[doc_id], self.__order.key(doc_id))  # noqa: E731
+        ranked: list = sorted(distances, key=rank) if limit is None else heapq.nsmallest(limit, distances, key=rank)
+        return [_as_dict(document) for _, document in self.__read(ranked)]
+
+    @shared
+    def get_sorted_contacts(self, partial: bool = False, **kwargs) -> list:
+        """Поиск списка контактов, упорядоченного по фамилии, имени, отчеству и организации.
+
+        Порядок берется из упорядоченного индекса, который обновляется при каждом изменении базы, поэтому список
+        не сортируется заново. Контакты с одинаковыми ФИО и организацией идут в порядке добавления.
+
+        Args:
+            partial: Поиск по частичному совпадению, как в find_contacts. Иначе - точное совпадение, как в
+                get_contacts.
+            **kwargs: Условия поиска. Если не указаны, возвращаются все контакты.
+
+        Returns:
+            Упорядоченный список контактов, удовлетворяющих условиям поиска.
+        """
+        return [_as_dict(document) for _, document in self.__sorted_pairs(kwargs, partial)]
+
+    @shared
+    def iter_contacts(self, order: str = "name", filters: dict | None = None, after: tuple | None = None,
+                      limit: int | None = None, offset: int = 0, partial: bool = False) -> Iterator[tuple]:
+        """Постраничное получение контактов (keyset-пагинация).
+
+        Страница выбирается по упорядоченному индексу, из хранилища читаются только контакты этой страницы. Для
+        перехода на следующую страницу передайте в after курсор последнего контакта текущей, для перехода на
+        произвольную страницу - offset.
+
+        Args:
+            order: Порядок контактов. Поддерживается "name" - фамилия, имя, отчество, организация.
+            filters: Условия поиска, как в get_contacts (или find_contacts при partial=True).
+            after: Курсор, после которого начинается страница.
+            limit: Размер страницы. None - все оставшиеся контакты.
+            offset: Количество контактов, пропускаемых после after.
+            partial: Поиск по частичному совпадению.
+
+        Returns:
+            Итератор по парам (курсор, контакт).
+        """
+        if order != "name":
+            raise ValueError(f"Неизвестный порядок контактов: {order}")
+        doc_ids: set | None = self.__filtered_ids(filters or {}, partial)
+        entries: list = self.__order.page(doc_ids, after, offset, limit)
+        pairs: list = self.__read([entry[-1] for entry in entries])
+        return iter([(entry, _as_dict(document)) for entry, (_, document) in zip(entries, pairs)])
+
+    @shared
+    def count_contacts(self, partial: bool = False, **kwargs) -> int:
+        """Количество контактов, удовлетворяющих условиям поиска.
+
+        Без условий и при поиске только по индексированным полям контакты не читаются из хранилища.
+
+        Args:
+            partial: Поиск по частичному совпадению.
+            **kwargs: Условия поиска.
+
+        Returns:
+            Количество контактов.
+        """
+        doc_ids: set | None = self.__filtered_ids(kwargs, partial)
+        return len(self.__order) if doc_ids is None else len(doc_ids)
+
+    @synchronized
     def delete_contact(self, personal_number: str) -> dict:
         """Удаление контакта.
 
@@ -90,56 +417,519 @@ class Phonebook:
             {"success": True, "message": "Контакт успешно удален!"}
             {"success": False, "message": "Контакта не существует."}
         """
-        if self.__contacts.contains(Query().personal_number == personal_number):
-            self.__contacts.remove(Query().personal_number == personal_number)
+        doc_id: int | None = self.__personal_numbers.get(personal_number)
+        if doc_id is not None:
+            document: dict = self.__contacts.get(doc_id)
+            self.__contacts.remove(doc_id)
+            self.__changes += 1
+            self.__invalidate()
+            self.__unindex_document(doc_id, document)
             return {"success": True, "message": "Контакт успешно удален!"}
         return {"success": False, "message": "Контакта не существует."}
 
+    @synchronized
     def update_contact(self, personal_num: str, **kwargs) -> dict:
         """Обновление контакта по персональному номеру телефона.
 
         Args:
             personal_num: Персональный номер телефона контакта, который будет обновлен.
-            **kwargs: Параметры, которые нужно обновить в контакте. Могут включать first_name, last_name,
-                     patronymic, organization, office_number и другие поля контакта.
+            **kwargs: Параметры, которые нужно обновить в контакте: first_name, last_name, patronymic,
+                     organization, office_number и personal_number. Значения проверяются по тем же правилам, что и
+                     при добавлении контакта.
 
         Returns:
             Словарь, содержащий ключ "success" и "message". Параметр "success" принимает значение True, если контакт
-            успешно обновлен, иначе False. Параметр "message" передает информацию о результате функции.
+            успешно обновлен, иначе False. Параметр "message" передает информацию о результате функции. Если новый
+            личный номер уже принадлежит другому контакту, обновление не выполняется. Для некорректных данных
+            дополнительно возвращается ключ "errors" (см. validate_fields), контакт не изменяется.
         """
-        if self.__contacts.contains(Query().personal_number == personal_num):
-            self.__contacts.update(kwargs, Query().personal_number == personal_num)
-            return {"success": True, "message": "Контакт успешно обновлен!"}
-        else:
+        doc_id: int | None = self.__personal_numbers.get(personal_num)
+        if doc_id is None:
             return {"success": False, "message": "Контакт не найден."}
+        start: float = time.perf_counter()
+        errors: list = validate_fields(kwargs)
+        self._metrics.observe("validate", time.perf_counter() - start)
+        if errors:
+            return {"success": False, "message": "Переданы некорректные данные.", "errors": errors}
 
-    def close_db(self):
-        self.__contacts.close()
+        new_personal_number: str = kwargs.get("personal_number", personal_num)
+        if new_personal_number != personal_num and new_personal_number in self.__personal_numbers:
+            return {"success": False, "message": "Контакт с таким личным номером уже создан."}
+
+        document: dict = self.__contacts.get(doc_id)
+        self.__contacts.update(doc_id, kwargs)
+        self.__changes += 1
+        self.__invalidate([field for field, value in kwargs.items() if document.get(field) != value])
+        self.__unindex_document(doc_id, document)
+        self.__index_document(doc_id, {**document, **kwargs})
+        return {"success": True, "message": "Контакт успешно обновлен!"}
+
+    @synchronized
+    def update_contacts(self, filters: dict, changes: dict, partial: bool = False) -> dict:
+        """Обновление всех контактов, удовлетворяющих условиям, одной записью в хранилище.
+
+        Контакты отбираются по индексам, как в get_contacts (при partial=True - как в find_contacts). Изменения
+        проверяются по тем же правилам, что и при добавлении контакта. Личный номер можно изменить только у одного
+        контакта и только на номер, не принадлежащий другому контакту.
+
+        Args:
+            filters: Условия отбора контактов. Пустые условия не допускаются.
+            changes: Новые значения полей.
+            partial: Отбор по частичному совпадению.
 
-    @staticmethod
-    def __make_query(**kwargs) -> QueryLike | None:
-        """Составление QueryLike объекта для поиска по базе данных.
+        Returns:
+            Словарь с ключами "success", "message" и, если контакты обновлены, "count" - количество обновленных
+            контактов. Для некорректных изменений дополнительно возвращается ключ "errors" (см. validate_contacts).
+            Примеры:
+            {"success": True, "message": "Контакты успешно обновлены!", "count": 3}
+            {"success": False, "message": "Контакты не найдены."}
+        """
+        if not filters:
+            return {"success": False, "message": "Не заданы условия отбора."}
+        if not changes:
+            return {"success": False, "message": "Не заданы изменения."}
+        start: float = time.perf_counter()
+        errors: list = validate_fields(changes)
+        self._metrics.observe("validate", time.perf_counter() - start)
+        if errors:
+            return {"success": False, "message": "Переданы некорректные данные.", "errors": errors}
+        doc_ids: list = sorted(self.__filtered_ids(filters, partial))
+        if not doc_ids:
+            return {"success": False, "message": "Контакты не найдены."}
+        if "personal_number" in changes:
+            owner: int | None = self.__personal_numbers.get(changes["personal_number"])
+            if len(doc_ids) > 1 or owner not in (None, doc_ids[0]):
+                return {"success": False, "message": "Контакт с таким личным номером уже создан."}
+
+        pairs: list = self.__contacts.get_many(doc_ids)
+        self.__contacts.update_many(doc_ids, changes)
+        self.__changes += len(doc_ids)
+        self.__invalidate({field for _, document in pairs for field, value in changes.items()
+                           if document.get(field) != value})
+        for doc_id, document in pairs:
+            self.__unindex_document(doc_id, document)
+            self.__index_document(doc_id, {**document, **changes})
+        return {"success": True, "message": "Контакты успешно обновлены!", "count": len(doc_ids)}
+
+    @synchronized
+    def delete_contacts(self, filters: dict, partial: bool = False) -> dict:
+        """Удаление всех контактов, удовлетворяющих условиям, одной записью в хранилище.
 
         Args:
-            **kwargs: параметры, по которым будет производиться поиск.
+            filters: Условия отбора контактов, как в get_contacts (при partial=True - как в find_contacts). Пустые
+                условия не допускаются.
+            partial: Отбор по частичному совпадению.
+
+        Returns:
+            Словарь с ключами "success", "message" и, если контакты удалены, "count". Примеры:
+            {"success": True, "message": "Контакты успешно удалены!", "count": 3}
+            {"success": False, "message": "Контакты не найдены."}
+        """
+        if not filters:
+            return {"success": False, "message": "Не заданы условия отбора."}
+        doc_ids: list = sorted(self.__filtered_ids(filters, partial))
+        if not doc_ids:
+            return {"success": False, "message": "Контакты не найдены."}
+        pairs: list = self.__contacts.get_many(doc_ids)
+        self.__contacts.remove_many(doc_ids)
+        self.__changes += len(doc_ids)
+        self.__invalidate()
+        for doc_id, document in pairs:
+            self.__unindex_document(doc_id, document)
+        return {"success": True, "message": "Контакты успешно удалены!", "count": len(doc_ids)}
+
+    @synchronized
+    def upsert_contact(self, first_name: str, last_name: str, patronymic: str, organization: str,
+                       office_number: str, personal_number: str) -> dict:
+        """Добавление контакта или обновление существующего контакта с тем же личным номером.
+
+        Аргументы и их проверка такие же, как в add_contact.
 
         Returns:
-            QueryLike объект для поиска, если запрашиваемый объект существует, иначе None.
+            Словарь с ключами "success", "message", "id" и "created" - True, если контакт добавлен, False, если
+            обновлен. Для некорректных данных возвращаются только "success", "message" и "errors". Примеры:
+            {"success": True, "message": "Контакт успешно создан!", "id": 3, "created": True}
+            {"success": True, "message": "Контакт успешно обновлен!", "id": 3, "created": False}
         """
-        query: Query = Query()
-        search_query = None
+        document, errors = self.__validate([{
+            "first_name": first_name, "last_name": last_name, "patronymic": patronymic,
+            "organization": organization, "office_number": office_number, "personal_number": personal_number
+        }])[0]
+        if errors:
+            return {"success": False, "message": "Переданы некорректные данные.", "errors": errors}
+        doc_id: int | None = self.__personal_numbers.get(personal_number)
+        if doc_id is None:
+            doc_id = self.__contacts.insert(document)
+            self.__changes += 1
+            self.__invalidate()
+            self.__index_document(doc_id, document)
+            return {"success": True, "message": "Контакт успешно создан!", "id": doc_id, "created": True}
+
+        current: dict = self.__contacts.get(doc_id)
+        changes: dict = {field: value for field, value in document.items() if current.get(field) != value}
+        if changes:
+            self.__contacts.update(doc_id, changes)
+            self.__changes += 1
+            self.__invalidate(changes)
+            self.__unindex_document(doc_id, current)
+            self.__index_document(doc_id, {**current, **changes})
+        return {"success": True, "message": "Контакт успешно обновлен!", "id": doc_id, "created": False}
+
+    @synchronized
+    def merge_contacts(self, plan: Iterable[dict]) -> dict:
+        """Объединение дубликатов по плану одной записью в хранилище: дубликаты удаляются, остается основной контакт.
+
+        Args:
+            plan: Группы дубликатов вида {"keep": личный номер основного контакта, "duplicates": [личные номера
+                дубликатов]} (см. src.dedup.find_duplicates). Группа пропускается, если основного контакта уже нет.
+                Дубликаты, которых уже нет, не учитываются.
+
+        Returns:
+            Словарь с ключами "success", "message", "count" - количество удаленных дубликатов и "skipped" -
+            количество пропущенных групп. Пример:
+            {"success": True, "message": "Дубликаты объединены!", "count": 3, "skipped": 0}
+        """
+        doc_ids: set = set()
+        skipped: int = 0
+        for group in plan:
+            keep: int | None = self.__personal_numbers.get(group["keep"])
+            if keep is None:
+                skipped += 1
+                continue
+            doc_ids.update(
+                doc_id for doc_id in map(self.__personal_numbers.get, group["duplicates"])
+                if doc_id is not None and doc_id != keep
+            )
+        if not doc_ids:
+            return {"success": False, "message": "Дубликаты не найдены.", "count": 0, "skipped": skipped}
+        ordered: list = sorted(doc_ids)
+        pairs: list = self.__contacts.get_many(ordered)
+        self.__contacts.remove_many(ordered)
+        self.__changes += len(ordered)
+        self.__invalidate()
+        for doc_id, document in pairs:
+            self.__unindex_document(doc_id, document)
+        return {"success": True, "message": "Дубликаты объединены!", "count": len(ordered), "skipped": skipped}
+
+    def stats(self) -> dict:
+        """Статистика работы справочника с момента открытия или вызова reset_stats.
+
+        Returns:
+            Словарь с ключами:
+            "latency" - время выполнения публичных методов и проверки данных ("validate") в секундах: для каждого
+                count, total, mean, max, оценки p50/p90/p99 и корзины гистограммы;
+            "counters" - счетчики: index_hits/index_misses (условия поиска по индексированным и
+                неиндексированным полям), full_scans, documents_scanned/documents_returned, contacts_validated,
+                contacts_invalid;
+            "index_hit_rate" - доля условий поиска, обслуженных индексами;
+            "scan_efficiency" - отношение возвращенных контактов к просмотренным;
+            "storage" - статистика записи на диск (см. Backend.io_stats);
+            счетчик "reloads" - количество перечитываний базы, измененной другим процессом, в режиме shared;
+            "caches" - статистика кэшей "queries" (собранные предикаты) и "results" (результаты поиска), см.
+                Cache.stats;
+            "contacts" - количество контактов.
+        """
+        with self._lock:
+            snapshot: dict = self._metrics.snapshot()
+            counter = self._metrics.counter
+            lookups: int = counter("index_hits") + counter("index_misses")
+            scanned: int = counter("documents_scanned")
+            return {
+                **snapshot,
+                "index_hit_rate": counter("index_hits") / lookups if lookups else None,
+                "scan_efficiency": counter("documents_returned") / scanned if scanned else None,
+                "storage": self.__contacts.io_stats(),
+                "caches": {"queries": self.__queries.stats(), "results": self.__results.stats()},
+                "contacts": len(self.__order),
+            }
+
+    def reset_stats(self) -> None:
+        """Сброс статистики времени выполнения и счетчиков, в том числе кэшей. Статистика записи хранилища не
+        сбрасывается."""
+        with self._lock:
+            self._metrics.reset()
+            self.__queries.reset_stats()
+            self.__results.reset_stats()
+
+    @synchronized
+    def flush(self) -> None:
+        """Запись несохраненных изменений на диск. Без режима отложенной записи ничего не делает."""
+        self.__contacts.flush()
+
+    def close_db(self):
+        with self._lock.write():
+            self.__contacts.close()
+            if self.__file_lock is not None:
+                self.__file_lock.close()
+            if self._tracer is not None:
+                self._tracer.close()
+
+    @contextmanager
+    def _reading(self):
+        """Блокировка для чтения.
+
+        Если хранилище допускает одновременное чтение, потоки читают под разделяемой блокировкой, иначе по
+        одному. В режиме shared чтение выполняется под разделяемой блокировкой файла; если базу изменил другой
+        процесс, она перечитывается перед чтением.
+        """
+        while True:
+            with self._lock.read() if self.__contacts.concurrent_reads else self._lock.write():
+                if self.__file_lock is None or self.__in_write:
+                    yield
+                    return
+                with self.__file_lock.shared():
+                    if not self.__stale():
+                        yield
+                        return
+            self.__reload()
+
+    @contextmanager
+    def _writing(self):
+        """Блокировка для изменения данных.
+
+        В режиме shared изменение выполняется под исключительной блокировкой файла: база перечитывается, если ее
+        изменил другой процесс, а после изменения записывается на диск, и номер поколения увеличивается.
+        """
+        with self._lock.write():
+            if self.__file_lock is None or self.__in_write:
+                yield
+                return
+            with self.__file_lock.exclusive():
+                if self.__stale():
+                    self.__reload()
+                changes: int = self.__changes
+                self.__in_write = True
+                try:
+                    yield
+                finally:
+                    self.__in_write = False
+                    if self.__changes != changes:
+                        self.__contacts.flush()
+                        self.__generation = self.__file_lock.bump()
+                        self.__signature = self.__file_signature()
+
+    def __load(self) -> None:
+        """Открытие хранилища и построение индексов в режиме shared.
+
+        Вызывается под блокировкой файла, поэтому другие процессы не могут изменить базу между открытием и
+        запоминанием ее поколения. Поколение запоминается после открытия, так как хранилище может создать файл.
+        """
+        self.__contacts = open_backend(self.__file_path, **self.__open_options)
+        self.__generation = self.__file_lock.generation()
+        self.__signature = self.__file_signature()
+        self.__rebuild_indexes()
+
+    def __reload(self) -> None:
+        """Перечитывание базы, измененной другим процессом."""
+        with self._lock.write(), self.__file_lock.shared():
+            if self.__stale():
+                self.__contacts.close()
+                self.__load()
+                self._metrics.count("reloads")
+
+    def __stale(self) -> bool:
+        """Проверка, изменил ли базу другой процесс после загрузки: по номеру поколения и по файлу базы."""
+        return self.__file_lock.generation() != self.__generation or self.__file_signature() != self.__signature
+
+    def __file_signature(self) -> tuple | None:
+        try:
+            stat: os.stat_result = os.stat(self.__file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def __rebuild_indexes(self) -> None:
+        """Перестроение всех индексов за один проход по базе данных."""
+        for index in self.__all_indexes:
+            index.clear()
+        self.__invalidate()
+        self.__results.clear()
+        for doc_id, document in self.__contacts.items():
+            self.__index_document(doc_id, document)
+        self.__order.sort()
+
+    def __index_document(self, doc_id: int, document: dict) -> None:
+        """Добавление документа во все индексы."""
+        for index in self.__all_indexes:
+            index.add(doc_id, document)
+
+    def __index_documents(self, pairs: list) -> None:
+        """Добавление пачки пар (id, документ) во все индексы. Упорядоченный индекс сортируется один раз на пачку."""
+        for index in self.__all_indexes:
+            if index is self.__order:
+                index.add_many(pairs)
+                continue
+            for doc_id, document in pairs:
+                index.add(doc_id, document)
+
+    def __unindex_document(self, doc_id: int, document: dict) -> None:
+        """Удаление документа из всех индексов."""
+        for index in self.__all_indexes:
+            index.remove(doc_id, document)
+
+    def __predicate(self, conditions: dict, partial: bool):
+        """Собранная функция проверки контакта на соответствие условиям (с кэшированием по набору условий).
+
+        При частичном совпадении номера проверяются по подстроке, остальные поля по префиксу. При точном совпадении
+        значения всех полей сравниваются одним сравнением кортежей.
+        """
+        key: tuple | None = filters_key(conditions)
+        predicate = self.__queries.get(("partial" if partial else "exact", key)) if key is not None else None
+        if predicate is None:
+            predicate = _compile_predicate(conditions, partial)
+            if key is not None:
+                self.__queries.put(("partial" if partial else "exact", key), predicate)
+        return predicate
+
+    def __lookup(self, kwargs: dict, partial: bool) -> tuple:
+        """Поиск кандидатов по индексам.
+
+        Posting list'ы индексированных полей пересекаются, начиная с самого селективного.
+
+        Returns:
+            Пара (множество id кандидатов или None, если ни одно поле не индексировано; условия по полям без
+            индекса).
+        """
+        postings: list = []
+        residual: dict = {}
         for key, value in kwargs.items():
-            if search_query is None:
-                search_query = (query[key] == value)
+            if not partial and key in self.__indexes:
+                postings.append(self.__indexes[key].lookup(value))
+            elif partial and key in self.__prefix_indexes:
+                postings.append(self.__prefix_indexes[key].lookup_prefix(value))
+            elif partial and key in self.__substring_indexes:
+                postings.append(self.__substring_indexes[key].lookup_substring(value))
             else:
-                search_query &= (query[key] == value)
-        return search_query
-
-    class __Contact(BaseModel):
-        """Класс для валидации информации о контакте."""
-        first_name: str = Field(pattern=NAME_PATTERN)
-        last_name: str = Field(pattern=NAME_PATTERN)
-        patronymic: str = Field(pattern=NAME_PATTERN)
-        organization: str
-        office_number: str = Field(pattern=WORK_PHONE_NUMBER_PATTERN)
-        personal_number: str = Field(pattern=PERSONAL_PHONE_NUMBER_PATTERN)
+                residual[key] = value
+        self._metrics.count("index_hits", len(postings))
+        self._metrics.count("index_misses", len(residual))
+        return (intersect_postings(postings) if postings else None), residual
+
+    def __select(self, kwargs: dict, partial: bool) -> list:
+        """Поиск пар (id, контакт), удовлетворяющих условиям, в порядке хранения.
+
+        Условия по полям без индекса проверяются только для кандидатов из индексов. Если ни одно поле не
+        индексировано, выполняется полный просмотр хранилища.
+        """
+        doc_ids, residual = self.__lookup(kwargs, partial)
+        if doc_ids is None:
+            self._metrics.count("full_scans")
+            self._metrics.count("documents_scanned", len(self.__order))
+            if not partial:
+                result: list = self.__contacts.search(residual)
+                self._metrics.count("documents_returned", len(result))
+                return result
+            pairs = self.__contacts.items()
+        else:
+            pairs = self.__contacts.get_many(sorted(doc_ids)) if doc_ids else []
+            self._metrics.count("documents_scanned", len(pairs))
+        if residual:
+            matches = self.__predicate(residual, partial)
+            pairs = [(doc_id, document) for doc_id, document in pairs if matches(document)]
+        result = list(pairs)
+        self._metrics.count("documents_returned", len(result))
+        return result
+
+    def __search(self, kwargs: dict, partial: bool) -> list:
+        """Поиск контактов с кэшем результатов.
+
+        В кэше хранятся найденные контакты и поколения изменений, при которых они найдены: общее (добавление и
+        удаление контактов) и поколения полей условий. Набор найденных контактов актуален, пока не было добавлений,
+        удалений и изменений значений полей, входящих в условия. После изменения других полей контакты результата
+        перечитываются из хранилища по сохраненным id, без повторного поиска.
+
+        Вызывающий код получает новые словари (ContactRow компактного хранилища тоже приводятся к dict), поэтому
+        изменение результата не влияет на кэш и хранилище.
+        """
+        key: tuple | None = filters_key(kwargs)
+        if key is None:
+            return [_as_dict(document) for _, document in self.__select(kwargs, partial)]
+        key = (partial, key)
+        generations: tuple = (
+            self.__write_generation, *(self.__field_generations.get(field, 0) for field, _ in key[1])
+        )
+        entry: tuple | None = self.__results.get(key, is_valid=lambda cached: cached[0] == generations)
+        if entry is None:
+            pairs: list = self.__select(kwargs, partial)
+            documents: list = [document for _, document in pairs]
+            self.__results.put(key, (generations, self.__update_generation, [doc_id for doc_id, _ in pairs], documents))
+        elif entry[1] != self.__update_generation:
+            documents = [document for _, document in self.__read(entry[2])]
+            self.__results.put(key, (generations, self.__update_generation, entry[2], documents))
+        else:
+            documents = entry[3]
+            self._metrics.count("documents_returned", len(documents))
+        return [_as_dict(document) for document in documents]
+
+    def __invalidate(self, fields: Iterable[str] | None = None) -> None:
+        """Отметка изменения для кэша результатов.
+
+        Args:
+            fields: Поля, значения которых изменились у существующего контакта. None - контакты добавлены или
+                удалены, устаревают все результаты.
+        """
+        if fields is None:
+            self.__write_generation += 1
+            return
+        self.__update_generation += 1
+        for field in fields:
+            self.__field_generations[field] = self.__field_generations.get(field, 0) + 1
+
+    def __read(self, doc_ids: list) -> list:
+        """Чтение пар (id, контакт) из хранилища по id, найденным по индексам, с учетом в статистике."""
+        pairs: list = self.__contacts.get_many(doc_ids)
+        self._metrics.count("documents_scanned", len(pairs))
+        self._metrics.count("documents_returned", len(pairs))
+        return pairs
+
+    def __validate(self, contacts: list) -> list:
+        """Проверка контактов (см. validate_contacts) с учетом времени и результата в статистике."""
+        start: float = time.perf_counter()
+        result: list = validate_contacts(contacts)
+        self._metrics.observe("validate", time.perf_counter() - start)
+        invalid: int = sum(1 for document, _ in result if document is None)
+        self._metrics.count("contacts_validated", len(result))
+        self._metrics.count("contacts_invalid", invalid)
+        return result
+
+    def __filtered_ids(self, kwargs: dict, partial: bool) -> set | None:
+        """Множество id контактов, удовлетворяющих условиям, или None, если условий нет."""
+        if not kwargs:
+            return None
+        doc_ids, residual = self.__lookup(kwargs, partial)
+        if doc_ids is None or residual:
+            return {doc_id for doc_id, _ in self.__select(kwargs, partial)}
+        return doc_ids
+
+    def __sorted_pairs(self, kwargs: dict, partial: bool) -> list:
+        """Поиск пар (id, контакт), удовлетворяющих условиям, в порядке упорядоченного индекса."""
+        if not kwargs:
+            return self.__read(self.__order.ordered_ids())
+        doc_ids, residual = self.__lookup(kwargs, partial)
+        if doc_ids is not None and not residual:
+            return self.__read(self.__order.ordered_ids(doc_ids))
+        return sorted(self.__select(kwargs, partial), key=lambda pair: self.__order.key(pair[0]))
+
+
+def _compile_predicate(conditions: dict, partial: bool):
+    """Сборка функции predicate(контакт) -> bool для условий поиска (см. Phonebook.__predicate)."""
+    if not partial:
+        fields: tuple = tuple(conditions)
+        values: tuple = tuple(conditions.values())
+        if len(fields) == 1:
+            field, value = fields[0], values[0]
+            return lambda document: document.get(field) == value
+        return lambda document: tuple(map(document.get, fields)) == values
+
+    checks: list = [
+        (field, str.__contains__ if field in SUBSTRING_FIELDS else str.startswith, value)
+        for field, value in conditions.items()
+    ]
+
+    def predicate(document) -> bool:
+        for field, check, value in checks:
+            current = document.get(field)
+            if not isinstance(current, str) or not check(current, value):
+                return False
+        return True
+    return predicate
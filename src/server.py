@@ -0,0 +1,216 @@
+"""HTTP/JSON сервер телефонного справочника
+
+Сервер держит Phonebook открытым, поэтому запросы не тратят время на запуск интерпретатора, импорт модулей и
+чтение базы данных. Сервер слушает только указанный адрес (по умолчанию 127.0.0.1) и поддерживает keep-alive
+(HTTP/1.1).
+
+Протокол:
+    POST /<метод> - вызов метода Phonebook из METHODS. Тело - JSON объект с именованными аргументами метода, ответ -
+        {"result": результат}. Например, POST /get_contacts {"last_name": "Иванов"}.
+    POST /batch - несколько вызовов в одном запросе. Тело - {"calls": [{"method": "get_contacts", "kwargs": {...}},
+        ...]}, ответ - {"results": [{"result": ...} или {"error": "..."}, ...]} в порядке вызовов.
+    POST /iter_contacts - постраничный вывод контактов (см. Phonebook.iter_contacts). Тело - аргументы
+        iter_contacts и page_size. Ответ передается частями (chunked), каждая строка - JSON массив [курсор, контакт].
+        Из базы читается по одной странице page_size контактов, поэтому память сервера не зависит от размера вывода.
+
+Ошибка в запросе возвращается с кодом 400 или 404, ошибка при выполнении метода - с кодом 500, тело ответа -
+{"error": "..."}. В /batch ошибка вызова записывается в его элемент results, остальные вызовы выполняются.
+
+Пример запуска:
+    python3 -m src.server --path phonebook.json --port 8765
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.phonebook import Phonebook
+
+HOST = "127.0.0.1"
+PORT = 8765
+PAGE_SIZE = 1000
+METHODS = (
+    "get_all_contacts", "add_contact", "add_contacts", "get_contacts", "find_contacts", "fuzzy_contacts",
+    "get_sorted_contacts", "count_contacts", "update_contact", "delete_contact", "update_contacts", "delete_contacts",
+    "upsert_contact", "merge_contacts", "stats",
+)
+# Методы, которые не изменяют справочник: их можно безопасно повторить после обрыва соединения.
+READ_ONLY_METHODS = frozenset((
+    "get_all_contacts", "get_contacts", "find_contacts", "fuzzy_contacts", "get_sorted_contacts", "count_contacts",
+    "stats", "iter_contacts",
+))
+
+
+def dumps(value) -> bytes:
+    """Сериализация ответа в JSON."""
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+class RequestError(Exception):
+    """Ошибка в запросе клиента."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status: int = status
+
+
+class PhonebookRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к справочнику. Справочник берется из атрибута phonebook сервера."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        try:
+            body = self.__read_body()
+            name: str = self.path.strip("/")
+            if name == "iter_contacts":
+                self.__stream_contacts(body)
+            elif name == "batch":
+                self.__send_json(200, {"results": self.__batch(body)})
+            else:
+                self.__send_json(200, {"result": self.__call(name, body)})
+        except RequestError as error:
+            self.__send_json(error.status, {"error": str(error)})
+        except Exception as error:
+            self.log_error("Ошибка обработки %s: %r", self.path, error)
+            self.__send_json(500, {"error": f"Внутренняя ошибка сервера: {error!r}"})
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def __read_body(self):
+        try:
+            length: int = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length)) if length else {}
+        except ValueError as error:
+            raise RequestError(400, f"Некорректный JSON: {error}")
+
+    def __call(self, name: str, kwargs):
+        """Вызов метода справочника с именованными аргументами kwargs."""
+        if not isinstance(name, str) or name not in METHODS:
+            raise RequestError(404, f"Неизвестный метод: {name}")
+        if not isinstance(kwargs, dict):
+            raise RequestError(400, "Аргументы метода должны быть JSON объектом")
+        try:
+            return getattr(self.server.phonebook, name)(**kwargs)
+        except Exception as error:
+            raise self.__call_error(error)
+
+    def __batch(self, body) -> list:
+        calls = body.get("calls") if isinstance(body, dict) else None
+        if not isinstance(calls, list) or not all(isinstance(call, dict) for call in calls):
+            raise RequestError(400, "Тело запроса должно содержать список вызовов calls")
+        results: list = []
+        for call in calls:
+            try:
+                results.append({"result": self.__call(call.get("method"), call.get("kwargs", {}))})
+            except RequestError as error:
+                results.append({"error": str(error), "status": error.status})
+        return results
+
+    def __stream_contacts(self, body) -> None:
+        """Постраничная передача контактов частями (Transfer-Encoding: chunked), одна часть на страницу."""
+        if not isinstance(body, dict):
+            raise RequestError(400, "Аргументы метода должны быть JSON объектом")
+        options: dict = dict(body)
+        page_size = options.pop("page_size", PAGE_SIZE)
+        limit = options.pop("limit", None)
+        after = options.pop("after", None)
+        if not isinstance(page_size, int) or page_size < 1 or not (limit is None or isinstance(limit, int)):
+            raise RequestError(400, "page_size должен быть положительным целым числом, limit - целым числом")
+        if not (after is None or isinstance(after, list)):
+            raise RequestError(400, "Курсор after должен быть списком")
+        after = tuple(after) if after is not None else None
+        # Первая страница читается до отправки заголовков, чтобы ошибку в аргументах можно было вернуть с кодом 400.
+        page: list = self.__page(options, after, page_size, limit)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        options.pop("offset", None)
+        try:
+            while page:
+                self.__write_chunk(b"".join(dumps([cursor, contact]) + b"\n" for cursor, contact in page))
+                if limit is not None:
+                    limit -= len(page)
+                if len(page) < page_size or limit == 0:
+                    break
+                page = self.__page(options, page[-1][0], page_size, limit)
+        except RequestError as error:
+            # Заголовки уже отправлены: ответ обрывается без завершающей части, клиент получает ошибку чтения.
+            self.log_error("Ошибка чтения страницы %s: %s", self.path, error)
+            self.close_connection = True
+            return
+        self.__write_chunk(b"")
+
+    def __page(self, options: dict, after: tuple | None, page_size: int, limit: int | None) -> list:
+        size: int = page_size if limit is None else min(page_size, limit)
+        try:
+            return list(self.server.phonebook.iter_contacts(after=after, limit=size, **options))
+        except Exception as error:
+            raise self.__call_error(error)
+
+    def __call_error(self, error: Exception) -> RequestError:
+        """Ошибка вызова метода справочника: 400 для некорректных аргументов, 500 для остальных ошибок."""
+        if isinstance(error, (TypeError, ValueError, KeyError)):
+            return RequestError(400, f"Некорректные аргументы: {error!r}")
+        self.log_error("Ошибка вызова метода %s: %r", self.path, error)
+        return RequestError(500, f"Внутренняя ошибка сервера: {error!r}")
+
+    def __write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def __send_json(self, status: int, value) -> None:
+        data: bytes = dumps(value)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class PhonebookServer(ThreadingHTTPServer):
+    """HTTP сервер справочника. Каждое соединение обслуживается в отдельном потоке."""
+
+    daemon_threads = True
+
+    def __init__(self, phonebook: Phonebook, host: str = HOST, port: int = PORT, verbose: bool = False) -> None:
+        """
+        Args:
+            phonebook: Открытый справочник. Закрывается вызывающим кодом после остановки сервера.
+            host: Адрес, на котором слушает сервер.
+            port: Порт. 0 - любой свободный порт (см. server_address).
+            verbose: Выводить журнал запросов в stderr.
+        """
+        super().__init__((host, port), PhonebookRequestHandler)
+        self.phonebook: Phonebook = phonebook
+        self.verbose: bool = verbose
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP/JSON сервер телефонного справочника.")
+    parser.add_argument("--path", default="phonebook.json", help="файл базы данных")
+    parser.add_argument("--host", default=HOST, help="адрес сервера")
+    parser.add_argument("--port", type=int, default=PORT, help="порт сервера")
+    parser.add_argument("--compact", action="store_true", help="компактное хранение контактов в памяти")
+    parser.add_argument("--exclusive", action="store_true",
+                        help="сервер единственный работает с файлом: отложенная запись без блокировки файла")
+    parser.add_argument("--verbose", action="store_true", help="журнал запросов")
+    args = parser.parse_args()
+
+    phonebook: Phonebook = Phonebook(args.path, write_behind=True, compact=args.compact, shared=not args.exclusive)
+    server: PhonebookServer = PhonebookServer(phonebook, args.host, args.port, args.verbose)
+    print(f"Сервер справочника запущен на http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        phonebook.close_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Телефонный справочник, разделенный на шарды по хешу личного номера
+
+Контакты хранятся в shards файлах (phonebook.0.json, phonebook.1.json, ...). Шард контакта определяется по
+crc32 личного номера, поэтому операции по личному номеру выполняются в одном шарде, а уникальность номера
+проверяется внутри шарда. Поиск по условиям выполняется во всех шардах параллельно, результаты объединяются в
+порядке View.get_sorted_list.
+
+Каждый шард открыт как Phonebook в одном рабочем процессе и живет в нем до закрытия справочника: процесс с одним
+исполнителем (ProcessPoolExecutor(max_workers=1)) обслуживает один или несколько шардов, поэтому индексы шарда
+строятся один раз и не передаются между процессами. Между процессами передаются только аргументы и результаты.
+"""
+
+import heapq
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from operator import itemgetter
+from typing import Iterable
+
+from src.compact import CONTACT_FIELDS
+from src.phonebook import ORDER_FIELDS, Phonebook
+from src.validation import validate_fields
+
+_sort_key = itemgetter(*ORDER_FIELDS)
+_shards: dict = {}
+
+
+def shard_paths(file_path: str, shards: int) -> list:
+    """Пути к файлам шардов: phonebook.json -> phonebook.0.json, phonebook.1.json, ..."""
+    root, extension = os.path.splitext(file_path)
+    return [f"{root}.{index}{extension}" for index in range(shards)]
+
+
+def shard_of(personal_number: str, shards: int) -> int:
+    """Номер шарда для личного номера. Не зависит от процесса и запуска (в отличие от hash)."""
+    return zlib.crc32(str(personal_number).encode()) % shards
+
+
+class ShardedPhonebook:
+    """Справочник с методами Phonebook, контакты которого распределены по шардам.
+
+    Результаты методов совпадают с результатами Phonebook со следующими отличиями: id контакта уникален только в
+    своем шарде, поэтому результат добавления дополнительно содержит ключ "shard"; get_contacts, find_contacts и
+    get_sorted_contacts возвращают контакты в порядке фамилии, имени, отчества и организации; get_all_contacts
+    возвращает контакты шардов по очереди.
+
+    Перенос контакта в другой шард при смене личного номера выполняется добавлением в новый шард и удалением из
+    старого и не атомарен относительно изменений того же контакта из других потоков.
+    """
+
+    def __init__(self, file_path: str = "phonebook.json", shards: int = 4, workers: int | None = None,
+                 **options) -> None:
+        """
+        Args:
+            file_path: Путь к базе данных, из которого строятся пути шардов (см. shard_paths).
+            shards: Количество шардов. Справочник нужно открывать с тем же количеством шардов, с которым он создан.
+            workers: Количество рабочих процессов. По умолчанию - по процессу на шард, но не больше количества
+                процессоров.
+            **options: Параметры Phonebook для каждого шарда, например compact=True.
+
+        Raises:
+            ValueError: Найден файл шарда с номером больше shards - справочник создан с другим количеством шардов.
+        """
+        if shards < 1:
+            raise ValueError("Количество шардов должно быть положительным")
+        if os.path.exists(shard_paths(file_path, shards + 1)[-1]):
+            raise ValueError(f"Справочник {file_path} создан с большим количеством шардов, чем {shards}")
+        self.shards: int = shards
+        self.paths: list = shard_paths(file_path, shards)
+        workers = max(1, min(workers or os.cpu_count() or 1, shards))
+        self.__lock: threading.Lock = threading.Lock()
+        self.__executors: list = [
+            ProcessPoolExecutor(
+                max_workers=1, initializer=_open_shards,
+                initargs=({index: self.paths[index] for index in range(worker, shards, workers)}, options),
+            )
+            for worker in range(workers)
+        ]
+        self.__groups: list = [list(range(worker, shards, workers)) for worker in range(workers)]
+        self.__fan_out("count_contacts")
+
+    def shard_of(self, personal_number: str) -> int:
+        """Номер шарда для личного номера."""
+        return shard_of(personal_number, self.shards)
+
+    def add_contact(self, first_name: str, last_name: str, patronymic: str, organization: str, office_number: str,
+                    personal_number: str) -> dict:
+        """Добавление контакта в шард его личного номера (см. Phonebook.add_contact)."""
+        index: int = self.shard_of(personal_number)
+        result: dict = self.__call(
+            index, "add_contact", first_name=first_name, last_name=last_name, patronymic=patronymic,
+            organization=organization, office_number=office_number, personal_number=personal_number,
+        )
+        return {**result, "shard": index} if result["success"] else result
+
+    def add_contacts(self, contacts: Iterable[dict], batch_size: int = 1000) -> list:
+        """Массовое добавление контактов (см. Phonebook.add_contacts). Шарды добавляют свои контакты параллельно.
+
+        Returns:
+            Список результатов в порядке contacts, результаты добавленных контактов содержат ключ "shard".
+        """
+        batches: list = [[] for _ in range(self.shards)]
+        positions: list = [[] for _ in range(self.shards)]
+        count: int = 0
+        for count, contact in enumerate(contacts, 1):
+            personal_number = contact.get("personal_number", "") if isinstance(contact, Mapping) else ""
+            index: int = self.shard_of(personal_number)
+            batches[index].append(contact)
+            positions[index].append(count - 1)
+        report: list = [None] * count
+        futures: list = [
+            self.__submit(index, "add_contacts", batch, batch_size=batch_size) if batch else None
+            for index, batch in enumerate(batches)
+        ]
+        for index, future in enumerate(futures):
+            if future is None:
+                continue
+            for position, result in zip(positions[index], future.result()[0]):
+                report[position] = {**result, "shard": index} if result["success"] else result
+        return report
+
+    def get_all_contacts(self) -> list:
+        return [contact for contacts in self.__fan_out("get_all_contacts") for contact in contacts]
+
+    def get_contacts(self, **kwargs) -> list:
+        """Поиск контактов по точному совпадению во всех шардах (см. Phonebook.get_contacts).
+
+        Если среди условий есть personal_number, поиск выполняется только в его шарде.
+        """
+        return self.get_sorted_contacts(**kwargs)
+
+    def find_contacts(self, **kwargs) -> list:
+        """Поиск контактов по частичному совпадению во всех шардах (см. Phonebook.find_contacts)."""
+        return self.get_sorted_contacts(partial=True, **kwargs)
+
+    def get_sorted_contacts(self, partial: bool = False, **kwargs) -> list:
+        """Поиск контактов во всех шардах с объединением упорядоченных результатов шардов.
+
+        Returns:
+            Контакты в порядке фамилии, имени, отчества и организации.
+        """
+        if not partial and "personal_number" in kwargs:
+            return self.__call(self.shard_of(kwargs["personal_number"]), "get_sorted_contacts", **kwargs)
+        return list(heapq.merge(*self.__fan_out("get_sorted_contacts", partial=partial, **kwargs), key=_sort_key))
+
+    def count_contacts(self, partial: bool = False, **kwargs) -> int:
+        return sum(self.__fan_out("count_contacts", partial=partial, **kwargs))
+
+    def update_contact(self, personal_num: str, **kwargs) -> dict:
+        """Обновление контакта (см. Phonebook.update_contact).
+
+        Если новый личный номер относится к другому шарду, изменения проверяются так же, как в
+        Phonebook.update_contact, затем контакт добавляется в новый шард с проверкой уникальности номера и удаляется
+        из старого.
+        """
+        source: int = self.shard_of(personal_num)
+        target: int = self.shard_of(kwargs.get("personal_number", personal_num))
+        if source == target:
+            return self.__call(source, "update_contact", personal_num, **kwargs)
+        with self.__lock:
+            contacts: list = self.__call(source, "get_contacts", personal_number=personal_num)
+            if not contacts:
+                return {"success": False, "message": "Контакт не найден."}
+            errors: list = validate_fields(kwargs)
+            if errors:
+                return {"success": False, "message": "Переданы некорректные данные.", "errors": errors}
+            contact: dict = {**contacts[0], **kwargs}
+            result: dict = self.__call(target, "add_contact", **{field: contact[field] for field in CONTACT_FIELDS})
+            if not result["success"]:
+                return result
+            self.__call(source, "delete_contact", personal_num)
+        return {"success": True, "message": "Контакт успешно обновлен!"}
+
+    def delete_contact(self, personal_number: str) -> dict:
+        return self.__call(self.shard_of(personal_number), "delete_contact", personal_number)
+
+    def stats(self) -> list:
+        """Статистика шардов (см. Phonebook.stats) в порядке номеров шардов."""
+        return self.__fan_out("stats")
+
+    def flush(self) -> None:
+        self.__fan_out("flush")
+
+    def close_db(self) -> None:
+        try:
+            self.__fan_out("close_db")
+        finally:
+            for executor in self.__executors:
+                executor.shutdown()
+
+    def __submit(self, index: int, method: str, *args, **kwargs) -> Future:
+        """Вызов метода Phonebook шарда index в его рабочем процессе. Результат future - список из одного
+        результата метода."""
+        executor: ProcessPoolExecutor = self.__executors[index % len(self.__executors)]
+        return executor.submit(_call_shards, [index], method, args, kwargs)
+
+    def __call(self, index: int, method: str, *args, **kwargs):
+        return self.__submit(index, method, *args, **kwargs).result()[0]
+
+    def __fan_out(self, method: str, *args, **kwargs) -> list:
+        """Вызов метода во всех шардах: по одной задаче на рабочий процесс, процессы работают параллельно.
+
+        Returns:
+            Результаты шардов в порядке номеров шардов.
+        """
+        futures: list = [
+            executor.submit(_call_shards, group, method, args, kwargs)
+            for executor, group in zip(self.__executors, self.__groups)
+        ]
+        results: list = [None] * self.shards
+        for group, future in zip(self.__groups, futures):
+            for index, result in zip(group, future.result()):
+                results[index] = result
+        return results
+
+
+def _open_shards(paths: dict, options: dict) -> None:
+    """Открытие шардов в рабочем процессе."""
+    for index, path in paths.items():
+        _shards[index] = Phonebook(path, **options)
+
+
+def _call_shards(indexes: list, method: str, args: tuple, kwargs: dict) -> list:
+    """Вызов метода Phonebook в шардах рабочего процесса.
+
+    Phonebook возвращает контакты обычными словарями на любом хранилище, поэтому они передаются в основной процесс
+    без преобразования.
+    """
+    return [getattr(_shards[index], method)(*args, **kwargs) for index in indexes]
@@ -0,0 +1,243 @@
+"""Бинарный снимок телефонного справочника
+
+Снимок хранит колонки CompactContactStore как есть, поэтому загрузка не разбирает контакты по одному: файл
+отображается в память через mmap, колонки копируются в массивы целиком, декодируются только различные строки.
+
+Формат файла (все числа little-endian, каждая секция выровнена по 8 байт):
+    заголовок HEADER: сигнатура MAGIC, версия VERSION, флаги (0), количество позиций slots (наибольший id + 1),
+        количество контактов, количество строк, размер строк в байтах, количество номеров-строк, crc32 тела и
+        crc32 предыдущих полей заголовка;
+    смещения строк: strings + 1 чисел uint64, строка i - байты [offsets[i], offsets[i + 1]) в UTF-8;
+    строки в UTF-8 подряд: таблица строк хранилища, затем по одной строке на каждый номер-строку;
+    alive: slots байт, 1 - контакт с таким id существует;
+    колонки TEXT_FIELDS: по slots чисел uint32 - коды строк;
+    колонки PHONE_FIELDS: по slots чисел int64 - номер телефона числом или NO_PHONE;
+    номера-строки: тройки int64 (номер поля в PHONE_FIELDS, id, номер строки) для номеров, которые нельзя
+        представить числом.
+
+JSON файл TinyDB остается форматом обмена, конвертер в обе стороны:
+    python3 -m src.snapshot phonebook.json phonebook.snap
+    python3 -m src.snapshot phonebook.snap phonebook.json
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable
+
+from src.compact import PHONE_FIELDS, TEXT_FIELDS, CompactContactStore, StringTable
+from src.metrics import Histogram
+from src.storages import FSYNC_POLICIES, JSONFileStorage, iter_json_table
+
+SNAPSHOT_EXTENSIONS = (".snap",)
+MAGIC = b"PHBKSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQQQQQII")
+ALIGNMENT = 8
+
+
+def is_snapshot(file_path: str) -> bool:
+    """Проверка, является ли файл бинарным снимком, по расширению."""
+    return os.path.splitext(file_path)[1].lower() in SNAPSHOT_EXTENSIONS
+
+
+def write_snapshot(file_path: str, store: CompactContactStore, fsync: bool = True) -> int:
+    """Запись хранилища в бинарный снимок.
+
+    Снимок записывается во временный файл, который затем атомарно заменяет file_path.
+
+    Args:
+        file_path: Путь к файлу снимка.
+        store: Хранилище контактов.
+        fsync: Выполнить fsync временного файла перед заменой.
+
+    Returns:
+        Размер файла в байтах.
+    """
+    strings, text, phones, alive, raw_phones = store.columns()
+    encoded: list = [value.encode() for value in strings]
+    raw: array = array("q")
+    for (field, doc_id), number in raw_phones.items():
+        raw.extend((PHONE_FIELDS.index(field), doc_id, len(encoded)))
+        encoded.append(number.encode())
+    offsets: array = array("Q", [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections: list = [
+        _little_endian(offsets), b"".join(encoded), alive,
+        *(_little_endian(text[field]) for field in TEXT_FIELDS),
+        *(_little_endian(phones[field]) for field in PHONE_FIELDS),
+        _little_endian(raw),
+    ]
+    body_crc: int = 0
+    for section in sections:
+        body_crc = zlib.crc32(_padding(section), zlib.crc32(section, body_crc))
+    header: bytes = HEADER.pack(MAGIC, VERSION, 0, len(alive), len(store), len(encoded), offsets[-1], len(raw) // 3,
+                                body_crc, 0)
+    header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+
+    temp_path: str = file_path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+            file.write(_padding(section))
+        file.flush()
+        if fsync:
+            os.fsync(file.fileno())
+        size: int = file.tell()
+    os.replace(temp_path, file_path)
+    return size
+
+
+def read_snapshot(file_path: str) -> CompactContactStore:
+    """Загрузка бинарного снимка.
+
+    Args:
+        file_path: Путь к файлу снимка. Отсутствующий или пустой файл - пустой справочник.
+
+    Returns:
+        Хранилище контактов.
+
+    Raises:
+        ValueError: Файл не является снимком, записан другой версией формата, обрезан или поврежден.
+    """
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return CompactContactStore()
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < HEADER.size:
+            raise ValueError(f"Файл {file_path} не является снимком справочника")
+        magic, version, _, slots, count, string_count, blob_size, raw_count, body_crc, header_crc = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Файл {file_path} не является снимком справочника")
+        if header_crc != zlib.crc32(data[:HEADER.size - 4]):
+            raise ValueError(f"Заголовок снимка {file_path} поврежден")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка {file_path}: {version}")
+        sizes: list = [
+            8 * (string_count + 1), blob_size, slots,
+            *(4 * slots for _ in TEXT_FIELDS), *(8 * slots for _ in PHONE_FIELDS), 24 * raw_count,
+        ]
+        if len(data) != HEADER.size + sum(size + -size % ALIGNMENT for size in sizes):
+            raise ValueError(f"Снимок {file_path} обрезан")
+        with memoryview(data) as view:
+            if zlib.crc32(view[HEADER.size:]) != body_crc:
+                raise ValueError(f"Снимок {file_path} поврежден")
+            sections: list = []
+            position: int = HEADER.size
+            for size in sizes:
+                sections.append(view[position:position + size])
+                position += size + -size % ALIGNMENT
+            offsets: array = _read_array("Q", sections[0])
+            blob: bytes = bytes(sections[1])
+            alive: bytearray = bytearray(sections[2])
+            text: dict = {
+                field: _read_array("I", section) for field, section in zip(TEXT_FIELDS, sections[3:])
+            }
+            phones: dict = {
+                field: _read_array("q", section)
+                for field, section in zip(PHONE_FIELDS, sections[3 + len(TEXT_FIELDS):])
+            }
+            raw: array = _read_array("q", sections[-1])
+            for section in sections:
+                section.release()
+    strings: list = [blob[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+    raw_phones: dict = {
+        (PHONE_FIELDS[raw[position]], raw[position + 1]): strings[raw[position + 2]]
+        for position in range(0, len(raw), 3)
+    }
+    store: CompactContactStore = CompactContactStore.from_columns(
+        StringTable.from_strings(strings[:len(strings) - raw_count]), text, phones, alive, raw_phones
+    )
+    if len(store) != count:
+        raise ValueError(f"Снимок {file_path} поврежден")
+    return store
+
+
+class SnapshotStorage:
+    """Файл бинарного снимка с политикой fsync и статистикой записи в формате JSONFileStorage."""
+
+    def __init__(self, path: str, fsync: str = "always") -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Неизвестная политика fsync: {fsync}")
+        self.path: str = path
+        self.fsync: str = fsync
+        self.bytes_written: int = 0
+        self.write_sizes: Histogram = Histogram()
+        self.__synced: bool = True
+
+    def read(self) -> CompactContactStore:
+        return read_snapshot(self.path)
+
+    def write(self, store: CompactContactStore) -> None:
+        size: int = write_snapshot(self.path, store, fsync=self.fsync == "always")
+        self.__synced = self.fsync == "always"
+        self.bytes_written += size
+        self.write_sizes.observe(size)
+
+    def close(self) -> None:
+        if self.fsync == "close" and not self.__synced:
+            with open(self.path, "rb") as file:
+                os.fsync(file.fileno())
+            self.__synced = True
+
+
+def store_from_items(items: Iterable[tuple]) -> CompactContactStore:
+    """Хранилище из пар (id, документ) с сохранением id."""
+    store: CompactContactStore = CompactContactStore()
+    for doc_id, document in items:
+        store.put(doc_id, document)
+    return store
+
+
+def convert(source_path: str, target_path: str) -> int:
+    """Перенос справочника между JSON файлом TinyDB и бинарным снимком с сохранением id.
+
+    Направление определяется по расширениям (см. SNAPSHOT_EXTENSIONS): ровно один из файлов должен быть снимком.
+
+    Returns:
+        Количество перенесенных контактов.
+    """
+    if is_snapshot(source_path) == is_snapshot(target_path):
+        raise ValueError("Один из файлов должен быть снимком (.snap), другой - JSON файлом")
+    if is_snapshot(target_path):
+        store: CompactContactStore = store_from_items(iter_json_table(source_path))
+        write_snapshot(target_path, store)
+        return len(store)
+    store = read_snapshot(source_path)
+    storage: JSONFileStorage = JSONFileStorage(target_path)
+    try:
+        storage.write_table("_default", ((doc_id, store.get(doc_id)) for doc_id in store.ids()))
+    finally:
+        storage.close()
+    return len(store)
+
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def _read_array(typecode: str, data: memoryview) -> array:
+    column: array = array(typecode)
+    column.frombytes(data)
+    return _little_endian(column)
+
+
+def _padding(section) -> bytes:
+    return bytes(-memoryview(section).nbytes % ALIGNMENT)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенос телефонного справочника между JSON и бинарным снимком.")
+    parser.add_argument("source", help="исходный файл, например phonebook.json")
+    parser.add_argument("target", help="новый файл, например phonebook.snap")
+    args = parser.parse_args()
+    print(f"Перенесено контактов: {convert(args.source, args.target)}")
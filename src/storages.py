@@ -0,0 +1,542 @@
+import codecs
+import io
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator
+
+from tinydb.middlewares import Middleware
+from tinydb.storages import JSONStorage, touch
+
+from src.metrics import Histogram
+
+FSYNC_POLICIES = ("always", "close", "never")
+
+
+class JSONFileStorage(JSONStorage):
+    """JSON хранилище TinyDB с настраиваемой политикой fsync.
+
+    Политики fsync:
+        always: fsync после каждой записи файла (поведение JSONStorage).
+        close: fsync один раз при закрытии базы данных, если были записи.
+        never: fsync не выполняется, сброс на диск остается на усмотрение ОС.
+    """
+
+    def __init__(self, path: str, fsync: str = "always", **kwargs) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Неизвестная политика fsync: {fsync}")
+        super().__init__(path, **kwargs)
+        self.fsync: str = fsync
+        self.bytes_written: int = 0
+        self.write_sizes: Histogram = Histogram()
+        self.__synced: bool = True
+
+    def write(self, data: dict) -> None:
+        self._handle.seek(0)
+        serialized: str = json.dumps(data, **self.kwargs)
+        try:
+            self._handle.write(serialized)
+        except io.UnsupportedOperation:
+            raise IOError(f'Cannot write to the database. Access mode is "{self._mode}"')
+        self._handle.flush()
+        if self.fsync == "always":
+            os.fsync(self._handle.fileno())
+        else:
+            self.__synced = False
+        self._handle.truncate()
+        self.bytes_written += len(serialized)
+        self.write_sizes.observe(len(serialized))
+
+    def write_table(self, name: str, items: Iterable[tuple]) -> None:
+        """Потоковая запись базы данных из одной таблицы без построения словаря всей базы в памяти.
+
+        Результат совпадает с write({name: {str(id): документ, ...}}).
+
+        Args:
+            name: Название таблицы.
+            items: Пары (id, документ).
+        """
+        self._handle.seek(0)
+        size: int = self._handle.write(f"{{{json.dumps(name)}: {{")
+        separator: str = ""
+        for doc_id, document in items:
+            size += self._handle.write(f"{separator}{json.dumps(str(doc_id))}: {json.dumps(dict(document))}")
+            separator = ", "
+        size += self._handle.write("}}")
+        self._handle.flush()
+        if self.fsync == "always":
+            os.fsync(self._handle.fileno())
+        else:
+            self.__synced = False
+        self._handle.truncate()
+        self.bytes_written += size
+        self.write_sizes.observe(size)
+
+    def close(self) -> None:
+        if self.fsync == "close" and not self.__synced and not self._handle.closed:
+            os.fsync(self._handle.fileno())
+        super().close()
+
+
+class FlushPolicy:
+    """Политика отложенной записи.
+
+    Считает несохраненные изменения и вызывает flush после flush_every изменений или через flush_interval секунд
+    после первого несохраненного изменения (в фоновом потоке под переданной блокировкой).
+    """
+
+    def __init__(self, flush, flush_every: int = 1000, flush_interval: float | None = 5.0, lock=None) -> None:
+        """
+        Args:
+            flush: Функция записи изменений. После успешной записи должна вызвать flushed().
+            flush_every: Количество изменений, после которого вызывается flush.
+            flush_interval: Максимальное время в секундах, которое изменения могут оставаться несохраненными. None
+                отключает сброс по времени.
+            lock: Блокировка, под которой выполняется фоновый сброс.
+        """
+        self.flush_every: int = flush_every
+        self.flush_interval: float | None = flush_interval
+        self.flush_count: int = 0
+        self.lock = lock or threading.RLock()
+        self.__flush = flush
+        self.__pending: int = 0
+        self.__dirty_since: float | None = None
+        self.__timer: threading.Timer | None = None
+
+    @property
+    def pending(self) -> int:
+        """Количество изменений, еще не записанных в хранилище."""
+        return self.__pending
+
+    def changed(self) -> None:
+        """Учет нового изменения. При необходимости сразу вызывает flush или планирует его."""
+        with self.lock:
+            self.__pending += 1
+            if self.__dirty_since is None:
+                self.__dirty_since = time.monotonic()
+            if self.__pending >= self.flush_every or self.__interval_elapsed():
+                self.__flush()
+            else:
+                self.__schedule_flush()
+
+    def flushed(self) -> None:
+        """Отметка о том, что все изменения записаны."""
+        with self.lock:
+            self.__cancel_timer()
+            if self.__pending:
+                self.flush_count += 1
+            self.__pending = 0
+            self.__dirty_since = None
+
+    def cancel(self) -> None:
+        """Отмена запланированного сброса."""
+        with self.lock:
+            self.__cancel_timer()
+
+    def __interval_elapsed(self) -> bool:
+        return self.flush_interval is not None and time.monotonic() - self.__dirty_since >= self.flush_interval
+
+    def __scheduled_flush(self) -> None:
+        with self.lock:
+            if self.__pending:
+                self.__flush()
+
+    def __schedule_flush(self) -> None:
+        if self.flush_interval is None or self.__timer is not None:
+            return
+        self.__timer = threading.Timer(self.flush_interval, self.__scheduled_flush)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __cancel_timer(self) -> None:
+        if self.__timer is not None:
+            if self.__timer is not threading.current_thread():
+                self.__timer.cancel()
+            self.__timer = None
+
+
+class WriteBehindMiddleware(Middleware):
+    """Middleware TinyDB с отложенной записью (write-behind).
+
+    Все чтения обслуживаются из кэша в памяти, изменения накапливаются и записываются в хранилище одним снимком:
+    после flush_every изменений, через flush_interval секунд после первого несохраненного изменения, при явном
+    вызове flush() и при закрытии базы данных.
+    """
+
+    def __init__(self, storage_cls, flush_every: int = 1000, flush_interval: float | None = 5.0,
+                 lock=None) -> None:
+        """
+        Args:
+            storage_cls: Класс хранилища TinyDB, в которое сбрасываются изменения.
+            flush_every: Количество изменений, после которого кэш сбрасывается в хранилище.
+            flush_interval: Максимальное время в секундах, которое изменения могут оставаться несохраненными. None
+                отключает сброс по времени.
+            lock: Блокировка, под которой выполняется фоновый сброс. Должна удерживаться вызывающим кодом на время
+                операций с базой данных, чтобы фоновый сброс не увидел частично измененные данные.
+        """
+        super().__init__(storage_cls)
+        self.policy: FlushPolicy = FlushPolicy(self.flush, flush_every, flush_interval, lock)
+        self.__cache: dict | None = None
+
+    def read(self) -> dict | None:
+        with self.policy.lock:
+            if self.__cache is None:
+                self.__cache = self.storage.read()
+            return self.__cache
+
+    def write(self, data: dict) -> None:
+        with self.policy.lock:
+            self.__cache = data
+            self.policy.changed()
+
+    def flush(self) -> None:
+        """Запись всех несохраненных изменений в хранилище."""
+        with self.policy.lock:
+            if self.policy.pending:
+                self.storage.write(self.__cache)
+            self.policy.flushed()
+
+    @property
+    def pending(self) -> int:
+        """Количество изменений, еще не записанных в хранилище."""
+        return self.policy.pending
+
+    @property
+    def flush_count(self) -> int:
+        """Количество выполненных сбросов в хранилище."""
+        return self.policy.flush_count
+
+    def close(self) -> None:
+        with self.policy.lock:
+            self.flush()
+            self.storage.close()
+
+
+class JournalStorage:
+    """Журнал изменений документов (append-only) со снимком и фоновым уплотнением.
+
+    Состояние базы данных хранится в двух файлах: снимке path в формате JSONStorage и журнале path + ".journal".
+    Таблицы загружаются в память при открытии, изменения передаются по документам (см. write) и дописываются в
+    журнал по одной записи на документ, поэтому стоимость изменения и объем записи на диск не зависят от размера
+    базы.
+
+    Каждая строка журнала имеет вид "<crc32> <json>\\n", где json - {"t": таблица, "id": id документа, "d":
+    документ или null для удаления}. При открытии снимок загружается, а журнал проигрывается до первой оборванной
+    или поврежденной записи, после чего хвост журнала отбрасывается. Когда журнал превышает compact_threshold байт,
+    его содержимое сворачивается в новый снимок в фоновом потоке. Снимок заменяется атомарно, поэтому аварийное
+    завершение процесса не может повредить phonebook.json.
+    """
+
+    def __init__(self, path: str, fsync: str = "always", compact_threshold: int = 4 * 1024 * 1024,
+                 background_compaction: bool = True, compact_on_close: bool = True, encoding: str = "utf-8") -> None:
+        """
+        Args:
+            path: Путь к файлу снимка базы данных.
+            fsync: Политика fsync журнала: "always", "close" или "never".
+            compact_threshold: Размер журнала в байтах, после которого запускается уплотнение.
+            background_compaction: Выполнять уплотнение в фоновом потоке.
+            compact_on_close: Сворачивать журнал в снимок при закрытии базы данных, чтобы файл оставался читаемым
+                обычным JSONStorage. Пустой журнал при закрытии удаляется.
+            encoding: Кодировка файлов.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Неизвестная политика fsync: {fsync}")
+        self.path: str = path
+        self.journal_path: str = path + ".journal"
+        self.fsync: str = fsync
+        self.compact_threshold: int = compact_threshold
+        self.background_compaction: bool = background_compaction
+        self.compact_on_close: bool = compact_on_close
+        self.encoding: str = encoding
+        self.bytes_written: int = 0
+        self.write_sizes: Histogram = Histogram()
+        self.skipped_records: int = 0
+        self.__lock = threading.RLock()
+        self.__compaction: threading.Thread | None = None
+        self.__synced: bool = True
+        self.__tables: dict = self.__load_snapshot()
+        self.__journal_size: int = self.__replay_journal()
+        self.__journal = open(self.journal_path, "ab")
+
+    def table(self, name: str) -> dict:
+        """Таблица {id строкой: документ}.
+
+        Возвращается сама таблица, а не копия: ее нельзя изменять, изменения передаются через write. Документы
+        при изменении заменяются новыми словарями, поэтому ранее полученный документ остается прежним.
+        """
+        with self.__lock:
+            return self.__tables.get(name, {})
+
+    def write(self, name: str, documents: dict) -> None:
+        """Запись изменений документов таблицы одним фрагментом журнала.
+
+        Args:
+            name: Имя таблицы.
+            documents: Словарь {id строкой: новый документ или None для удаления}.
+        """
+        if not documents:
+            return
+        with self.__lock:
+            records: list = [] if name in self.__tables else [{"t": name, "id": None, "d": {}}]
+            records.extend({"t": name, "id": doc_id, "d": document} for doc_id, document in documents.items())
+            for record in records:
+                self.__apply(record)
+            chunk: bytes = b"".join(self.__encode(record) for record in records)
+            self.__journal.write(chunk)
+            self.__journal.flush()
+            if self.fsync == "always":
+                os.fsync(self.__journal.fileno())
+            else:
+                self.__synced = False
+            self.__journal_size += len(chunk)
+            self.bytes_written += len(chunk)
+            self.write_sizes.observe(len(chunk))
+            if self.__journal_size >= self.compact_threshold and not self.__compacting():
+                self.compact(wait=not self.background_compaction)
+
+    def compact(self, wait: bool = True) -> None:
+        """Сворачивание журнала в новый снимок.
+
+        Снимок текущего состояния записывается во временный файл и атомарно заменяет старый, после чего из журнала
+        удаляются записи, вошедшие в снимок. Записи, добавленные во время уплотнения, сохраняются.
+
+        Args:
+            wait: Дождаться окончания уплотнения. Иначе уплотнение выполняется в фоновом потоке.
+        """
+        with self.__lock:
+            running: threading.Thread | None = self.__compaction if self.__compacting() else None
+            if running is None:
+                # Документы не изменяются на месте, поэтому для снимка достаточно копии словарей таблиц.
+                tables: dict = {name: dict(table) for name, table in self.__tables.items()}
+                if wait:
+                    self.__compact(tables, self.__journal_size)
+                    return
+                self.__compaction = threading.Thread(
+                    target=self.__compact, args=(tables, self.__journal_size), daemon=True
+                )
+                self.__compaction.start()
+        if wait and running is not None:
+            running.join()
+
+    def close(self) -> None:
+        if self.__compaction is not None:
+            self.__compaction.join()
+        with self.__lock:
+            if self.compact_on_close and self.__journal_size:
+                self.compact(wait=True)
+            if self.fsync == "close" and not self.__synced:
+                os.fsync(self.__journal.fileno())
+            self.__journal.close()
+            if not self.__journal_size:
+                # Все изменения в снимке: после закрытия база данных - обычный JSON файл.
+                os.remove(self.journal_path)
+
+    def __compacting(self) -> bool:
+        return self.__compaction is not None and self.__compaction.is_alive()
+
+    def __load_snapshot(self) -> dict:
+        touch(self.path, create_dirs=False)
+        with open(self.path, encoding=self.encoding) as file:
+            content: str = file.read()
+        return json.loads(content) if content else {}
+
+    def __replay_journal(self) -> int:
+        """Проигрывание журнала поверх снимка.
+
+        Returns:
+            Размер корректной части журнала в байтах.
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        offset: int = 0
+        with open(self.journal_path, "rb") as file:
+            for line in file:
+                record: dict | None = self.__decode(line)
+                if record is None:
+                    self.skipped_records += 1
+                    break
+                self.__apply(record)
+                offset += len(line)
+            size: int = file.seek(0, os.SEEK_END)
+        if offset != size:
+            with open(self.journal_path, "r+b") as file:
+                file.truncate(offset)
+        return offset
+
+    def __apply(self, record: dict) -> None:
+        name: str = record["t"]
+        doc_id: str | None = record["id"]
+        doc: dict | None = record["d"]
+        if doc_id is None:
+            if doc is None:
+                self.__tables.pop(name, None)
+            else:
+                self.__tables.setdefault(name, {})
+        elif doc is None:
+            self.__tables.get(name, {}).pop(doc_id, None)
+        else:
+            self.__tables.setdefault(name, {})[doc_id] = dict(doc)
+
+    @staticmethod
+    def __encode(record: dict) -> bytes:
+        payload: bytes = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    @staticmethod
+    def __decode(line: bytes) -> dict | None:
+        """Разбор строки журнала.
+
+        Returns:
+            Запись журнала или None, если строка оборвана или повреждена.
+        """
+        if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+            return None
+        payload: bytes = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def __compact(self, tables: dict, journal_offset: int) -> None:
+        temp_path: str = self.path + ".tmp"
+        with open(temp_path, "w", encoding=self.encoding) as file:
+            file.write(json.dumps(tables))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+        with self.__lock:
+            self.__journal.flush()
+            with open(self.journal_path, "rb") as file:
+                file.seek(journal_offset)
+                tail: bytes = file.read()
+            temp_journal_path: str = self.journal_path + ".tmp"
+            with open(temp_journal_path, "wb") as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+            self.__journal.close()
+            os.replace(temp_journal_path, self.journal_path)
+            self.__journal = open(self.journal_path, "ab")
+            self.__journal_size = len(tail)
+
+
+def iter_json_table(path: str, table: str = "_default", progress=None, progress_every: int = 100_000,
+                    chunk_size: int = 1024 * 1024) -> Iterator[tuple]:
+    """Потоковое чтение таблицы из JSON файла TinyDB.
+
+    Файл отображается в память через mmap и разбирается по одному документу, поэтому дерево JSON всей базы
+    никогда не строится целиком. Документы других таблиц пропускаются.
+
+    Args:
+        path: Путь к JSON файлу базы данных.
+        table: Название таблицы.
+        progress: Функция progress(прочитано_байт, размер_файла), вызывается каждые progress_every документов и в
+            конце чтения.
+        progress_every: Периодичность вызова progress в документах.
+        chunk_size: Размер блока файла в байтах, который декодируется за один раз.
+
+    Returns:
+        Итератор по парам (id, документ).
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        if progress is not None:
+            progress(0, 0)
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        reader: _JSONReader = _JSONReader(data, chunk_size)
+        reader.expect("{")
+        count: int = 0
+        while not reader.consume("}"):
+            name: str = reader.value()
+            reader.expect(":")
+            if name != table:
+                reader.value()
+            else:
+                reader.expect("{")
+                while not reader.consume("}"):
+                    doc_id: str = reader.value()
+                    reader.expect(":")
+                    yield int(doc_id), reader.value()
+                    count += 1
+                    if progress is not None and count % progress_every == 0:
+                        progress(reader.position, len(data))
+                    reader.consume(",")
+            reader.consume(",")
+        if progress is not None:
+            progress(len(data), len(data))
+
+
+class _JSONReader:
+    """Последовательный разбор JSON значений из отображенного в память файла.
+
+    Файл декодируется блоками по chunk_size байт, значения разбираются из текущего блока. Значение, которое не
+    поместилось в блок, разбирается повторно после подгрузки следующего блока.
+    """
+
+    def __init__(self, data: mmap.mmap, chunk_size: int) -> None:
+        self.__data: mmap.mmap = data
+        self.__chunk_size: int = chunk_size
+        self.__read: int = 0
+        self.__start: int = 0
+        self.__text: str = ""
+        self.__offset: int = 0
+        self.__utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.__decoder: json.JSONDecoder = json.JSONDecoder()
+
+    @property
+    def position(self) -> int:
+        """Позиция в файле в байтах."""
+        return self.__start + len(self.__text[:self.__offset].encode("utf-8"))
+
+    def expect(self, token: str) -> None:
+        if not self.consume(token):
+            raise ValueError(f"Ожидался символ {token} в позиции {self.position}")
+
+    def consume(self, token: str) -> bool:
+        self.__skip_whitespace()
+        if self.__text.startswith(token, self.__offset):
+            self.__offset += len(token)
+            return True
+        return False
+
+    def value(self):
+        """Разбор одного JSON значения, начиная с текущей позиции."""
+        self.__skip_whitespace()
+        while True:
+            try:
+                result, end = self.__decoder.raw_decode(self.__text, self.__offset)
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+                continue
+            if end == len(self.__text) and self.__fill():
+                continue
+            self.__offset = end
+            return result
+
+    def __fill(self) -> bool:
+        """Подгрузка следующего блока файла. Неразобранный остаток текущего блока сохраняется."""
+        if self.__read >= len(self.__data):
+            return False
+        self.__start = self.position
+        chunk: bytes = self.__data[self.__read:self.__read + self.__chunk_size]
+        self.__read += len(chunk)
+        self.__text = self.__text[self.__offset:] + self.__utf8.decode(chunk, self.__read >= len(self.__data))
+        self.__offset = 0
+        return True
+
+    def __skip_whitespace(self) -> None:
+        while True:
+            text: str = self.__text
+            offset: int = self.__offset
+            while offset < len(text) and text[offset] in " \n\r\t":
+                offset += 1
+            self.__offset = offset
+            if offset < len(text) or not self.__fill():
+                return
@@ -0,0 +1,141 @@
+import re
+from operator import itemgetter
+from typing import Mapping
+
+from src.compact import CONTACT_FIELDS
+
+NAME_PATTERN = r"^[А-Я][а-я]*$"
+PERSONAL_PHONE_NUMBER_PATTERN = r"^\d{11}$"
+WORK_PHONE_NUMBER_PATTERN = PERSONAL_PHONE_NUMBER_PATTERN
+
+NAME_REGEX = re.compile(NAME_PATTERN)
+PERSONAL_PHONE_NUMBER_REGEX = re.compile(PERSONAL_PHONE_NUMBER_PATTERN)
+WORK_PHONE_NUMBER_REGEX = PERSONAL_PHONE_NUMBER_REGEX
+
+FIELD_REGEXES = {
+    "first_name": NAME_REGEX,
+    "last_name": NAME_REGEX,
+    "patronymic": NAME_REGEX,
+    "organization": None,
+    "office_number": WORK_PHONE_NUMBER_REGEX,
+    "personal_number": PERSONAL_PHONE_NUMBER_REGEX,
+}
+
+_MISSING = object()
+_get_fields = itemgetter(*CONTACT_FIELDS)
+
+
+def _column_regex(regex: re.Pattern | None) -> re.Pattern | None:
+    """Регулярное выражение для колонки значений, соединенных переводом строки.
+
+    Шаблоны полей не допускают перевода строки, поэтому при совпадении количества строк с количеством значений
+    колонка соответствует выражению тогда и только тогда, когда ему соответствует каждое значение.
+    """
+    if regex is None:
+        return None
+    value: str = regex.pattern.removeprefix("^").removesuffix("$")
+    return re.compile(f"(?:{value}\n)*{value}")
+
+
+_COLUMN_REGEXES = {field: _column_regex(regex) for field, regex in FIELD_REGEXES.items()}
+
+
+def validate_contacts(contacts: list) -> list:
+    """Проверка пачки контактов.
+
+    Проверка выполняется по колонкам: значения каждого поля всех контактов соединяются в одну строку и проверяются
+    одним вызовом скомпилированного регулярного выражения. Если колонка не прошла проверку, ее значения
+    проверяются по одному, чтобы найти ошибочные контакты. Лишние ключи контактов отбрасываются.
+
+    Args:
+        contacts: Контакты в формате словарей с ключами first_name, last_name, patronymic, organization,
+            office_number, personal_number.
+
+    Returns:
+        Список пар (контакт, ошибки) в порядке contacts. Для корректного контакта первый элемент - словарь только с
+        полями контакта, второй - пустой список. Для некорректного контакта первый элемент - None, второй - список
+        ошибок вида {"field": "first_name", "type": "pattern", "message": "..."}. Типы ошибок: "missing" - поле
+        отсутствует, "type" - значение не строка, "pattern" - значение не соответствует шаблону.
+    """
+    if not contacts:
+        return []
+    try:
+        rows: list = list(map(_get_fields, contacts))
+    except (KeyError, TypeError):
+        rows = [_get_row(contact) for contact in contacts]
+
+    errors: dict = {}
+    for field, column in zip(CONTACT_FIELDS, zip(*rows)):
+        if _column_is_valid(field, column):
+            continue
+        for position, value in enumerate(column):
+            details: dict | None = _check_value(field, value)
+            if details is not None:
+                errors.setdefault(position, []).append(details)
+
+    return [
+        (None, errors[position]) if position in errors else (dict(zip(CONTACT_FIELDS, row)), [])
+        for position, row in enumerate(rows)
+    ]
+
+
+def validate_contact(contact: Mapping) -> tuple:
+    """Проверка одного контакта.
+
+    Returns:
+        Пара (контакт, ошибки) в формате validate_contacts.
+    """
+    return validate_contacts([contact])[0]
+
+
+def validate_fields(fields: Mapping) -> list:
+    """Проверка значений части полей контакта, например изменений при обновлении.
+
+    Returns:
+        Список ошибок в формате validate_contacts. Для поля, которого нет у контакта, возвращается ошибка типа
+        "unknown".
+    """
+    errors: list = []
+    for field, value in fields.items():
+        if field not in FIELD_REGEXES:
+            errors.append({"field": field, "type": "unknown", "message": "Неизвестное поле"})
+            continue
+        details: dict | None = _check_value(field, value)
+        if details is not None:
+            errors.append(details)
+    return errors
+
+
+def _get_row(contact) -> tuple:
+    """Значения полей контакта. Отсутствующие поля заменяются маркером _MISSING."""
+    if not isinstance(contact, Mapping):
+        return (_MISSING,) * len(CONTACT_FIELDS)
+    return tuple(contact.get(field, _MISSING) for field in CONTACT_FIELDS)
+
+
+def _column_is_valid(field: str, column: tuple) -> bool:
+    """Проверка всех значений колонки одним вызовом регулярного выражения."""
+    try:
+        text: str = "\n".join(column)
+    except TypeError:
+        return False
+    if text.count("\n") != len(column) - 1:
+        return False
+    regex: re.Pattern | None = _COLUMN_REGEXES[field]
+    return regex is None or regex.fullmatch(text) is not None
+
+
+def _check_value(field: str, value) -> dict | None:
+    """Проверка значения поля.
+
+    Returns:
+        Описание ошибки или None, если значение корректно.
+    """
+    if value is _MISSING:
+        return {"field": field, "type": "missing", "message": "Поле отсутствует"}
+    if not isinstance(value, str):
+        return {"field": field, "type": "type", "message": "Значение должно быть строкой"}
+    regex: re.Pattern | None = FIELD_REGEXES[field]
+    if regex is not None and regex.fullmatch(value) is None:
+        return {"field": field, "type": "pattern", "message": f"Значение не соответствует шаблону {regex.pattern}"}
+    return None
@@ -1,7 +1,12 @@
-from art import tprint
-from tabulate import tabulate
-from src.phonebook import Phonebook, NAME_PATTERN, PERSONAL_PHONE_NUMBER_PATTERN, WORK_PHONE_NUMBER_PATTERN
+from functools import lru_cache
+from src.validation import NAME_REGEX, PERSONAL_PHONE_NUMBER_REGEX, WORK_PHONE_NUMBER_REGEX
+from typing import TYPE_CHECKING
+import os
 import re
+import threading
+
+if TYPE_CHECKING:
+    from src.phonebook import Phonebook
 
 RED_COLOR = "\u001b[31m"
 BLUE_COLOR = "\u001b[34m"
@@ -9,10 +14,83 @@ GREEN_COLOR = "\u001b[32m"
 END_COLOR = "\033[0m"
 
 PAGINATION = 7
+WORD_REGEX = re.compile(r"\w+")
+LOGO_FONT = "clr8x8"
+
+
+def logo_cache_dir() -> str:
+    """Каталог кэша отрисованных логотипов: $XDG_CACHE_HOME/phonebook или ~/.cache/phonebook."""
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                        "phonebook")
+
+
+@lru_cache(maxsize=None)
+def render_logo(text: str, font: str = LOGO_FONT) -> str:
+    """Отрисовка логотипа шрифтом art с кэшированием.
+
+    Импорт art занимает больше времени, чем весь остальной запуск меню, поэтому отрисованный логотип сохраняется
+    в файл в logo_cache_dir(), и при следующих запусках art не импортируется. Если кэш недоступен для записи,
+    логотип отрисовывается при каждом запуске.
+
+    Args:
+        text: Текст логотипа.
+        font: Шрифт art.
+
+    Returns:
+        Логотип в виде многострочного текста.
+    """
+    path: str = os.path.join(logo_cache_dir(), f"logo-{font}-{text.encode().hex()}.txt")
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+    except OSError:
+        pass
+    from art import text2art
+
+    logo: str = text2art(text, font=font)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(logo)
+        os.replace(temporary_path, path)
+    except OSError:
+        pass
+    return logo
 
 
 class View:
-    __phonebook: Phonebook = Phonebook()
+    def __init__(self, file_path: str = "phonebook.json") -> None:
+        """
+        База данных открывается и индексируется в фоновом потоке, чтобы меню появлялось сразу. Первое обращение к
+        справочнику ждет окончания загрузки. База данных открывается в режиме shared, чтобы несколько копий
+        приложения могли работать с одним файлом: каждое изменение сразу записывается на диск.
+
+        Args:
+            file_path: Путь к файлу базы данных.
+        """
+        self.__database: "Phonebook | None" = None
+        self.__load_error: BaseException | None = None
+        self.__loader: threading.Thread = threading.Thread(
+            target=self.__open_database, args=(file_path,), name="phonebook-loader", daemon=True
+        )
+        self.__loader.start()
+
+    @property
+    def __phonebook(self) -> "Phonebook":
+        """Справочник. Если база данных еще загружается, ожидает окончания загрузки."""
+        self.__loader.join()
+        if self.__load_error is not None:
+            raise self.__load_error
+        return self.__database
+
+    def __open_database(self, file_path: str) -> None:
+        try:
+            from src.phonebook import Phonebook
+
+            self.__database = Phonebook(file_path, shared=True)
+        except BaseException as error:
+            self.__load_error = error
 
     @staticmethod
     def draw_logo(logo_text: str = "Phonebook") -> None:
@@ -22,7 +100,7 @@ class View:
             logo_text: Текст логотипа, стандартное значение Phonebook.
         """
         print(BLUE_COLOR, sep="", end="")
-        tprint(logo_text, font="clr8x8")
+        print(render_logo(logo_text))
         print(END_COLOR, sep="", end="")
 
     @staticmethod
@@ -37,44 +115,94 @@ class View:
         print("0. Выход.\n")
 
     def draw_main_menu(self) -> None:
-        """Отрисовка главного меню"""
-        while True:
-            self.clear_console()
-            self.draw_logo()
-            self.draw_main_menus_options()
-            choice: str = input("Выберите пункт [0-5]: ")
-            match choice:
-                case "1":
-                    self.draw_all_contacts_page()
-                case "2":
-                    self.draw_get_contacts_page()
-                case "3":
-                    self.draw_add_new_contact()
-                case "4":
-                    self.draw_update_contact()
-                case "5":
-                    self.draw_delete_contact()
-                case "0":
-                    break
-
-    def draw_paginated_contacts(self, contacts: list) -> None:
+        """Отрисовка главного меню
+
+        При выходе из меню база данных закрывается. Если база данных не загрузилась, закрывать нечего.
+        """
+        try:
+            while True:
+                self.clear_console()
+                self.draw_logo()
+                self.draw_main_menus_options()
+                choice: str = input("Выберите пункт [0-5]: ")
+                match choice:
+                    case "1":
+                        self.draw_all_contacts_page()
+                    case "2":
+                        self.draw_get_contacts_page()
+                    case "3":
+                        self.draw_add_new_contact()
+                    case "4":
+                        self.draw_update_contact()
+                    case "5":
+                        self.draw_delete_contact()
+                    case "stats":
+                        self.draw_stats_page()
+                    case "0":
+                        break
+        finally:
+            # Не через __phonebook: ошибка загрузки базы не должна заменять исключение, с которым завершилось меню.
+            self.__loader.join()
+            if self.__database is not None:
+                self.__database.close_db()
+
+    def draw_stats_page(self) -> None:
+        """Отрисовка статистики работы справочника
+
+        Скрытый пункт главного меню, открывается вводом "stats".
+        """
+        from tabulate import tabulate
+
+        self.clear_console()
+        stats: dict = self.__phonebook.stats()
+        print(f"{BLUE_COLOR}Время выполнения операций, мс:{END_COLOR}\n")
+        print(tabulate(
+            [[name, latency["count"], latency["mean"] * 1000, latency["p50"] * 1000, latency["p99"] * 1000,
+              latency["max"] * 1000] for name, latency in stats["latency"].items()],
+            headers=["Операция", "Вызовов", "Среднее", "p50", "p99", "Максимум"], floatfmt=".3f"
+        ))
+        print(f"\n{BLUE_COLOR}Счетчики:{END_COLOR}\n")
+        storage: dict = {name: value for name, value in stats["storage"].items() if not isinstance(value, dict)}
+        counters: dict = {
+            **stats["counters"], "index_hit_rate": stats["index_hit_rate"],
+            "scan_efficiency": stats["scan_efficiency"], "contacts": stats["contacts"], **storage,
+            **{f"{name}_cache_{key}": value for name, cache in stats["caches"].items() for key, value in cache.items()},
+        }
+        print(tabulate(counters.items(), headers=["Счетчик", "Значение"]))
+        print()
+        input("Нажмите любую клавишу чтобы продолжить...")
+
+    def draw_paginated_contacts(self, partial: bool = False, **kwargs) -> None:
         """Отрисовка контактов с пагинацией
 
+        Из базы данных читается только отображаемая страница. Переход на следующую страницу выполняется по курсору
+        последнего контакта, переход на произвольную страницу - по смещению в упорядоченном индексе.
+
         Args:
-            contacts: Список контактов в формате [{contact_1}, {contact_2}, ...]
+            partial: Поиск по частичному совпадению.
+            **kwargs: Фильтры контактов. Если не указаны, выводятся все контакты.
         """
-        if len(contacts) == 0:
+        count: int = self.__phonebook.count_contacts(partial, **kwargs)
+        if count == 0:
             print(f"{BLUE_COLOR}Все контакты:{END_COLOR}")
             input(f"{RED_COLOR}Список контактов пуст. Нажмите любую клавишу для выхода в меню...{END_COLOR}")
             return
 
-        paginated_contacts: list = self.get_paginated_list(contacts)
-        max_page = len(paginated_contacts)
+        max_page: int = (count + PAGINATION - 1) // PAGINATION
         current_page: int = 1
+        page: list = self.get_contacts_page(partial, kwargs, offset=0)
         while True:
+            if len(page) < PAGINATION:
+                # Контакты могли быть удалены другим процессом или потоком после подсчета: количество страниц
+                # пересчитывается, и если текущей страницы больше нет, выводится последняя.
+                count = self.__phonebook.count_contacts(partial, **kwargs)
+                max_page = max((count + PAGINATION - 1) // PAGINATION, 1)
+                if current_page > max_page:
+                    current_page = max_page
+                    page = self.get_contacts_page(partial, kwargs, offset=(current_page - 1) * PAGINATION)
             self.clear_console()
             print(f"{BLUE_COLOR}Все контакты:{END_COLOR}\n")
-            self.draw_contacts_table(paginated_contacts[current_page - 1])
+            self.draw_contacts_table([contact for _, contact in page], (current_page - 1) * PAGINATION + 1)
             print(f"\nСтр. {current_page}/{max_page}\n")
 
             if max_page == 1:
@@ -87,52 +215,82 @@ class View:
             choice = input("Выберите: ")
             if choice == "-" and current_page > 1:
                 current_page -= 1
+                page = self.get_contacts_page(partial, kwargs, offset=(current_page - 1) * PAGINATION)
             elif choice == "+" and current_page < max_page:
                 current_page += 1
+                if page:
+                    page = self.get_contacts_page(partial, kwargs, after=page[-1][0])
+                else:
+                    page = self.get_contacts_page(partial, kwargs, offset=(current_page - 1) * PAGINATION)
             elif choice.isdigit() and 1 <= int(choice) <= max_page:
                 current_page = int(choice)
+                page = self.get_contacts_page(partial, kwargs, offset=(current_page - 1) * PAGINATION)
             elif choice == "0":
                 break
 
+    def get_contacts_page(self, partial: bool, filters: dict, after: tuple | None = None, offset: int = 0) -> list:
+        """Получение страницы контактов размером PAGINATION.
+
+        Args:
+            partial: Поиск по частичному совпадению.
+            filters: Фильтры контактов.
+            after: Курсор последнего контакта предыдущей страницы.
+            offset: Смещение страницы.
+
+        Returns:
+            Список пар (курсор, контакт).
+        """
+        return list(self.__phonebook.iter_contacts(
+            filters=filters, after=after, limit=PAGINATION, offset=offset, partial=partial
+        ))
+
     @staticmethod
-    def draw_contacts_table(contacts: list) -> None:
+    def draw_contacts_table(contacts: list, first_id: int = 1) -> None:
         """Отрисовка контактов в виде таблицы
 
         Args:
             contacts (list): Список контактов в формате [{contact_1}, {contact_2}, ...]
+            first_id (int): Номер первого контакта в таблице. Номера остальных контактов идут по порядку.
         """
+        from tabulate import tabulate
+
         header: list = ["id", "Фамилия", "Имя", "Отчество", "Организация", "Телефон рабочий", "Телефон личный"]
         table = [
-            [contact["id"], contact["last_name"], contact["first_name"], contact["patronymic"], contact["organization"],
+            [contact_id, contact["last_name"], contact["first_name"], contact["patronymic"], contact["organization"],
              contact["office_number"], contact["personal_number"]]
-            for contact in contacts]
+            for contact_id, contact in enumerate(contacts, first_id)]
         print(tabulate(table, headers=header))
 
     def draw_all_contacts_page(self) -> None:
         """Отрисовка раздела со всеми контактами"""
-        contacts: list = self.get_contacts_wiht_filtres()
         self.clear_console()
-        self.draw_paginated_contacts(contacts)
+        self.draw_paginated_contacts()
 
-    def get_contacts_wiht_filtres(self, **kwargs) -> list:
+    def get_contacts_wiht_filtres(self, partial: bool = False, **kwargs) -> list:
         """Получение контактов с фильтрами в отсортированном виде.
 
         Если фильтры не указаны, возвращает список всех контактов.
 
         Args:
+            partial (bool): поиск по частичному совпадению: ФИО и организация по началу значения, номера
+                телефонов по вхождению
             **kwargs (dict): список фильтров
 
         Returns:
             Отсортированный список в формате [{contact_1}, {contact_2}, ...]
         """
-        contacts: list = self.__phonebook.get_contacts(**kwargs)
-        sorted_contacts: list = self.get_sorted_list(contacts)
-        return sorted_contacts
+        return self.__phonebook.get_sorted_contacts(partial, **kwargs)
 
     def draw_get_contacts_page(self) -> None:
         """Отрисовка раздела с поиском контактов"""
         self.clear_console()
         print(f"{BLUE_COLOR}Поиск контактов.{END_COLOR}\n")
+        print("1. Точное совпадение.")
+        print("2. ФИО и организация начинаются с, телефоны содержат.")
+        print("3. ФИО с опечатками.\n")
+        mode: str = input("Выберите режим поиска [1-3]: ")
+        partial: bool = mode == "2"
+        print()
         data: dict = {
             "last_name": input("Введите Фамилию: "),
             "first_name": input("Введите Имя: "),
@@ -142,13 +300,30 @@ class View:
             "personal_number": input("Введите Личный телефон: ")
         }
         result_data: dict = {key: value for key, value in data.items() if value}
-        contacts: list = self.get_contacts_wiht_filtres(**result_data)
-        if len(contacts) == 0:
+        if mode == "3":
+            self.draw_fuzzy_contacts(**result_data)
+        elif self.__phonebook.count_contacts(partial, **result_data) == 0:
             input(f"\n{RED_COLOR}Контактов не найдено, нажмите любую клавишу для выхода...{END_COLOR}")
         else:
             self.clear_console()
             print(f"{BLUE_COLOR}Поиск контактов.{END_COLOR}\n")
-            self.draw_paginated_contacts(contacts)
+            self.draw_paginated_contacts(partial, **result_data)
+
+    def draw_fuzzy_contacts(self, **kwargs) -> None:
+        """Отрисовка первых PAGINATION контактов, найденных с опечатками, в порядке похожести
+
+        Args:
+            **kwargs: Фильтры контактов (см. Phonebook.fuzzy_contacts).
+        """
+        contacts: list = self.__phonebook.fuzzy_contacts(limit=PAGINATION, **kwargs)
+        if not contacts:
+            input(f"\n{RED_COLOR}Контактов не найдено, нажмите любую клавишу для выхода...{END_COLOR}")
+            return
+        self.clear_console()
+        print(f"{BLUE_COLOR}Похожие контакты:{END_COLOR}\n")
+        self.draw_contacts_table(contacts)
+        print()
+        input("Нажмите любую клавишу чтобы продолжить...")
 
     def draw_add_new_contact(self):
         """Добавление нового контакта"""
@@ -156,15 +331,15 @@ class View:
         data: dict = {
             "first_name": self.get_correct_param(
                 "Введите имя. Имя должно содержать только кириллицу и начинаться с заглавной буквы.",
-                pattern=NAME_PATTERN
+                pattern=NAME_REGEX
             ),
             "last_name": self.get_correct_param(
                 "Введите фамилию. Фамилия должна содержать только кириллицу и начинаться с заглавной буквы.",
-                pattern=NAME_PATTERN
+                pattern=NAME_REGEX
             ),
             "patronymic": self.get_correct_param(
                 "Введите отчество. Отчество должно содержать только кириллицу и начинаться с заглавной буквы.",
-                pattern=NAME_PATTERN
+                pattern=NAME_REGEX
             ),
             "organization": self.get_correct_param(
                 "Введите название организации.",
@@ -172,12 +347,12 @@ class View:
             "office_number": self.get_correct_param(
                 "Введите рабочий номер телефона в формате 89999999999. Номер не должен содержать лишних символов и"
                 "должен содержать 11 цифр.",
-                pattern=WORK_PHONE_NUMBER_PATTERN
+                pattern=WORK_PHONE_NUMBER_REGEX
             ),
             "personal_number": self.get_correct_param(
                 "Введите личный номер телефона в формате 89999999999. Номер не должен содержать лишних символов и "
                 "должен содержать 11 цифр.",
-                pattern=PERSONAL_PHONE_NUMBER_PATTERN
+                pattern=PERSONAL_PHONE_NUMBER_REGEX
             ),
         }
         result = self.__phonebook.add_contact(**data)
@@ -198,12 +373,12 @@ class View:
         personal_number: str = self.get_correct_param(
             "Введите личный номер телефона в формате 89999999999. Номер должен существовать в базе. Номер не"
             "должен содержать лишних символов и должен содержать 11 цифр.",
-            pattern=PERSONAL_PHONE_NUMBER_PATTERN)
+            pattern=PERSONAL_PHONE_NUMBER_REGEX)
         contacts: list = self.__phonebook.get_contacts(personal_number=personal_number)
         if contacts:
             self.clear_console()
             print(f"{BLUE_COLOR}Найден следующий контакт:{END_COLOR}\n")
-            self.draw_contacts_table(self.get_sorted_list(contacts))
+            self.draw_contacts_table(contacts)
             print()
             contact: dict = contacts[0]
             data: dict = {
@@ -211,19 +386,19 @@ class View:
                     "Введите имя. Имя должно содержать только кириллицу и начинаться с заглавной буквы. "
                     "Оставьте поле пустым если хотите оставить текущее значение.",
                     contact["first_name"],
-                    NAME_PATTERN
+                    NAME_REGEX
                 ),
                 "last_name": self.get_correct_param(
                     "Введите фамилию. Фамилия должна содержать только кириллицу и начинаться с заглавной буквы. "
                     "Оставьте поле пустым если хотите оставить текущее значение.",
                     contact["last_name"],
-                    NAME_PATTERN
+                    NAME_REGEX
                 ),
                 "patronymic": self.get_correct_param(
                     "Введите отчество. Отчество должно содержать только кириллицу и начинаться с заглавной буквы. "
                     "Оставьте поле пустым если хотите оставить текущее значение.",
                     contact["patronymic"],
-                    NAME_PATTERN
+                    NAME_REGEX
                 ),
                 "organization": self.get_correct_param(
                     "Введите название организации.",
@@ -233,13 +408,13 @@ class View:
                     "Введите рабочий номер телефона в формате 89999999999. Номер не должен содержать лишних символов и"
                     "должен содержать 11 цифр. Оставьте поле пустым если хотите оставить текущее значение.",
                     contact["office_number"],
-                    WORK_PHONE_NUMBER_PATTERN
+                    WORK_PHONE_NUMBER_REGEX
                 ),
                 "personal_number": self.get_correct_param(
                     "Введите личный номер телефона в формате 89999999999. Номер не должен содержать лишних символов и "
                     "должен содержать 11 цифр. Оставьте поле пустым если хотите оставить текущее значение.",
                     contact["personal_number"],
-                    PERSONAL_PHONE_NUMBER_PATTERN
+                    PERSONAL_PHONE_NUMBER_REGEX
                 ),
             }
             result: dict = self.__phonebook.update_contact(personal_num=contact["personal_number"], **data)
@@ -262,11 +437,11 @@ class View:
         personal_number = self.get_correct_param(
             "Введите личный номер телефона в формате 89999999999. Номер должен существовать в базе. Номер не"
             "должен содержать лишних символов и должен содержать 11 цифр.",
-            pattern=PERSONAL_PHONE_NUMBER_PATTERN)
+            pattern=PERSONAL_PHONE_NUMBER_REGEX)
         contacts: list = self.__phonebook.get_contacts(personal_number=personal_number)
         if contacts:
             print("Найден следующий контакт:\n")
-            self.draw_contacts_table(self.get_sorted_list(contacts))
+            self.draw_contacts_table(contacts)
             print()
             choice = input("Уверены, что хотите удалить контакт? [Да/Нет]: ")
             if choice.lower() == "да":
@@ -283,7 +458,8 @@ class View:
         input("Нажмите на любую клавишу чтобы продолжить...")
 
     @staticmethod
-    def get_correct_param(help_text: str, default_value: str | None = None, pattern: str = "\\w+") -> str:
+    def get_correct_param(help_text: str, default_value: str | None = None,
+                          pattern: str | re.Pattern = WORD_REGEX) -> str:
         """Получение от пользователя корректных параметров.
 
         Получение от пользователя параметров, которые должны соответствовать шаблону регулярного выражения pattern.
@@ -292,9 +468,9 @@ class View:
         Args:
             help_text: Текст с подсказкой для параметра. Будете выводится перед input.
             default_value: Дефолтное значение для параметров.
-            pattern: Паттерн регулярного выражения, на основании которого будет проводится проверка корректности
-                введеынх пользователем данных. Если параметр не введен, то допускается любые названия (кроме пустых
-                строк).
+            pattern: Паттерн регулярного выражения или скомпилированное выражение, на основании которого будет
+                проводится проверка корректности введеынх пользователем данных. Если параметр не введен, то
+                допускается любые названия (кроме пустых строк).
 
         Returns:
              Корректный параметр, соответствующий входному шаблону.
@@ -304,7 +480,8 @@ class View:
         print()
         if not param and default_value is not None:
             return default_value
-        while re.match(pattern, param) is None:
+        match = re.compile(pattern).match
+        while match(param) is None:
             print(f"{RED_COLOR}Введены некорректные данные. {help_text} {END_COLOR}")
             param: str = input("Введите значение: ")
             print()
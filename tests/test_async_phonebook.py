@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.async_phonebook import AsyncPhonebook
+from src.phonebook import Phonebook
+from unittest import IsolatedAsyncioTestCase
+import asyncio
+import os
+import time
+
+
+class SlowExecutor(ThreadPoolExecutor):
+    """Пул потоков, задачи которого выполняются не быстрее delay секунд."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__(max_workers=1)
+        self.delay: float = delay
+
+    def submit(self, fn, *args, **kwargs):
+        def slow():
+            time.sleep(self.delay)
+            return fn(*args, **kwargs)
+        return super().submit(slow)
+
+
+class TestAsyncPhonebook(IsolatedAsyncioTestCase):
+    db_path = "tests/test_async_bd.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "Effective Mobile",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def read_file(self) -> list:
+        phonebook: Phonebook = Phonebook(self.db_path)
+        contacts: list = phonebook.get_all_contacts()
+        phonebook.close_db()
+        return contacts
+
+    async def test_same_results_as_phonebook(self):
+        """Результаты совпадают с Phonebook, изменения записаны на диск к моменту возврата"""
+        phonebook: AsyncPhonebook = await AsyncPhonebook.open(self.db_path)
+        assert await phonebook.add_contact(**self.user_data) == {
+            "success": True, "message": "Контакт успешно создан!", "id": 1
+        }
+        assert self.read_file() == [self.user_data]
+        assert await phonebook.add_contact(**self.user_data) == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        assert await phonebook.get_contacts(last_name="Иванов") == [self.user_data]
+        assert await phonebook.update_contact("89991575656", first_name="Петр") == {
+            "success": True, "message": "Контакт успешно обновлен!"
+        }
+        assert self.read_file()[0]["first_name"] == "Петр"
+        assert await phonebook.delete_contact("89991575656") == {"success": True, "message": "Контакт успешно удален!"}
+        assert await phonebook.delete_contact("89991575656") == {"success": False, "message": "Контакта не существует."}
+        assert self.read_file() == []
+        await phonebook.close()
+
+    async def test_coalesced_flush(self):
+        """Одновременные изменения записываются на диск одним сбросом"""
+        phonebook: AsyncPhonebook = await AsyncPhonebook.open(self.db_path, flush_delay=0.05)
+        results: list = await asyncio.gather(*(
+            phonebook.add_contact(**{**self.user_data, "personal_number": f"8999{i:07d}"}) for i in range(50)
+        ))
+        assert all(result["success"] for result in results)
+        assert len(self.read_file()) == 50
+        stats: dict = await phonebook.stats()
+        assert stats["storage"]["flushes"] == 1
+        assert stats["flush_batches"]["count"] == 1
+        assert stats["flush_batches"]["max"] == 50
+        await phonebook.close()
+
+    async def test_flush_does_not_block_loop(self):
+        """Во время сброса цикл событий продолжает работу, операции ждут завершения сброса"""
+        with SlowExecutor(0.2) as executor:
+            phonebook: AsyncPhonebook = AsyncPhonebook(self.db_path, flush_delay=0, executor=executor)
+            ticks: list = []
+
+            async def ticker():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            ticking: asyncio.Task = asyncio.create_task(ticker())
+            writer: asyncio.Task = asyncio.create_task(phonebook.add_contact(**self.user_data))
+            await asyncio.sleep(0.05)
+            assert not writer.done()
+            assert await phonebook.get_contacts(personal_number="89991575656") == [self.user_data]
+            assert writer.done()
+            ticking.cancel()
+            assert len(ticks) >= 10
+            await phonebook.close()
@@ -0,0 +1,157 @@
+from src.backends import CompactBackend, SQLiteBackend, TinyDBBackend, migrate_json_to_sqlite
+from src.phonebook import Phonebook
+from unittest import TestCase
+import json
+import os
+import sqlite3
+
+import tests.test_phonebook as test_phonebook
+
+
+class TestSQLitePhonebook(test_phonebook.TestPhonebook):
+    """Тесты Phonebook на хранилище SQLite"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db_path = "tests/test_bd.db"
+
+    def tearDown(self):
+        super().tearDown()
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_sqlite_settings(self):
+        """Режим WAL, индексы и ограничение уникальности"""
+        self.phonebook.add_contact(**self.user_data)
+        connection = sqlite3.connect(self.db_path)
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes: set = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "contacts_last_name" in indexes
+        with self.assertRaises(sqlite3.IntegrityError):
+            connection.execute(
+                "INSERT INTO contacts (first_name, last_name, patronymic, organization, office_number, "
+                "personal_number) VALUES ('А', 'Б', 'В', 'Г', '1', ?)", (self.user_data["personal_number"],)
+            )
+        connection.close()
+
+    def test_update_without_changes(self):
+        """Обновление без изменений завершается успешно и не меняет контакт"""
+        self.phonebook.add_contact(**self.user_data)
+        assert self.phonebook.update_contact(self.user_data["personal_number"])["success"]
+        self.phonebook.update_contacts({"last_name": self.user_data["last_name"]}, {})
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+
+
+class TestMigration(TestCase):
+    json_path = "tests/test_migration_bd.json"
+    sqlite_path = "tests/test_migration_bd.db"
+
+    def tearDown(self):
+        for path in (self.json_path, self.sqlite_path, self.sqlite_path + "-wal", self.sqlite_path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_migrate_json_to_sqlite(self):
+        """Перенос контактов из JSON в SQLite с сохранением id"""
+        phonebook: Phonebook = Phonebook(self.json_path)
+        for i in range(3):
+            phonebook.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", f"8999100000{i}")
+        phonebook.delete_contact("89991000000")
+        contacts: list = phonebook.get_all_contacts()
+        phonebook.close_db()
+
+        assert migrate_json_to_sqlite(self.json_path, self.sqlite_path) == 2
+        backend: SQLiteBackend = SQLiteBackend(self.sqlite_path)
+        assert [doc_id for doc_id, _ in backend.items()] == [2, 3]
+        backend.close()
+        phonebook = Phonebook(self.sqlite_path)
+        assert phonebook.get_all_contacts() == contacts
+        assert phonebook.add_contact("Петр", "Петров", "Петрович", "Microsoft", "81111111111", "82222222222")["id"] == 4
+        phonebook.close_db()
+
+
+class TestInvalidUpdate(TestCase):
+    paths: dict = {
+        TinyDBBackend: "tests/test_invalid_bd.json",
+        CompactBackend: "tests/test_invalid_compact_bd.json",
+        SQLiteBackend: "tests/test_invalid_bd.db",
+    }
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "Effective Mobile",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+    invalid_changes: tuple = ({"age": "5"}, {"office_number": 123}, {"first_name": None})
+
+    def tearDown(self):
+        for path in self.paths.values():
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def test_backends(self):
+        """Все хранилища одинаково отклоняют неизвестные поля и значения не строками"""
+        for backend_class, path in self.paths.items():
+            with self.subTest(backend=backend_class.__name__):
+                backend = backend_class(path)
+                doc_id: int = backend.insert(self.user_data)
+                for changes in self.invalid_changes:
+                    with self.assertRaises(ValueError):
+                        backend.update(doc_id, changes)
+                    with self.assertRaises(ValueError):
+                        backend.update_many([doc_id], changes)
+                assert dict(backend.get(doc_id)) == self.user_data
+                backend.close()
+
+    def test_phonebook(self):
+        """Phonebook возвращает одинаковый результат некорректного обновления на всех хранилищах"""
+        results: list = []
+        for backend_class, path in self.paths.items():
+            phonebook: Phonebook = Phonebook(path, compact=backend_class is CompactBackend)
+            phonebook.add_contact(**self.user_data)
+            results.append([
+                phonebook.update_contact(self.user_data["personal_number"], **changes)
+                for changes in self.invalid_changes
+            ])
+            assert phonebook.get_all_contacts() == [self.user_data]
+            phonebook.close_db()
+        assert results[0] == results[1] == results[2]
+        assert all(result["success"] is False and result["errors"] for result in results[0])
+
+
+class TestCompactPhonebook(test_phonebook.TestPhonebook):
+    """Тесты Phonebook на компактном хранилище в памяти"""
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path, compact=True)
+
+    def test_compact_file_format(self):
+        """Компактное хранилище пишет файл в формате TinyDB"""
+        self.phonebook.add_contact(**self.user_data)
+        self.phonebook.flush()
+        with open(self.db_path, encoding="utf-8") as file:
+            assert json.load(file) == {"_default": {"1": self.user_data}}
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+
+    def test_streaming_load(self):
+        """Потоковая загрузка файла с отображением хода"""
+        for i in range(3):
+            self.phonebook.add_contact(**{**self.user_data, "personal_number": f"8999100000{i}"})
+        self.phonebook.delete_contact("89991000001")
+        self.phonebook.close_db()
+        reports: list = []
+        self.phonebook = Phonebook(
+            self.db_path, compact=True, progress=lambda done, total: reports.append((done, total))
+        )
+        assert [contact["personal_number"] for contact in self.phonebook.get_all_contacts()] == [
+            "89991000000", "89991000002"
+        ]
+        assert reports[-1] == (os.path.getsize(self.db_path),) * 2
+        assert self.phonebook.add_contact(**self.user_data)["id"] == 4
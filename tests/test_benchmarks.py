@@ -0,0 +1,45 @@
+from benchmarks.run import FILTER_FIELDS, compare, run_size
+from unittest import TestCase
+
+
+class TestBenchmarks(TestCase):
+    def test_run_size(self):
+        """Замер всех операций на маленьком справочнике"""
+        results: dict = run_size(50, repeat=2)
+        operations: set = {
+            "bulk_load", "open", "add_contact", "update_contact", "delete_contact", "get_sorted_contacts",
+            "view_get_sorted_list", "view_get_paginated_list", "close", "file_size",
+            "view_time_to_menu", "view_open_and_exit", "export_csv", "export_jsonl", "export_vcard", "import_csv",
+            "import_jsonl", "import_vcard", "snapshot_convert", "snapshot_read_json", "snapshot_read", "snapshot_open",
+            "snapshot_file_size",
+            *(f"get_contacts_{count}" for count in range(1, len(FILTER_FIELDS) + 1)),
+        }
+        assert set(results) == operations
+        assert results["bulk_load"]["ops"] == 50
+        assert results["add_contact"]["ops"] == 2
+        assert results["file_size"]["bytes"] > 0
+        assert results["view_time_to_menu"]["seconds"] <= results["view_open_and_exit"]["seconds"]
+        assert all(
+            results[name]["seconds"] >= 0 and results[name]["peak_rss"] > 0
+            for name in operations - {"file_size", "snapshot_file_size"}
+        )
+
+    def test_sharding(self):
+        """Замер шардированного справочника на 1..N процессах"""
+        results: dict = run_size(50, repeat=2, shards=2)
+        assert results["sharded_add_contacts"]["ops"] == 50
+        assert results["sharded_find_contacts_1w"]["speedup"] == 1
+        assert results["sharded_count_contacts_2w"]["speedup"] > 0
+
+    def test_compare(self):
+        """Регрессией считается рост метрики больше порога"""
+        baseline: dict = {"results": {"1000": {
+            "open": {"ops": 1, "per_op": 0.1, "peak_rss": 1000, "bytes_written": 0},
+            "close": {"ops": 1, "per_op": 0.0001, "peak_rss": 1000, "bytes_written": 10},
+        }}}
+        current: dict = {"results": {"1000": {
+            "open": {"ops": 1, "per_op": 0.2, "peak_rss": 1100, "bytes_written": 0},
+            "close": {"ops": 1, "per_op": 0.0003, "peak_rss": 1000, "bytes_written": 20},
+        }}}
+        regressions: list = [row[1:3] for row in compare(baseline, current, threshold=0.25) if row[-1]]
+        assert regressions == [["open", "per_op"], ["close", "bytes_written"]]
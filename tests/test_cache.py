@@ -0,0 +1,45 @@
+from src.cache import Cache, filters_key
+from unittest import TestCase
+
+
+class TestCache(TestCase):
+    def test_lru(self):
+        """Вытесняется значение, к которому дольше всего не обращались"""
+        cache: Cache = Cache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        stats: dict = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (3, 1, 1, 2)
+
+    def test_fifo(self):
+        """Вытесняется значение, которое дольше всего находится в кэше"""
+        cache: Cache = Cache(2, policy="fifo")
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        with self.assertRaises(ValueError):
+            Cache(2, policy="random")
+
+    def test_invalidation(self):
+        """Неактуальное значение удаляется и считается промахом"""
+        cache: Cache = Cache(2)
+        cache.put("a", 1)
+        assert cache.get("a", is_valid=lambda value: value == 2) is None
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+        assert cache.stats()["misses"] == 1
+        disabled: Cache = Cache(0)
+        disabled.put("a", 1)
+        assert disabled.get("a") is None
+
+    def test_filters_key(self):
+        """Ключ условий не зависит от порядка полей"""
+        assert filters_key({"a": "1", "b": "2"}) == filters_key({"b": "2", "a": "1"})
+        assert filters_key({"a": ["1"]}) is None
@@ -0,0 +1,48 @@
+from src.compact import CompactContactStore, ContactRow
+from unittest import TestCase
+
+
+class TestCompactContactStore(TestCase):
+    def setUp(self):
+        self.user_data: dict = {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "patronymic": "Иванович",
+            "organization": "Effective Mobile",
+            "office_number": "09991575656",
+            "personal_number": "89991575656",
+        }
+        self.store: CompactContactStore = CompactContactStore()
+
+    def test_append_and_get(self):
+        """Добавление и получение контакта"""
+        doc_id: int = self.store.append(self.user_data)
+        row: ContactRow = self.store.get(doc_id)
+        assert doc_id == 1
+        assert row == self.user_data
+        assert dict(row) == self.user_data
+        assert row.to_dict() == self.user_data and type(row.to_dict()) is dict
+        assert row["office_number"] == "09991575656"
+        assert not hasattr(row, "__dict__")
+
+    def test_strings_are_interned(self):
+        """Повторяющиеся строки хранятся один раз"""
+        for i in range(100):
+            self.store.append({**self.user_data, "personal_number": f"8999100{i:04d}"})
+        assert len(self.store.strings) == 4
+        assert self.store.get(1)["last_name"] is self.store.get(100)["last_name"]
+
+    def test_update_and_remove(self):
+        """Обновление и удаление контакта"""
+        self.store.append(self.user_data)
+        self.store.append({**self.user_data, "personal_number": "89991000000"})
+        self.store.update(1, {"first_name": "Петр", "office_number": "+7999"})
+        assert self.store.get(1)["first_name"] == "Петр"
+        assert self.store.get(1)["office_number"] == "+7999"
+        self.store.remove(1)
+        assert self.store.get(1) is None
+        assert list(self.store.ids()) == [2]
+        assert len(self.store) == 1
+        assert self.store.append(self.user_data) == 3
+        with self.assertRaises(ValueError):
+            self.store.update(2, {"email": "test"})
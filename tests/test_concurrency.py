@@ -0,0 +1,147 @@
+from src.locks import ReadWriteLock
+from src.phonebook import Phonebook
+from unittest import TestCase
+import multiprocessing
+import os
+import threading
+
+PROCESSES = 4
+OPERATIONS = 30
+
+
+def stress_worker(db_path: str, worker: int) -> None:
+    """Смешанная нагрузка одного процесса: добавление, поиск, обновление и удаление своих контактов."""
+    phonebook: Phonebook = Phonebook(db_path, write_behind=True, shared=True)
+    for i in range(OPERATIONS):
+        personal_number: str = f"8{worker:03d}{i:07d}"
+        phonebook.add_contact("Иван", "Иванов", "Иванович", f"Процесс {worker}", "89991575656", personal_number)
+        phonebook.get_contacts(organization=f"Процесс {worker}")
+        if i % 3 == 1:
+            phonebook.update_contact(personal_number, first_name="Петр")
+        elif i % 3 == 2:
+            phonebook.delete_contact(personal_number)
+        phonebook.count_contacts()
+    phonebook.close_db()
+
+
+class TestReadWriteLock(TestCase):
+    def test_readers_do_not_block_each_other(self):
+        """Несколько потоков одновременно удерживают блокировку на чтение"""
+        lock: ReadWriteLock = ReadWriteLock()
+        barrier: threading.Barrier = threading.Barrier(3, timeout=5)
+        errors: list = []
+
+        def reader():
+            with lock.read():
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError as error:
+                    errors.append(error)
+
+        threads: list = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    def test_writer_excludes_readers(self):
+        """Писатель ждет завершения чтения, повышение чтения до записи запрещено"""
+        lock: ReadWriteLock = ReadWriteLock()
+        events: list = []
+        lock.acquire_read()
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"), lock.release_write()))
+        writer.start()
+        writer.join(0.1)
+        assert events == []
+        with self.assertRaises(RuntimeError):
+            lock.acquire_write()
+        lock.release_read()
+        writer.join()
+        assert events == ["write"]
+        with lock:
+            with lock.read(), lock.write():
+                pass
+
+
+class TestThreads(TestCase):
+    db_path = "tests/test_threads_bd.json"
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_concurrent_readers_and_writer(self):
+        """Чтение из нескольких потоков во время добавления контактов"""
+        phonebook: Phonebook = Phonebook(self.db_path, compact=True, flush_interval=None)
+        errors: list = []
+        done: threading.Event = threading.Event()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    count: int = phonebook.count_contacts()
+                    assert len(phonebook.get_sorted_contacts()) >= count
+                    phonebook.find_contacts(last_name="Ив")
+            except Exception as error:
+                errors.append(error)
+
+        readers: list = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in readers:
+            thread.start()
+        for i in range(200):
+            phonebook.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", f"8999{i:07d}")
+        done.set()
+        for thread in readers:
+            thread.join()
+        assert errors == []
+        assert phonebook.count_contacts() == 200
+        phonebook.close_db()
+
+
+class TestProcesses(TestCase):
+    db_path = "tests/test_processes_bd.json"
+
+    def tearDown(self):
+        for path in (self.db_path, self.db_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_reload_only_when_changed(self):
+        """Процесс перечитывает базу только после изменения другим процессом"""
+        first: Phonebook = Phonebook(self.db_path, shared=True)
+        second: Phonebook = Phonebook(self.db_path, write_behind=True, shared=True)
+        first.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", "89991575656")
+        assert len(second.get_all_contacts()) == 1
+        assert second.get_contacts(personal_number="89991575656") != []
+        assert second.stats()["counters"]["reloads"] == 1
+        second.update_contact("89991575656", first_name="Петр")
+        assert first.get_contacts(first_name="Петр") != []
+        assert first.stats()["counters"]["reloads"] == 1
+        assert first.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", "89991575656") == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        first.close_db()
+        second.close_db()
+
+    def test_stress(self):
+        """Несколько процессов одновременно изменяют один файл без потери изменений"""
+        Phonebook(self.db_path, shared=True).close_db()
+        processes: list = [
+            multiprocessing.Process(target=stress_worker, args=(self.db_path, worker)) for worker in range(PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert [process.exitcode for process in processes] == [0] * PROCESSES
+
+        phonebook: Phonebook = Phonebook(self.db_path)
+        contacts: list = phonebook.get_all_contacts()
+        phonebook.close_db()
+        expected: dict = {
+            f"8{worker:03d}{i:07d}": "Петр" if i % 3 == 1 else "Иван"
+            for worker in range(PROCESSES) for i in range(OPERATIONS) if i % 3 != 2
+        }
+        assert {contact["personal_number"]: contact["first_name"] for contact in contacts} == expected
+        assert len(contacts) == len(expected)
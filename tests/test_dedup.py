@@ -0,0 +1,54 @@
+from src.dedup import duplicate_key, find_duplicates, normalize_phone, normalize_text
+from src.phonebook import Phonebook
+from unittest import TestCase
+import os
+
+
+class TestDedup(TestCase):
+    db_path = "tests/test_dedup_bd.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "ООО \"Рога и копыта\"",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path)
+        self.contacts: list = [
+            self.user_data,
+            {**self.user_data, "organization": "ооо  «Рога и Копыта»", "personal_number": "89990000001"},
+            {**self.user_data, "office_number": "79991575656", "personal_number": "89990000002"},
+            {**self.user_data, "first_name": "Анна", "personal_number": "89990000003"},
+            {**self.user_data, "first_name": "Анна", "personal_number": "89990000004"},
+            {**self.user_data, "office_number": "89991575657", "personal_number": "89990000005"},
+            {**self.user_data, "last_name": "Петров", "personal_number": "89990000006"},
+        ]
+        self.phonebook.add_contacts(self.contacts)
+
+    def tearDown(self):
+        self.phonebook.close_db()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_normalize(self):
+        """Ключ дубликата не зависит от регистра, "ё", знаков препинания и формата номера"""
+        assert normalize_text(" ООО «Рога»,  Копыта ") == "ооо рога копыта"
+        assert normalize_text("Семёнов") == "семенов"
+        assert normalize_phone("+7 (999) 157-56-56") == "89991575656"
+        assert normalize_phone("123-45") == "12345"
+        assert duplicate_key(self.contacts[0]) == duplicate_key(self.contacts[1]) == duplicate_key(self.contacts[2])
+
+    def test_find_and_merge(self):
+        """Поиск групп дубликатов и их объединение одной записью"""
+        plan: list = find_duplicates(self.phonebook, chunk_size=2)
+        assert [(group["keep"], sorted(group["duplicates"])) for group in plan] == [
+            ("89990000003", ["89990000004"]),
+            ("89991575656", ["89990000001", "89990000002"]),
+        ]
+        assert plan[1]["contact"] == self.user_data
+        assert self.phonebook.merge_contacts(plan)["count"] == 3
+        assert find_duplicates(self.phonebook) == []
+        assert self.phonebook.count_contacts() == 4
@@ -0,0 +1,100 @@
+from src.indexes import (
+    FuzzyIndex, HashIndex, NgramIndex, OrderedIndex, PrefixIndex, edit_distance, intersect_postings, phonetic_key
+)
+from unittest import TestCase
+
+
+class TestIndexes(TestCase):
+    def setUp(self):
+        self.documents: list = [
+            {"last_name": "Иванов", "office_number": "89991575656"},
+            {"last_name": "Иваненко", "office_number": "89171575656"},
+            {"last_name": "Петров", "office_number": "81111111111"},
+            {"last_name": "Иванов", "office_number": "82222222222"},
+        ]
+
+    def build(self, index) -> None:
+        """Заполнение индекса документами с id 1, 2, ... так же, как при открытии Phonebook"""
+        index.clear()
+        for doc_id, document in enumerate(self.documents, 1):
+            index.add(doc_id, document)
+
+    def test_hash_index(self):
+        """Поиск по точному значению"""
+        index: HashIndex = HashIndex("last_name")
+        self.build(index)
+        assert index.lookup("Иванов") == {1, 4}
+        index.remove(1, self.documents[0])
+        assert index.lookup("Иванов") == {4}
+        assert index.lookup("Сидоров") == set()
+
+    def test_prefix_index(self):
+        """Поиск по префиксу"""
+        index: PrefixIndex = PrefixIndex("last_name")
+        self.build(index)
+        assert index.lookup_prefix("Иван") == {1, 2, 4}
+        assert index.lookup_prefix("Иванов") == {1, 4}
+        assert index.lookup_prefix("П") == {3}
+        index.remove(2, self.documents[1])
+        assert index.lookup_prefix("Иван") == {1, 4}
+        assert index.lookup_prefix("Я") == set()
+
+    def test_ngram_index(self):
+        """Поиск по подстроке"""
+        index: NgramIndex = NgramIndex("office_number")
+        self.build(index)
+        assert index.lookup_substring("1575656") == {1, 2}
+        assert index.lookup_substring("222") == {4}
+        assert index.lookup_substring("11") == {3}
+        index.remove(1, self.documents[0])
+        assert index.lookup_substring("1575656") == {2}
+        assert index.lookup_substring("00000") == set()
+
+    def test_intersect_postings(self):
+        """Пересечение posting list'ов"""
+        assert intersect_postings([{1, 2, 3}, {2, 3}, {3, 4}]) == {3}
+        assert intersect_postings([{1, 2}, set()]) == set()
+
+    def test_ordered_index(self):
+        """Упорядоченный индекс"""
+        index: OrderedIndex = OrderedIndex(("last_name", "office_number"))
+        self.build(index)
+        assert index.ordered_ids() == [2, 4, 1, 3]
+        assert index.ordered_ids({1, 3}) == [1, 3]
+        index.remove(2, self.documents[1])
+        index.add(5, {"last_name": "Абрамов", "office_number": "80000000000"})
+        assert index.ordered_ids() == [5, 4, 1, 3]
+        assert index.key(5) == ("Абрамов", "80000000000", 5)
+        index.add_many([(6, {"last_name": "Яковлев"}), (7, {"last_name": "Борисов", "office_number": "1"})])
+        assert index.ordered_ids() == [5, 7, 4, 1, 3, 6]
+
+    def test_edit_distance(self):
+        """Расстояние Дамерау-Левенштейна с пределом"""
+        assert edit_distance("иванов", "иванов") == 0
+        assert edit_distance("иванов", "ивнаов") == 1
+        assert edit_distance("иванов", "иваново") == 1
+        assert edit_distance("шрут", "шрутт") == 1
+        assert edit_distance("иванов", "петров") == 4
+        assert edit_distance("иванов", "петров", limit=1) == 2
+
+    def test_phonetic_key(self):
+        """Фонетический ключ не различает удвоенные буквы, оглушение и гласные"""
+        assert phonetic_key("Шрутт") == phonetic_key("Шрут") == phonetic_key("Шрудт")
+        assert phonetic_key("Иванов") == phonetic_key("иваноф")
+        assert phonetic_key("Ёжиков") == phonetic_key("Ежиков")
+        assert phonetic_key("Иванов") != phonetic_key("Петров")
+
+    def test_fuzzy_index(self):
+        """Поиск значений с опечатками и фонетически похожих значений"""
+        index: FuzzyIndex = FuzzyIndex("last_name")
+        self.build(index)
+        assert index.lookup_fuzzy("Иванов") == [(0, "Иванов")]
+        assert index.lookup_fuzzy("Иваенко") == [(1, "Иваненко")]
+        assert index.lookup_fuzzy("Ианов", max_distance=1) == [(1, "Иванов")]
+        assert index.lookup_fuzzy("ИВАНОФФ", max_distance=0) == [(2, "Иванов")]
+        assert len(index) == 3
+        index.remove(1, self.documents[0])
+        assert index.lookup_fuzzy("Иванов", max_distance=0) == [(0, "Иванов")]
+        index.remove(4, self.documents[3])
+        assert index.lookup_fuzzy("Иванов", max_distance=1) == []
+        assert len(index) == 2
@@ -0,0 +1,51 @@
+from src.metrics import TRACE_ENV, Histogram
+from src.phonebook import Phonebook
+from unittest import TestCase
+import json
+import os
+
+
+class TestHistogram(TestCase):
+    def test_percentiles(self):
+        """Процентили оцениваются по верхней границе корзины"""
+        histogram: Histogram = Histogram()
+        for value in (0.001,) * 98 + (0.1, 1.5):
+            histogram.observe(value)
+        snapshot: dict = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["max"] == 1.5
+        assert 0.001 <= snapshot["p50"] < 0.002
+        assert 0.1 <= snapshot["p99"] < 0.2
+        assert histogram.percentile(1) == 1.5
+        assert sum(snapshot["buckets"].values()) == 100
+        assert Histogram().snapshot()["p99"] == 0
+
+
+class TestTracing(TestCase):
+    db_path = "tests/test_trace_bd.json"
+    trace_path = "tests/test_trace.jsonl"
+
+    def tearDown(self):
+        os.environ.pop(TRACE_ENV, None)
+        for path in (self.db_path, self.trace_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_trace_file(self):
+        """Вызовы публичных методов записываются в JSONL файл из переменной окружения"""
+        os.environ[TRACE_ENV] = self.trace_path
+        phonebook: Phonebook = Phonebook(self.db_path)
+        phonebook.add_contact("Иван", "Иванов", "Иванович", "Effective Mobile", "89991575656", "89991575656")
+        phonebook.get_contacts(first_name="Иван")
+        phonebook.close_db()
+        with open(self.trace_path, encoding="utf-8") as file:
+            spans: list = [json.loads(line) for line in file]
+        assert [span["name"] for span in spans] == ["add_contact", "get_contacts"]
+        assert all(span["duration"] >= 0 and span["pid"] == os.getpid() for span in spans)
+
+    def test_tracing_disabled(self):
+        """Без переменной окружения файл трассировки не создается"""
+        phonebook: Phonebook = Phonebook(self.db_path)
+        phonebook.get_all_contacts()
+        phonebook.close_db()
+        assert not os.path.exists(self.trace_path)
@@ -195,3 +195,336 @@ class TestPhonebook(TestCase):
         self.phonebook.add_contact(**self.user_data)
         result: dict = self.phonebook.update_contact("81110200202", **self.user_data)
         assert result == {"success": False, "message": "Контакт не найден."}
+
+    def test_edit_contact_personal_number(self):
+        """Обновление личного номера контакта"""
+        self.phonebook.add_contact(**self.user_data)
+        result: dict = self.phonebook.update_contact(self.user_data["personal_number"], personal_number="82222222222")
+        assert result == {"success": True, "message": "Контакт успешно обновлен!"}
+        assert self.phonebook.get_contacts(personal_number=self.user_data["personal_number"]) == []
+        assert self.phonebook.get_contacts(personal_number="82222222222")[0]["first_name"] == "Иван"
+        assert self.phonebook.add_contact(**self.user_data)["success"] is True
+
+    def test_edit_contact_to_existing_personal_number(self):
+        """Обновление личного номера на уже существующий"""
+        self.phonebook.add_contact(**self.user_data)
+        second_contact: dict = self.user_data.copy()
+        second_contact["personal_number"] = "89171575656"
+        self.phonebook.add_contact(**second_contact)
+        result: dict = self.phonebook.update_contact("89171575656", personal_number=self.user_data["personal_number"])
+        assert result == {"success": False, "message": "Контакт с таким личным номером уже создан."}
+        assert len(self.phonebook.get_all_contacts()) == 2
+
+    def test_index_rebuilt_on_open(self):
+        """Восстановление индекса личных номеров при открытии базы"""
+        self.phonebook.add_contact(**self.user_data)
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        result = self.phonebook.add_contact(**self.user_data)
+        assert result == {"success": False, "message": "Контакт с таким личным номером уже создан."}
+        assert self.phonebook.delete_contact(self.user_data["personal_number"])["success"] is True
+        assert self.phonebook.get_all_contacts() == []
+
+    def test_get_contacts_by_several_fields(self):
+        """Поиск контактов по нескольким индексированным полям"""
+        self.phonebook.add_contact(**self.user_data)
+        second_contact: dict = self.user_data.copy()
+        second_contact["first_name"] = "Петр"
+        second_contact["personal_number"] = "89171575656"
+        self.phonebook.add_contact(**second_contact)
+        contacts: list = self.phonebook.get_contacts(last_name="Иванов", organization="Effective Mobile")
+        assert contacts == [self.user_data, second_contact]
+        contacts = self.phonebook.get_contacts(last_name="Иванов", first_name="Петр", patronymic="Иванович")
+        assert contacts == [second_contact]
+
+    def test_get_contacts_without_indexes(self):
+        """Поиск контактов по полям без индекса"""
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path, indexed_fields=("last_name",))
+        self.phonebook.add_contact(**self.user_data)
+        assert self.phonebook.get_contacts(first_name="Иван") == [self.user_data]
+        assert self.phonebook.get_contacts(last_name="Иванов", first_name="Петр") == []
+        assert self.phonebook.get_contacts(last_name="Иванов", first_name="Иван") == [self.user_data]
+
+    def test_indexes_follow_updates(self):
+        """Обновление индексов при изменении и удалении контакта"""
+        self.phonebook.add_contact(**self.user_data)
+        self.phonebook.update_contact(self.user_data["personal_number"], last_name="Петров")
+        assert self.phonebook.get_contacts(last_name="Иванов") == []
+        assert len(self.phonebook.get_contacts(last_name="Петров")) == 1
+        self.phonebook.delete_contact(self.user_data["personal_number"])
+        assert self.phonebook.get_contacts(last_name="Петров") == []
+
+    def test_update_contact_rejected(self):
+        """Некорректное обновление не изменяет хранилище, индексы и результаты поиска"""
+        self.phonebook.add_contact(**self.user_data)
+        assert self.phonebook.get_contacts(last_name="Иванов") == [self.user_data]
+        for changes in ({"office_number": 123}, {"first_name": "иван"}, {"age": 5}):
+            result: dict = self.phonebook.update_contact(self.user_data["personal_number"], **changes)
+            assert result["success"] is False and result["message"] == "Переданы некорректные данные."
+            assert [error["field"] for error in result["errors"]] == list(changes)
+        assert self.phonebook.get_contacts(last_name="Иванов") == [self.user_data]
+        assert self.phonebook.get_contacts(office_number=self.user_data["office_number"]) == [self.user_data]
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+
+    def test_update_contacts(self):
+        """Массовое обновление контактов по условиям одной записью"""
+        contacts: list = [{**self.user_data, "personal_number": f"8917157565{i}"} for i in range(3)]
+        self.phonebook.add_contacts(contacts + [{**self.user_data, "last_name": "Петров"}])
+        self.phonebook.flush()
+        writes: int | None = self.phonebook.stats()["storage"].get("writes")
+        assert self.phonebook.update_contacts({"last_name": "Иванов"}, {"organization": "Mobile"}) == {
+            "success": True, "message": "Контакты успешно обновлены!", "count": 3
+        }
+        self.phonebook.flush()
+        if writes is not None:
+            assert self.phonebook.stats()["storage"]["writes"] == writes + 1
+        assert self.phonebook.get_contacts(organization="Mobile") == [
+            {**contact, "organization": "Mobile"} for contact in contacts
+        ]
+        assert self.phonebook.count_contacts(organization="Effective Mobile") == 1
+        assert self.phonebook.update_contacts({"last_name": "Сидоров"}, {"organization": "Mobile"}) == {
+            "success": False, "message": "Контакты не найдены."
+        }
+        assert self.phonebook.update_contacts({}, {"organization": "Mobile"})["success"] is False
+        assert self.phonebook.update_contacts({"last_name": "Иванов"}, {"first_name": "имя", "age": 1}) == {
+            "success": False, "message": "Переданы некорректные данные.", "errors": [
+                {
+                    "field": "first_name", "type": "pattern",
+                    "message": "Значение не соответствует шаблону ^[А-Я][а-я]*$",
+                },
+                {"field": "age", "type": "unknown", "message": "Неизвестное поле"},
+            ]
+        }
+        assert self.phonebook.update_contacts({"last_name": "Иванов"}, {"personal_number": "89000000000"}) == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        assert self.phonebook.update_contacts({"last_name": "Петров"}, {"personal_number": "89171575650"}) == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        assert self.phonebook.update_contacts({"last_name": "Петров"}, {"personal_number": "89000000000"})["success"]
+        assert self.phonebook.get_contacts(personal_number="89000000000")[0]["last_name"] == "Петров"
+
+    def test_delete_contacts(self):
+        """Удаление контактов по условиям"""
+        contacts: list = [{**self.user_data, "personal_number": f"8917157565{i}"} for i in range(3)]
+        self.phonebook.add_contacts(contacts + [{**self.user_data, "last_name": "Петров"}])
+        assert self.phonebook.delete_contacts({"personal_number": "891715"}, partial=True) == {
+            "success": True, "message": "Контакты успешно удалены!", "count": 3
+        }
+        assert self.phonebook.get_all_contacts() == [{**self.user_data, "last_name": "Петров"}]
+        assert self.phonebook.get_contacts(last_name="Иванов") == []
+        assert self.phonebook.delete_contacts({"last_name": "Иванов"}) == {
+            "success": False, "message": "Контакты не найдены."
+        }
+        assert self.phonebook.delete_contacts({}) == {"success": False, "message": "Не заданы условия отбора."}
+
+    def test_merge_contacts(self):
+        """Удаление дубликатов по плану с сохранением основного контакта"""
+        contacts: list = [{**self.user_data, "personal_number": f"8917157565{i}"} for i in range(4)]
+        self.phonebook.add_contacts(contacts)
+        plan: list = [
+            {"keep": "89171575650", "duplicates": ["89171575651", "89171575652", "89000000000"]},
+            {"keep": "89000000001", "duplicates": ["89171575653"]},
+        ]
+        assert self.phonebook.merge_contacts(plan) == {
+            "success": True, "message": "Дубликаты объединены!", "count": 2, "skipped": 1
+        }
+        assert self.phonebook.get_all_contacts() == [contacts[0], contacts[3]]
+        assert self.phonebook.get_contacts(personal_number="89171575651") == []
+        assert self.phonebook.merge_contacts(plan[:1]) == {
+            "success": False, "message": "Дубликаты не найдены.", "count": 0, "skipped": 0
+        }
+
+    def test_upsert_contact(self):
+        """Добавление или обновление контакта по личному номеру"""
+        assert self.phonebook.upsert_contact(**self.user_data) == {
+            "success": True, "message": "Контакт успешно создан!", "id": 1, "created": True
+        }
+        assert self.phonebook.upsert_contact(**{**self.user_data, "first_name": "Петр"}) == {
+            "success": True, "message": "Контакт успешно обновлен!", "id": 1, "created": False
+        }
+        assert self.phonebook.get_all_contacts() == [{**self.user_data, "first_name": "Петр"}]
+        assert self.phonebook.get_contacts(first_name="Иван") == []
+        assert self.phonebook.upsert_contact(**{**self.user_data, "last_name": "иванов"})["success"] is False
+
+    def test_add_contacts(self):
+        """Массовое добавление контактов"""
+        self.phonebook.add_contact(**self.user_data)
+        incorrect_contact: dict = self.user_data.copy()
+        incorrect_contact["first_name"] = "имя"
+        second_contact: dict = self.user_data.copy()
+        second_contact["personal_number"] = "89171575656"
+        third_contact: dict = self.user_data.copy()
+        third_contact["personal_number"] = "89171575657"
+        report: list = self.phonebook.add_contacts(
+            [self.user_data, incorrect_contact, second_contact, second_contact, third_contact], batch_size=2
+        )
+        assert report == [
+            {"success": False, "message": "Контакт с таким личным номером уже создан."},
+            {"success": False, "message": "Переданы некорректные данные.", "errors": [
+                {"field": "first_name", "type": "pattern", "message": "Значение не соответствует шаблону ^[А-Я][а-я]*$"}
+            ]},
+            {"success": True, "message": "Контакт успешно создан!", "id": 2},
+            {"success": False, "message": "Контакт с таким личным номером уже создан."},
+            {"success": True, "message": "Контакт успешно создан!", "id": 3},
+        ]
+        assert self.phonebook.get_all_contacts() == [self.user_data, second_contact, third_contact]
+        assert self.phonebook.get_contacts(personal_number="89171575657") == [third_contact]
+
+    def test_find_contacts(self):
+        """Поиск контактов по началу ФИО и подстроке номера"""
+        self.phonebook.add_contact(**self.user_data)
+        second_contact: dict = self.user_data.copy()
+        second_contact["last_name"] = "Иваненко"
+        second_contact["personal_number"] = "89171575656"
+        self.phonebook.add_contact(**second_contact)
+        assert self.phonebook.find_contacts(last_name="Иван") == [self.user_data, second_contact]
+        assert self.phonebook.find_contacts(last_name="Иван", personal_number="9171") == [second_contact]
+        assert self.phonebook.find_contacts(organization="Eff", first_name="Ив") == [self.user_data, second_contact]
+        assert self.phonebook.find_contacts(last_name="Петр") == []
+        self.phonebook.update_contact("89171575656", last_name="Петров")
+        assert self.phonebook.find_contacts(last_name="Петр") == [{**second_contact, "last_name": "Петров"}]
+        self.phonebook.delete_contact(self.user_data["personal_number"])
+        assert self.phonebook.find_contacts(office_number="1575") == [{**second_contact, "last_name": "Петров"}]
+
+    def test_fuzzy_contacts(self):
+        """Поиск с опечатками в ФИО с ранжированием по расстоянию"""
+        contacts: list = [
+            {**self.user_data, "last_name": last_name, "personal_number": f"8999000000{number}"}
+            for number, last_name in enumerate(["Шрут", "Шрутт", "Шрайбер", "Иванов"])
+        ]
+        self.phonebook.add_contacts(contacts)
+        assert self.phonebook.get_contacts(last_name="Шрудт") == []
+        assert self.phonebook.fuzzy_contacts(last_name="Шрудт", max_distance=1) == contacts[:2]
+        assert self.phonebook.fuzzy_contacts(last_name="шрутт") == [contacts[1], contacts[0]]
+        assert self.phonebook.fuzzy_contacts(last_name="Шрут", limit=1) == [contacts[0]]
+        assert self.phonebook.fuzzy_contacts(last_name="Шрут", first_name="Иавн", max_distance=1,
+                                             personal_number="89990000001") == [contacts[1]]
+        self.phonebook.update_contact("89990000001", last_name="Петров")
+        assert self.phonebook.fuzzy_contacts(last_name="Шрутт", max_distance=1) == [contacts[0]]
+        assert self.phonebook.fuzzy_contacts(last_name="Петрова", max_distance=1) == [
+            {**contacts[1], "last_name": "Петров"}
+        ]
+        assert self.phonebook.fuzzy_contacts(organization=self.user_data["organization"], limit=2) == [
+            contacts[3], {**contacts[1], "last_name": "Петров"}
+        ]
+        assert self.phonebook.fuzzy_contacts() == self.phonebook.get_sorted_contacts()
+
+    def test_get_sorted_contacts(self):
+        """Получение контактов, упорядоченных по ФИО и организации"""
+        contacts: list = []
+        for i, (last_name, first_name) in enumerate([("Петров", "Иван"), ("Иванов", "Петр"), ("Иванов", "Иван")]):
+            contact: dict = self.user_data.copy()
+            contact.update(last_name=last_name, first_name=first_name, personal_number=f"8999100000{i}")
+            self.phonebook.add_contact(**contact)
+            contacts.append(contact)
+        assert self.phonebook.get_sorted_contacts() == [contacts[2], contacts[1], contacts[0]]
+        assert self.phonebook.get_sorted_contacts(last_name="Иванов") == [contacts[2], contacts[1]]
+        assert self.phonebook.get_sorted_contacts(True, first_name="Ив") == [contacts[2], contacts[0]]
+        self.phonebook.update_contact("89991000000", last_name="Абрамов")
+        self.phonebook.delete_contact("89991000002")
+        assert [contact["last_name"] for contact in self.phonebook.get_sorted_contacts()] == ["Абрамов", "Иванов"]
+
+    def test_iter_contacts(self):
+        """Постраничное получение контактов"""
+        contacts: list = []
+        for i in range(10):
+            contact: dict = self.user_data.copy()
+            contact.update(first_name="Иван" if i % 2 else "Петр", personal_number=f"8999100000{i}")
+            contacts.append(contact)
+        self.phonebook.add_contacts(contacts)
+        ordered: list = self.phonebook.get_sorted_contacts()
+        assert self.phonebook.count_contacts() == 10
+        page: list = list(self.phonebook.iter_contacts(limit=4))
+        assert [contact for _, contact in page] == ordered[:4]
+        page = list(self.phonebook.iter_contacts(after=page[-1][0], limit=4))
+        assert [contact for _, contact in page] == ordered[4:8]
+        assert [contact for _, contact in self.phonebook.iter_contacts(offset=8, limit=4)] == ordered[8:]
+        filters: dict = {"first_name": "Петр"}
+        assert self.phonebook.count_contacts(**filters) == 5
+        page = list(self.phonebook.iter_contacts(filters=filters, offset=1, limit=2))
+        assert [contact for _, contact in page] == self.phonebook.get_sorted_contacts(**filters)[1:3]
+        assert self.phonebook.count_contacts(True, personal_number="0000") == 10
+
+    def test_result_cache(self):
+        """Повторный поиск берется из кэша, изменения полей условий и добавление делают результат неактуальным"""
+        self.phonebook.add_contact(**self.user_data)
+        assert self.phonebook.get_contacts(organization="Effective Mobile") == [self.user_data]
+        assert self.phonebook.get_contacts(organization="Effective Mobile") == [self.user_data]
+        self.phonebook.update_contact("89991575656", first_name="Петр")
+        assert self.phonebook.get_contacts(organization="Effective Mobile")[0]["first_name"] == "Петр"
+        results: dict = self.phonebook.stats()["caches"]["results"]
+        assert (results["hits"], results["misses"]) == (2, 1)
+        self.phonebook.update_contact("89991575656", organization="Пятерочка")
+        assert self.phonebook.get_contacts(organization="Effective Mobile") == []
+        self.phonebook.add_contact(**{**self.user_data, "personal_number": "89991000000"})
+        assert len(self.phonebook.get_contacts(organization="Effective Mobile")) == 1
+        assert len(self.phonebook.find_contacts(organization="Пят")) == 1
+        results = self.phonebook.stats()["caches"]["results"]
+        assert (results["hits"], results["misses"], results["invalidations"]) == (2, 4, 2)
+
+    def test_result_cache_copies(self):
+        """Изменение найденного контакта вызывающим кодом не влияет на кэш результатов и хранилище"""
+        self.phonebook.add_contact(**self.user_data)
+        for _ in range(2):
+            contact: dict = self.phonebook.get_contacts(organization="Effective Mobile")[0]
+            contact["first_name"] = "Петр"
+            contact["age"] = 5
+            assert self.phonebook.get_contacts(organization="Effective Mobile") == [self.user_data]
+            assert self.phonebook.find_contacts(organization="Effect") == [self.user_data]
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+        assert self.phonebook.stats()["caches"]["results"]["hits"] >= 2
+
+    def test_results_are_dicts(self):
+        """Все методы чтения возвращают новые словари независимо от хранилища"""
+        self.phonebook.add_contact(**self.user_data)
+        results: dict = {
+            "get_all_contacts": self.phonebook.get_all_contacts(),
+            "get_contacts": self.phonebook.get_contacts(last_name="Иванов"),
+            "find_contacts": self.phonebook.find_contacts(last_name="Ив"),
+            "fuzzy_contacts": self.phonebook.fuzzy_contacts(last_name="Иваноф"),
+            "fuzzy_contacts без условий": self.phonebook.fuzzy_contacts(limit=1),
+            "get_sorted_contacts": self.phonebook.get_sorted_contacts(),
+            "iter_contacts": [contact for _, contact in self.phonebook.iter_contacts()],
+        }
+        for method, contacts in results.items():
+            with self.subTest(method=method):
+                assert contacts == [self.user_data]
+                assert type(contacts[0]) is dict
+                contacts[0]["first_name"] = "Петр"
+        assert self.phonebook.get_all_contacts() == [self.user_data]
+
+    def test_query_cache(self):
+        """Предикаты условий без индекса собираются один раз для набора условий"""
+        phonebook: Phonebook = Phonebook("tests/test_query_cache_bd.json", indexed_fields=(), prefix_fields=(),
+                                         substring_fields=(), result_cache_size=0)
+        phonebook.add_contact(**self.user_data)
+        for _ in range(3):
+            assert phonebook.find_contacts(last_name="Ив", office_number="575") == [self.user_data]
+            assert phonebook.get_contacts(organization="Effective Mobile", first_name="Иван") == [self.user_data]
+        queries: dict = phonebook.stats()["caches"]["queries"]
+        phonebook.close_db()
+        os.remove("tests/test_query_cache_bd.json")
+        assert (queries["hits"], queries["misses"], queries["size"]) == (4, 2, 2)
+
+    def test_stats(self):
+        """Статистика времени выполнения, просмотренных контактов и записи"""
+        self.phonebook.add_contact(**self.user_data)
+        self.phonebook.add_contact(**{**self.user_data, "first_name": "иван", "personal_number": "89991000000"})
+        self.phonebook.get_contacts(first_name="Иван", personal_number="89991575656")
+        self.phonebook.flush()
+        stats: dict = self.phonebook.stats()
+        assert stats["latency"]["add_contact"]["count"] == 2
+        assert stats["latency"]["validate"]["count"] == 2
+        assert stats["counters"]["contacts_invalid"] == 1
+        assert stats["counters"]["index_hits"] == 2
+        assert stats["index_hit_rate"] == 1
+        assert stats["scan_efficiency"] == 1
+        assert stats["contacts"] == 1
+        assert isinstance(stats["storage"], dict)
+        self.phonebook.reset_stats()
+        assert self.phonebook.stats()["latency"] == {}
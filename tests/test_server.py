@@ -0,0 +1,157 @@
+from src.client import PhonebookClient
+from src.phonebook import Phonebook
+from src.server import PhonebookServer
+from unittest import TestCase
+import http.client
+import os
+import socket
+import threading
+import time
+
+
+class TestServer(TestCase):
+    db_path = "tests/test_server_bd.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "Effective Mobile",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path, compact=True)
+        self.server: PhonebookServer = PhonebookServer(self.phonebook, port=0)
+        self.thread: threading.Thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client: PhonebookClient = PhonebookClient(port=self.server.server_address[1])
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.phonebook.close_db()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_crud(self):
+        """Результаты методов клиента совпадают с результатами Phonebook"""
+        assert self.client.add_contact(**self.user_data) == {"success": True, "message": "Контакт успешно создан!",
+                                                             "id": 1}
+        assert self.client.add_contact(**self.user_data) == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        assert self.client.get_contacts(last_name="Иванов") == [self.user_data]
+        assert self.client.find_contacts(last_name="Ива") == [self.user_data]
+        assert self.client.update_contact("89991575656", first_name="Петр") == {
+            "success": True, "message": "Контакт успешно обновлен!"
+        }
+        assert self.phonebook.get_contacts(first_name="Петр") != []
+        assert self.client.count_contacts() == 1
+        assert self.client.delete_contact("89991575656") == {"success": True, "message": "Контакт успешно удален!"}
+        assert self.client.get_all_contacts() == []
+
+    def test_batch(self):
+        """Пакетные вызовы и массовое добавление"""
+        contacts: list = [{**self.user_data, "personal_number": f"8999{i:07d}"} for i in range(5)]
+        assert all(result["success"] for result in self.client.add_contacts(contacts))
+        results: list = self.client.batch([
+            ("get_contacts", {"personal_number": "89990000001"}),
+            ("count_contacts", {}),
+            ("unknown", {}),
+        ])
+        assert results[0] == [contacts[1]]
+        assert results[1] == 5
+        assert isinstance(results[2], RuntimeError)
+        assert self.client.update_contacts({"last_name": "Иванов"}, {"organization": "Mobile"})["count"] == 5
+        assert self.client.upsert_contact(**contacts[0])["created"] is False
+        assert self.client.delete_contacts({"organization": "Mobile"}) == {
+            "success": True, "message": "Контакты успешно удалены!", "count": 4
+        }
+
+    def test_streamed_pages(self):
+        """Постраничный вывод передается частями и продолжается с курсора"""
+        self.phonebook.add_contacts([{**self.user_data, "personal_number": f"8999{i:07d}"} for i in range(10)])
+        pairs: list = list(self.client.iter_contacts(page_size=3))
+        assert [contact["personal_number"] for _, contact in pairs] == [f"8999{i:07d}" for i in range(10)]
+        assert pairs == list(self.phonebook.iter_contacts())
+        rest: list = list(self.client.iter_contacts(after=pairs[3][0], limit=4, page_size=3))
+        assert rest == pairs[4:8]
+        iterator = self.client.iter_contacts(page_size=3)
+        next(iterator)
+        iterator.close()
+        assert self.client.count_contacts() == 10
+        with self.assertRaises(RuntimeError):
+            self.client.iter_contacts(order="unknown")
+
+    def test_method_errors(self):
+        """Ошибка метода возвращается в JSON с кодом 400 или 500, сервер продолжает работать"""
+        self.client.add_contact(**self.user_data)
+        with self.assertRaisesRegex(RuntimeError, "400"):
+            self.client.merge_contacts([{}])
+        with self.assertRaisesRegex(RuntimeError, "400"):
+            self.client.iter_contacts(after=5)
+        original = self.phonebook.count_contacts
+        self.phonebook.count_contacts = lambda **kwargs: 1 / 0
+        try:
+            with self.assertRaisesRegex(RuntimeError, "500"):
+                self.client.count_contacts()
+            results: list = self.client.batch([
+                ("merge_contacts", {"plan": [{}]}), ("count_contacts", {}), ("update_contact", {}),
+                ("get_all_contacts", {}),
+            ])
+        finally:
+            self.phonebook.count_contacts = original
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError, RuntimeError, list]
+        assert "ZeroDivisionError" in str(results[1])
+        assert results[3] == [self.user_data]
+        assert self.client.count_contacts() == 1
+
+
+class TestClientRetry(TestCase):
+    """Повтор запроса после обрыва соединения"""
+
+    def setUp(self):
+        self.listener: socket.socket = socket.create_server(("127.0.0.1", 0))
+        self.requests: list = []
+        self.respond: bool = True
+        self.thread: threading.Thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        self.client: PhonebookClient = PhonebookClient(port=self.listener.getsockname()[1])
+
+    def tearDown(self):
+        self.client.close()
+        self.listener.close()
+
+    def serve(self):
+        """Сервер читает один запрос на соединение и закрывает соединение, отвечая только при respond."""
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            with connection, connection.makefile("rb") as file:
+                request: bytes = file.readline()
+                headers: http.client.HTTPMessage = http.client.parse_headers(file)
+                file.read(int(headers["Content-Length"]))
+                self.requests.append(request.split()[1].decode())
+                if self.respond:
+                    connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                       b"Content-Length: 13\r\n\r\n{\"result\": 1}")
+
+    def test_retry(self):
+        """Соединение, закрытое сервером, заменяется; после отправки повторяются только запросы на чтение"""
+        assert self.client.count_contacts() == 1
+        time.sleep(0.1)
+        assert self.client.delete_contact("89991575656") == 1
+        assert self.requests == ["/count_contacts", "/delete_contact"]
+        self.respond = False
+        time.sleep(0.1)
+        with self.assertRaises(ConnectionError):
+            self.client.delete_contact("89991575656")
+        assert self.requests[2:] == ["/delete_contact"]
+        with self.assertRaises(ConnectionError):
+            self.client.count_contacts()
+        assert self.requests[3:] == ["/count_contacts", "/count_contacts"]
@@ -0,0 +1,105 @@
+from src.sharded import ShardedPhonebook, shard_of, shard_paths
+from src.view import View
+from unittest import TestCase
+import os
+
+
+class TestShardedPhonebook(TestCase):
+    db_path = "tests/test_sharded_bd.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "Effective Mobile",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.phonebook: ShardedPhonebook = ShardedPhonebook(cls.db_path, shards=3, workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.phonebook.close_db()
+        for path in shard_paths(cls.db_path, 3):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def setUp(self):
+        self.contacts: list = [
+            {**self.user_data, "first_name": first_name, "last_name": last_name, "personal_number": f"8999000000{i}"}
+            for i, (first_name, last_name) in enumerate([
+                ("Анна", "Петрова"), ("Борис", "Иванов"), ("Вера", "Иванова"), ("Глеб", "Иванов"), ("Дина", "Ан"),
+            ])
+        ]
+        self.report: list = self.phonebook.add_contacts(self.contacts)
+
+    def tearDown(self):
+        for contact in self.phonebook.get_all_contacts():
+            self.phonebook.delete_contact(contact["personal_number"])
+
+    def test_contacts_are_spread_by_personal_number(self):
+        """Контакт хранится в шарде своего личного номера"""
+        assert [result["shard"] for result in self.report] == [
+            shard_of(contact["personal_number"], 3) for contact in self.contacts
+        ]
+        assert len({result["shard"] for result in self.report}) > 1
+        assert [stats["contacts"] for stats in self.phonebook.stats()] == [
+            [result["shard"] for result in self.report].count(index) for index in range(3)
+        ]
+        assert self.phonebook.add_contact(**self.contacts[0]) == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+
+    def test_search_order(self):
+        """Результаты поиска по всем шардам упорядочены как в View.get_sorted_list"""
+        expected: list = [
+            {key: value for key, value in contact.items() if key != "id"}
+            for contact in View.get_sorted_list(self.contacts)
+        ]
+        assert self.phonebook.get_contacts() == expected
+        assert self.phonebook.get_contacts(organization="Effective Mobile") == expected
+        assert self.phonebook.find_contacts(last_name="Иван") == [
+            contact for contact in expected if contact["last_name"].startswith("Иван")
+        ]
+        assert self.phonebook.get_contacts(personal_number="89990000003") == [self.contacts[3]]
+        assert self.phonebook.count_contacts(last_name="Иванов") == 2
+
+    def test_update_moves_between_shards(self):
+        """Смена личного номера переносит контакт в шард нового номера"""
+        number: str = next(
+            f"8917000000{i}" for i in range(10) if shard_of(f"8917000000{i}", 3) != self.report[0]["shard"]
+        )
+        assert self.phonebook.update_contact("89990000000", personal_number=number, first_name="Алла") == {
+            "success": True, "message": "Контакт успешно обновлен!"
+        }
+        assert self.phonebook.get_contacts(personal_number="89990000000") == []
+        assert self.phonebook.get_contacts(personal_number=number) == [
+            {**self.contacts[0], "first_name": "Алла", "personal_number": number}
+        ]
+        assert self.phonebook.update_contact(number, personal_number="89990000001") == {
+            "success": False, "message": "Контакт с таким личным номером уже создан."
+        }
+        assert self.phonebook.update_contact(number, organization="Mobile")["success"]
+        assert self.phonebook.update_contact("89000000000", last_name="Петров") == {
+            "success": False, "message": "Контакт не найден."
+        }
+        assert self.phonebook.count_contacts() == 5
+
+    def test_update_between_shards_rejected(self):
+        """Некорректные изменения с переносом в другой шард отклоняются, как в Phonebook.update_contact"""
+        number: str = next(
+            f"8917000000{i}" for i in range(10) if shard_of(f"8917000000{i}", 3) != self.report[0]["shard"]
+        )
+        for changes, field in (({"bogus": "x"}, "bogus"), ({"first_name": "иван"}, "first_name")):
+            result: dict = self.phonebook.update_contact("89990000000", personal_number=number, **changes)
+            assert result["success"] is False and result["message"] == "Переданы некорректные данные."
+            assert [error["field"] for error in result["errors"]] == [field]
+        assert self.phonebook.get_contacts(personal_number="89990000000") == [self.contacts[0]]
+        assert self.phonebook.get_contacts(personal_number=number) == []
+
+    def test_reopen_with_other_shard_count(self):
+        """Справочник нельзя открыть с меньшим количеством шардов"""
+        with self.assertRaises(ValueError):
+            ShardedPhonebook(self.db_path, shards=2)
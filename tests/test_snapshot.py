@@ -0,0 +1,96 @@
+from src.compact import CompactContactStore
+from src.phonebook import Phonebook
+from src.snapshot import HEADER, convert, read_snapshot, write_snapshot
+from unittest import TestCase
+import json
+import os
+
+import tests.test_phonebook as test_phonebook
+
+
+class TestSnapshotPhonebook(test_phonebook.TestPhonebook):
+    """Тесты Phonebook на бинарном снимке"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db_path = "tests/test_bd.snap"
+
+    def test_reopen(self):
+        """Контакты и id сохраняются после закрытия и повторного открытия снимка"""
+        for i in range(3):
+            self.phonebook.add_contact(**{**self.user_data, "personal_number": f"8999100000{i}"})
+        self.phonebook.delete_contact("89991000001")
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        assert [contact["personal_number"] for contact in self.phonebook.get_all_contacts()] == [
+            "89991000000", "89991000002"
+        ]
+        assert self.phonebook.add_contact(**self.user_data)["id"] == 4
+
+
+class TestSnapshot(TestCase):
+    snapshot_path = "tests/test_snapshot.snap"
+    json_path = "tests/test_snapshot.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "Effective Mobile",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    def setUp(self):
+        self.store: CompactContactStore = CompactContactStore()
+        self.store.put(1, self.user_data)
+        self.store.put(2, {**self.user_data, "first_name": "Анна", "office_number": "+7 (999) 157-56-57"})
+        self.store.put(5, {**self.user_data, "last_name": "Ан", "personal_number": "00000000001"})
+        self.store.remove(1)
+
+    def tearDown(self):
+        for path in (self.snapshot_path, self.json_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def contacts(self, store: CompactContactStore) -> list:
+        return [(doc_id, dict(store.get(doc_id))) for doc_id in store.ids()]
+
+    def test_round_trip(self):
+        """Снимок сохраняет id, удаленные позиции и номера, которые нельзя представить числом"""
+        assert write_snapshot(self.snapshot_path, self.store) == os.path.getsize(self.snapshot_path)
+        store: CompactContactStore = read_snapshot(self.snapshot_path)
+        assert self.contacts(store) == self.contacts(self.store)
+        assert 1 not in store and len(store) == 2
+        assert store.append(self.user_data) == 6
+        strings: list = list(self.store.strings)
+        write_snapshot(self.snapshot_path, self.store)
+        assert list(self.store.strings) == strings
+        assert list(read_snapshot(self.snapshot_path).strings) == strings
+        assert len(read_snapshot("tests/missing.snap")) == 0
+
+    def test_corruption(self):
+        """Поврежденный, обрезанный и чужой файл не загружаются"""
+        write_snapshot(self.snapshot_path, self.store)
+        with open(self.snapshot_path, "rb") as file:
+            data: bytes = file.read()
+        for broken in (data[:HEADER.size] + bytes([data[HEADER.size] ^ 1]) + data[HEADER.size + 1:],
+                       data[:8] + bytes([data[8] ^ 1]) + data[9:], data[:-8], b"{\"_default\": {}}" * 10):
+            with open(self.snapshot_path, "wb") as file:
+                file.write(broken)
+            with self.assertRaises(ValueError):
+                read_snapshot(self.snapshot_path)
+
+    def test_convert(self):
+        """Перенос между снимком и JSON файлом TinyDB в обе стороны"""
+        write_snapshot(self.snapshot_path, self.store)
+        assert convert(self.snapshot_path, self.json_path) == 2
+        with open(self.json_path, encoding="utf-8") as file:
+            assert json.load(file) == {
+                "_default": {str(doc_id): contact for doc_id, contact in self.contacts(self.store)}
+            }
+        os.remove(self.snapshot_path)
+        assert convert(self.json_path, self.snapshot_path) == 2
+        assert self.contacts(read_snapshot(self.snapshot_path)) == self.contacts(self.store)
+        with self.assertRaises(ValueError):
+            convert(self.json_path, self.json_path)
@@ -0,0 +1,88 @@
+from benchmarks.run import ROOT, time_to_menu
+from fill_bd import generate_contacts
+from src.phonebook import Phonebook
+from src.view import PAGINATION, View, render_logo
+from unittest import TestCase, mock
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+DEFERRED_MODULES = {"art", "tabulate", "tinydb", "src.phonebook"}
+
+
+class TestStartup(TestCase):
+    def setUp(self):
+        self.directory: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.directory.name})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.directory.cleanup()
+
+    def test_import_is_lazy(self):
+        """Импорт src.view не загружает тяжелые модули и не открывает базу данных"""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.view"], cwd=self.directory.name,
+            env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, check=True,
+        )
+        imported: set = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if "|" in line}
+        assert "src.view" in imported
+        assert imported & DEFERRED_MODULES == set()
+        assert os.listdir(self.directory.name) == []
+
+    def test_menu_before_database_is_loaded(self):
+        """Главное меню выводится, не дожидаясь загрузки базы данных"""
+        path: str = os.path.join(self.directory.name, "phonebook.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"_default": {str(doc_id): contact for doc_id, contact in
+                                    enumerate(generate_contacts(30_000, 42), 1)}}, file, ensure_ascii=False)
+        time_to_menu(path)
+        startup: dict = time_to_menu(path)
+        assert startup["menu"] < startup["exit"] / 2
+
+    def test_logo_cache(self):
+        """Логотип отрисовывается один раз и читается из кэша"""
+        from art import text2art
+
+        render_logo.cache_clear()
+        logo: str = render_logo("Phonebook")
+        assert logo == text2art("Phonebook", font="clr8x8")
+        assert len(os.listdir(os.path.join(self.directory.name, "phonebook"))) == 1
+        render_logo.cache_clear()
+        with mock.patch.dict(sys.modules, {"art": None}):
+            assert render_logo("Phonebook") == logo
+        render_logo.cache_clear()
+
+    def test_menu_exit_with_failed_load(self):
+        """Ошибка загрузки базы данных не заменяет исключение, с которым завершилось меню"""
+        view: View = View(self.directory.name)
+        with mock.patch("builtins.input", side_effect=KeyboardInterrupt), \
+                mock.patch.object(View, "clear_console"), mock.patch.object(View, "draw_logo"):
+            with self.assertRaises(KeyboardInterrupt):
+                view.draw_main_menu()
+
+    def test_pages_after_concurrent_delete(self):
+        """Удаление контактов другим процессом во время просмотра уменьшает количество страниц"""
+        path: str = os.path.join(self.directory.name, "phonebook.json")
+        other: Phonebook = Phonebook(path, shared=True)
+        other.add_contacts(list(generate_contacts(3 * PAGINATION, 42)))
+        remaining: list = other.get_sorted_contacts()[:PAGINATION - 2]
+        tables: list = []
+        answers: list = ["0", "0", "+", "+", "1"]
+
+        def answer(prompt: str) -> str:
+            if len(answers) == 4:
+                for contact in other.get_sorted_contacts()[PAGINATION - 2:]:
+                    other.delete_contact(contact["personal_number"])
+            return answers.pop()
+
+        view: View = View(path)
+        with mock.patch("builtins.input", side_effect=answer), mock.patch.object(View, "clear_console"), \
+                mock.patch.object(View, "draw_logo"), \
+                mock.patch.object(View, "draw_contacts_table", side_effect=lambda *args: tables.append(args)):
+            view.draw_main_menu()
+        other.close_db()
+        assert tables[-1] == (remaining, 1)
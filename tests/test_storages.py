@@ -0,0 +1,240 @@
+from src.phonebook import Phonebook
+from src.storages import iter_json_table
+from unittest import TestCase
+import json
+import os
+import time
+
+
+class TestWriteBehind(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db_path = "tests/test_write_behind_bd.json"
+
+        cls.user_data: dict = {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "patronymic": "Иванович",
+            "organization": "Effective Mobile",
+            "office_number": "89991575656",
+            "personal_number": "89991575656",
+        }
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path, write_behind=True, flush_every=1000, flush_interval=None)
+
+    def tearDown(self):
+        self.phonebook.close_db()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def read_file(self) -> dict:
+        with open(self.db_path, encoding="utf-8") as file:
+            content: str = file.read()
+        return json.loads(content) if content else {}
+
+    def add_contacts(self, count: int) -> None:
+        for i in range(count):
+            contact: dict = self.user_data.copy()
+            contact["personal_number"] = f"8999100{i:04d}"
+            self.phonebook.add_contact(**contact)
+
+    def test_changes_are_not_written_before_flush(self):
+        """Изменения не записываются на диск до сброса"""
+        self.add_contacts(3)
+        assert self.read_file() == {}
+        assert len(self.phonebook.get_all_contacts()) == 3
+
+    def test_flush(self):
+        """Явный сброс изменений на диск"""
+        self.add_contacts(3)
+        self.phonebook.delete_contact("89991000000")
+        self.phonebook.flush()
+        assert len(self.read_file()["_default"]) == 2
+
+    def test_close_flushes_changes(self):
+        """Сброс изменений при закрытии базы данных"""
+        self.add_contacts(2)
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        assert len(self.phonebook.get_all_contacts()) == 2
+
+    def test_flush_every(self):
+        """Сброс изменений после заданного количества записей"""
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path, write_behind=True, flush_every=2, flush_interval=None, fsync="never")
+        self.add_contacts(3)
+        assert len(self.read_file()["_default"]) == 2
+
+    def test_flush_interval(self):
+        """Сброс изменений по времени"""
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path, write_behind=True, flush_interval=0.05)
+        self.add_contacts(1)
+        for _ in range(100):
+            if self.read_file():
+                break
+            time.sleep(0.01)
+        assert len(self.read_file()["_default"]) == 1
+
+
+class TestJournalStorage(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db_path = "tests/test_journal_bd.json"
+        cls.journal_path = cls.db_path + ".journal"
+
+        cls.user_data: dict = {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "patronymic": "Иванович",
+            "organization": "Effective Mobile",
+            "office_number": "89991575656",
+            "personal_number": "89991575656",
+        }
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path, journal=True)
+
+    def tearDown(self):
+        self.phonebook.close_db()
+        for path in (self.db_path, self.journal_path, self.db_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def add_contacts(self, count: int) -> None:
+        for i in range(count):
+            contact: dict = self.user_data.copy()
+            contact["personal_number"] = f"8999100{i:04d}"
+            self.phonebook.add_contact(**contact)
+
+    def test_writes_go_to_journal(self):
+        """Изменения дописываются в журнал, снимок не перезаписывается"""
+        self.add_contacts(3)
+        self.phonebook.update_contact("89991000001", first_name="Петр")
+        self.phonebook.delete_contact("89991000002")
+        assert os.path.getsize(self.db_path) == 0
+        with open(self.journal_path, "rb") as file:
+            assert len(file.readlines()) == 6
+
+    def test_default_for_json(self):
+        """JSON файл по умолчанию открывается с журналом, запись в режимах write_behind и shared - без журнала"""
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        self.add_contacts(2)
+        self.phonebook.delete_contact("89991000000")
+        assert os.path.getsize(self.db_path) == 0
+        assert self.phonebook.stats()["storage"]["writes"] == 3
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path, write_behind=True)
+        assert [contact["personal_number"] for contact in self.phonebook.get_all_contacts()] == ["89991000001"]
+        self.phonebook.close_db()
+        assert not os.path.exists(self.journal_path)
+        self.phonebook = Phonebook(self.db_path, shared=True)
+        self.add_contacts(1)
+        assert not os.path.exists(self.journal_path)
+
+    def test_replay_without_compaction(self):
+        """Восстановление состояния из журнала после аварийного завершения"""
+        self.add_contacts(3)
+        self.phonebook.update_contact("89991000001", first_name="Петр")
+        self.phonebook.delete_contact("89991000002")
+        self.phonebook = Phonebook(self.db_path, journal=True)
+        contacts: list = self.phonebook.get_all_contacts()
+        assert [contact["personal_number"] for contact in contacts] == ["89991000000", "89991000001"]
+        assert self.phonebook.get_contacts(first_name="Петр")[0]["personal_number"] == "89991000001"
+
+    def test_torn_record_is_skipped(self):
+        """Оборванная последняя запись журнала отбрасывается"""
+        self.add_contacts(2)
+        with open(self.journal_path, "ab") as file:
+            file.write(b'0badc0de {"t": "_default", "id": "3", "d": {"first_na')
+        self.phonebook = Phonebook(self.db_path, journal=True)
+        assert len(self.phonebook.get_all_contacts()) == 2
+        self.add_contacts(3)
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path)
+        assert len(self.phonebook.get_all_contacts()) == 3
+
+    def test_compaction(self):
+        """Сворачивание журнала в снимок"""
+        self.phonebook.close_db()
+        self.phonebook = Phonebook(self.db_path, journal=True, compact_threshold=1024)
+        self.add_contacts(20)
+        self.phonebook.close_db()
+        assert not os.path.exists(self.journal_path)
+        self.phonebook = Phonebook(self.db_path)
+        assert len(self.phonebook.get_all_contacts()) == 20
+
+    def measure(self, count: int) -> tuple:
+        """Медианное время update_contact и get_contacts и размер записи журнала при count контактах"""
+        self.phonebook.close_db()
+        for path in (self.db_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.phonebook = Phonebook(self.db_path, journal=True, fsync="never", result_cache_size=0)
+        self.phonebook.add_contacts([{**self.user_data, "personal_number": f"8{i:010d}"} for i in range(count)])
+        bytes_written: int = self.phonebook.stats()["storage"]["bytes_written"]
+        self.phonebook.update_contact("80000000000", first_name="Петр")
+        update_size: int = self.phonebook.stats()["storage"]["bytes_written"] - bytes_written
+        timings: list = []
+        for operation in (lambda i: self.phonebook.update_contact(f"8{i:010d}", first_name="Павел")["success"],
+                          lambda i: self.phonebook.get_contacts(personal_number=f"8{i:010d}") != []):
+            durations: list = []
+            for i in range(1, count, count // 200):
+                start: float = time.perf_counter()
+                assert operation(i)
+                durations.append(time.perf_counter() - start)
+            timings.append(sorted(durations)[len(durations) // 2])
+        return timings, update_size
+
+    def test_operation_cost_independent_of_size(self):
+        """Время и объем записи изменения по ключу не растут с количеством контактов"""
+        (small_update, small_get), small_size = self.measure(1000)
+        (large_update, large_get), large_size = self.measure(20000)
+        assert small_size == large_size
+        assert large_update < 5 * small_update
+        assert large_get < 5 * small_get
+
+
+class TestIterJSONTable(TestCase):
+    db_path = "tests/test_iter_json_bd.json"
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def write_file(self, data) -> None:
+        with open(self.db_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+    def test_matches_json_load(self):
+        """Потоковое чтение совпадает с json.load, другие таблицы пропускаются"""
+        documents: dict = {
+            str(i): {"first_name": "Иван" * i, "note": "скобки } и кавычки \" внутри", "n": [i, {"x": None}]}
+            for i in range(1, 50)
+        }
+        self.write_file({"other": {"1": {"a": "{"}}, "_default": documents, "last": {}})
+        assert list(iter_json_table(self.db_path, chunk_size=16)) == [
+            (int(doc_id), document) for doc_id, document in documents.items()
+        ]
+        assert list(iter_json_table(self.db_path, table="other")) == [(1, {"a": "{"})]
+
+    def test_empty_and_missing_file(self):
+        """Пустой и отсутствующий файл не содержат документов"""
+        assert list(iter_json_table(self.db_path)) == []
+        open(self.db_path, "w").close()
+        assert list(iter_json_table(self.db_path)) == []
+        self.write_file({})
+        assert list(iter_json_table(self.db_path)) == []
+
+    def test_progress(self):
+        """Ход чтения сообщается по количеству документов и в конце"""
+        self.write_file({"_default": {str(i): {"i": i} for i in range(1, 11)}})
+        reports: list = []
+        list(iter_json_table(self.db_path, progress=lambda done, total: reports.append((done, total)),
+                             progress_every=4))
+        size: int = os.path.getsize(self.db_path)
+        assert len(reports) == 3
+        assert reports[0][0] < reports[1][0] < reports[2][0] == size
+        assert all(total == size for _, total in reports)
@@ -0,0 +1,139 @@
+from src.phonebook import Phonebook
+from src.transfer import (
+    FORMATS, detect_format, export_contacts, gc_paused, import_contacts, iter_chunks, read_contacts
+)
+from unittest import TestCase
+import gc
+import io
+import os
+import threading
+
+
+class TestTransfer(TestCase):
+    db_path = "tests/test_transfer_bd.json"
+    target_path = "tests/test_transfer_target_bd.json"
+    user_data: dict = {
+        "first_name": "Иван",
+        "last_name": "Иванов",
+        "patronymic": "Иванович",
+        "organization": "ООО \"Рога; и, копыта\"",
+        "office_number": "89991575656",
+        "personal_number": "89991575656",
+    }
+
+    def setUp(self):
+        self.phonebook: Phonebook = Phonebook(self.db_path)
+        self.contacts: list = [
+            {**self.user_data, "first_name": first_name, "personal_number": f"8999000000{number}"}
+            for number, first_name in enumerate(["Анна", "Борис", "Вера", "Глеб", "Дина"])
+        ]
+        self.phonebook.add_contacts(self.contacts)
+
+    def tearDown(self):
+        self.phonebook.close_db()
+        for path in (self.db_path, self.target_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_iter_chunks(self):
+        """Контакты читаются страницами заданного размера с учетом условий"""
+        chunks: list = list(iter_chunks(self.phonebook, chunk_size=2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert [contact for chunk in chunks for contact in chunk] == self.contacts
+        assert list(iter_chunks(self.phonebook, {"first_name": "Вера"})) == [[self.contacts[2]]]
+        assert list(iter_chunks(self.phonebook, {"first_name": "Д"}, partial=True)) == [[self.contacts[4]]]
+
+    def test_round_trip(self):
+        """Экспорт и импорт во всех форматах сохраняют контакты"""
+        for file_format in FORMATS:
+            with self.subTest(file_format=file_format):
+                file: io.StringIO = io.StringIO(newline="")
+                assert export_contacts(self.phonebook, file, file_format, chunk_size=2)["rows"] == 5
+                file.seek(0)
+                target: Phonebook = Phonebook(self.target_path)
+                summary: dict = import_contacts(target, file, file_format, chunk_size=3)
+                assert {key: summary[key] for key in ("rows", "imported", "duplicates", "invalid")} == {
+                    "rows": 5, "imported": 5, "duplicates": 0, "invalid": 0
+                }
+                assert summary["rows_per_second"] > 0
+                assert target.get_all_contacts() == self.contacts
+                target.close_db()
+                os.remove(self.target_path)
+
+    def test_import_rejected(self):
+        """Импорт пропускает некорректные контакты и уже существующие личные номера"""
+        file: io.StringIO = io.StringIO(
+            "first_name,last_name,patronymic,organization,office_number,personal_number\r\n"
+            "Анна,Иванова,Ивановна,ООО,89990000000,89990000000\r\n"
+            "анна,Иванова,Ивановна,ООО,89990000009,89990000009\r\n"
+            "Анна,Иванова,Ивановна,ООО,89990000009,89990000009\r\n", newline=""
+        )
+        summary: dict = import_contacts(self.phonebook, file, "csv")
+        assert (summary["imported"], summary["duplicates"], summary["invalid"]) == (1, 1, 1)
+        assert self.phonebook.count_contacts() == 6
+
+    def test_read_vcard(self):
+        """Чтение vCard с переносом строк, группами и типами телефонов"""
+        file: io.StringIO = io.StringIO(
+            "BEGIN:VCARD\r\nVERSION:3.0\r\nN:Петров;Петр;Пет\r\n рович;;\r\nitem1.ORG:Рога\\, копыта;Отдел\r\n"
+            "TEL;TYPE=CELL:89990000001\r\nTEL;type=work,voice:89990000002\r\nEND:VCARD\r\n", newline=""
+        )
+        assert list(read_contacts(file, "vcard")) == [{
+            "first_name": "Петр", "last_name": "Петров", "patronymic": "Петрович", "organization": "Рога, копыта",
+            "personal_number": "89990000001", "office_number": "89990000002",
+        }]
+
+    def test_detect_format(self):
+        """Формат определяется по расширению файла"""
+        assert detect_format("contacts.CSV") == "csv"
+        assert detect_format("contacts.ndjson") == "jsonl"
+        assert detect_format("contacts.vcf") == "vcard"
+        with self.assertRaises(ValueError):
+            detect_format("contacts.txt")
+
+    def test_gc_pause_is_opt_in(self):
+        """Сборщик мусора отключается на время экспорта только при gc_pause=True"""
+        states: list = []
+
+        class File(io.StringIO):
+            def write(self, text: str) -> int:
+                states.append(gc.isenabled())
+                return super().write(text)
+
+        export_contacts(self.phonebook, File(), "jsonl", chunk_size=2)
+        export_contacts(self.phonebook, File(), "jsonl", chunk_size=2, gc_pause=True)
+        assert states == [True] * 3 + [False] * 3
+        assert gc.isenabled()
+
+    def test_gc_paused(self):
+        """Сборщик мусора возвращается в прежнее состояние после последнего из вложенных и параллельных блоков"""
+        assert gc.isenabled()
+        inner_entered: threading.Event = threading.Event()
+        outer_done: threading.Event = threading.Event()
+        states: list = []
+
+        def inner() -> None:
+            with gc_paused():
+                inner_entered.set()
+                outer_done.wait(5)
+                states.append(gc.isenabled())
+
+        thread: threading.Thread = threading.Thread(target=inner)
+        with gc_paused():
+            thread.start()
+            inner_entered.wait(5)
+            with self.assertRaises(RuntimeError), gc_paused():
+                raise RuntimeError
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+        outer_done.set()
+        thread.join()
+        assert states == [False]
+        assert gc.isenabled()
+        gc.disable()
+        try:
+            with gc_paused():
+                pass
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
@@ -0,0 +1,51 @@
+from src.validation import validate_contact, validate_contacts
+from unittest import TestCase
+
+
+class TestValidation(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.user_data: dict = {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "patronymic": "Иванович",
+            "organization": "Effective Mobile",
+            "office_number": "89991575656",
+            "personal_number": "89991575656",
+        }
+
+    def test_valid_contacts(self):
+        """Корректные контакты возвращаются без лишних ключей"""
+        contacts: list = [{**self.user_data, "extra": "значение"}, self.user_data]
+        assert validate_contacts(contacts) == [(self.user_data, []), (self.user_data, [])]
+        assert validate_contacts([]) == []
+
+    def test_error_details(self):
+        """Ошибки возвращаются для каждого контакта и поля"""
+        missing: dict = self.user_data.copy()
+        del missing["organization"]
+        contacts: list = [
+            {**self.user_data, "first_name": "иван", "office_number": 89991575656},
+            self.user_data,
+            missing,
+            "контакт",
+        ]
+        result: list = validate_contacts(contacts)
+        assert result[0] == (None, [
+            {"field": "first_name", "type": "pattern", "message": "Значение не соответствует шаблону ^[А-Я][а-я]*$"},
+            {"field": "office_number", "type": "type", "message": "Значение должно быть строкой"},
+        ])
+        assert result[1] == (self.user_data, [])
+        assert result[2] == (None, [{"field": "organization", "type": "missing", "message": "Поле отсутствует"}])
+        assert len(result[3][1]) == 6
+
+    def test_newline_inside_value(self):
+        """Перевод строки внутри значения не проходит проверку колонки"""
+        document, errors = validate_contact({**self.user_data, "first_name": "Иван\nПетр"})
+        assert document is None
+        assert errors[0]["field"] == "first_name"
+        document, errors = validate_contact({**self.user_data, "personal_number": "89991575656\n"})
+        assert document is None
+        assert errors[0]["field"] == "personal_number"
+        document, errors = validate_contact({**self.user_data, "organization": "Рога\nи копыта"})
+        assert errors == []